@@ -0,0 +1,278 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+from django.core.cache import caches
+
+from .conf import get_setting
+from .hashing import HashingPoolOverloaded
+
+
+class AdmissionRejected(HashingPoolOverloaded):
+    """
+    Дорогой запрос (вход, регистрация) не допущен к обработке:
+    все места заняты и очередь ожидания заполнена.
+    """
+
+
+class AdmissionController:
+    """
+    Ограничение числа одновременных дорогих запросов.
+
+    В процессе выполняется не больше max_concurrent запросов, еще
+    queue_size ждут места не дольше queue_timeout секунд, остальные
+    сразу получают AdmissionRejected. С общим кэшем дополнительно
+    ограничивается число запросов во всех воркерах (global_max_concurrent).
+    Счетчик в кэше приблизительный: срок его жизни продлевается при каждом
+    изменении, и места воркеров, завершившихся аварийно, освобождаются
+    через global_ttl секунд простоя. global_ttl должен быть больше времени
+    самого долгого запроса.
+
+    Синхронные запросы ждут места на threading.Condition, асинхронные -
+    на asyncio.Event в своем цикле событий, не занимая потоков. Отмененное
+    ожидание места не занимает.
+    """
+
+    key = "auth_app:admission:in_flight"
+
+    def __init__(
+        self,
+        max_concurrent=8,
+        queue_size=16,
+        queue_timeout=0.5,
+        global_max_concurrent=None,
+        global_ttl=60,
+        cache_alias=None,
+        samples=10000,
+    ):
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.global_max_concurrent = global_max_concurrent
+        self.global_ttl = global_ttl
+        self.shared = caches[cache_alias] if global_max_concurrent else None
+
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._waiting = 0
+        self._async_waiters = set()
+        self._admitted = 0
+        self._shed = {"queue_full": 0, "timeout": 0, "global": 0}
+        self._waits = deque(maxlen=samples)
+
+    def acquire(self):
+        """Занимает место или выбрасывает AdmissionRejected."""
+
+        started = time.monotonic()
+        with self._condition:
+            if self._in_flight >= self.max_concurrent:
+                if self._waiting >= self.queue_size:
+                    self._reject("queue_full")
+                self._waiting += 1
+                try:
+                    admitted = self._condition.wait_for(
+                        lambda: self._in_flight < self.max_concurrent,
+                        self.queue_timeout,
+                    )
+                finally:
+                    self._waiting -= 1
+                if not admitted:
+                    self._reject("timeout")
+            self._admit(started)
+
+        if self.shared is not None:
+            try:
+                admitted = self._acquire_global()
+            except BaseException:
+                self._release_local()
+                raise
+            if not admitted:
+                self._reject_global()
+
+    async def aacquire(self):
+        """Асинхронный вариант acquire(), не блокирующий цикл событий."""
+
+        started = time.monotonic()
+        waiter = None
+        with self._condition:
+            if self._in_flight < self.max_concurrent:
+                self._admit(started)
+            elif self._waiting >= self.queue_size:
+                self._reject("queue_full")
+            else:
+                self._waiting += 1
+                waiter = (asyncio.get_running_loop(), asyncio.Event())
+                self._async_waiters.add(waiter)
+        if waiter is not None:
+            await self._await_slot(waiter, started)
+
+        if self.shared is not None:
+            await self._aacquire_global()
+
+    async def _await_slot(self, waiter, started):
+        _loop, event = waiter
+        deadline = started + self.queue_timeout
+        try:
+            while True:
+                with self._condition:
+                    if self._in_flight < self.max_concurrent:
+                        # Место занимается без await между проверкой и
+                        # возвратом: отмененное ожидание его не удерживает.
+                        self._admit(started)
+                        return
+                    event.clear()
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._reject("timeout")
+                try:
+                    await asyncio.wait_for(event.wait(), remaining)
+                except TimeoutError:
+                    pass
+        finally:
+            with self._condition:
+                self._waiting -= 1
+                self._async_waiters.discard(waiter)
+
+    async def _aacquire_global(self):
+        # Кэш синхронный, запрос к нему выполняется в потоке. Если ожидание
+        # отменено, место в общем счетчике освобождается по завершении потока.
+        task = asyncio.ensure_future(asyncio.to_thread(self._acquire_global))
+        try:
+            admitted = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            task.add_done_callback(self._release_abandoned_global)
+            self._release_local()
+            raise
+        except BaseException:
+            self._release_local()
+            raise
+        if not admitted:
+            self._reject_global()
+
+    def _release_abandoned_global(self, task):
+        if not task.cancelled() and task.exception() is None and task.result():
+            self._release_global()
+
+    def release(self):
+        if self.shared is not None:
+            self._release_global()
+        self._release_local()
+
+    def _admit(self, started):
+        self._in_flight += 1
+        self._admitted += 1
+        self._waits.append(time.monotonic() - started)
+
+    def _release_local(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+            # Асинхронные ожидающие сами проверяют, осталось ли место.
+            for loop, event in self._async_waiters:
+                loop.call_soon_threadsafe(event.set)
+
+    def _acquire_global(self):
+        self.shared.add(self.key, 0, self.global_ttl)
+        try:
+            in_flight = self.shared.incr(self.key)
+        except ValueError:
+            self.shared.add(self.key, 1, self.global_ttl)
+            in_flight = 1
+        # incr не продлевает срок жизни ключа: без touch счетчик истекал
+        # бы посреди запросов, и следующий decr уводил его в минус.
+        self.shared.touch(self.key, self.global_ttl)
+        if in_flight > self.global_max_concurrent:
+            self._release_global()
+            return False
+        return True
+
+    def _release_global(self):
+        try:
+            self.shared.decr(self.key)
+        except ValueError:
+            # Счетчик истек, пока запрос выполнялся.
+            return
+        self.shared.touch(self.key, self.global_ttl)
+
+    def _reject_global(self):
+        self._release_local()
+        with self._condition:
+            self._admitted -= 1
+            self._reject("global")
+
+    def _reject(self, reason):
+        self._shed[reason] += 1
+        raise AdmissionRejected("Too many concurrent expensive requests")
+
+    def stats(self):
+        """Число допущенных и отклоненных запросов и перцентили ожидания."""
+
+        with self._condition:
+            waits = sorted(self._waits)
+            result = {
+                "max_concurrent": self.max_concurrent,
+                "queue_size": self.queue_size,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "admitted": self._admitted,
+                "shed": dict(self._shed),
+            }
+
+        for name, quantile in (("wait_p50", 0.5), ("wait_p95", 0.95), ("wait_p99", 0.99)):
+            result[name] = waits[min(int(len(waits) * quantile), len(waits) - 1)] if waits else 0.0
+        result["wait_max"] = waits[-1] if waits else 0.0
+        return result
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _controller, _controller_lock
+    _controller = None
+    _controller_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_controller():
+    """
+    Возвращает контроллер допуска процесса или None, если он отключен.
+    """
+
+    global _controller
+    config = get_setting("ADMISSION_CONTROL")
+    if not config["ENABLED"]:
+        return None
+
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController(
+                    max_concurrent=config["MAX_CONCURRENT"],
+                    queue_size=config["QUEUE_SIZE"],
+                    queue_timeout=config["QUEUE_TIMEOUT"],
+                    global_max_concurrent=config["GLOBAL_MAX_CONCURRENT"],
+                    global_ttl=config["GLOBAL_TTL"],
+                    cache_alias=config["CACHE_ALIAS"],
+                )
+    return _controller
+
+
+def reset_controller():
+    """Сбрасывает контроллер, следующий вызов создаст его по текущим настройкам."""
+
+    global _controller
+    with _controller_lock:
+        _controller = None
+
+
+def stats():
+    """Статистика допуска дорогих запросов текущего процесса."""
+
+    controller = get_controller()
+    return controller.stats() if controller is not None else None
@@ -0,0 +1,345 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import (
+    AuthenticationFailed,
+    MethodNotAllowed,
+    NotAuthenticated,
+    ParseError,
+    Throttled,
+    ValidationError,
+)
+from rest_framework.serializers import Serializer
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from utils import fast_json
+
+from . import refresh_coalescing, throttling, user_cache
+from .authentication import AsyncJWTAuthentication, LazyUser
+from .serializers import (
+    RegistrationSerializer,
+    LoginSerializer,
+    LogoutSerializer,
+    UserSerializer,
+    UserPatchSerializer,
+    raise_duplicate_email,
+)
+from .tokens import (
+    RefreshToken,
+    check_token_version,
+    rotate_refresh_token,
+    set_user_claims,
+)
+from .views import check_user_conditions, set_refresh_cookie, set_user_validators
+
+USER_MODEL = get_user_model()
+
+
+async def aauthenticate(email, password):
+    """
+    Асинхронная проверка учетных данных.
+    Возвращает пользователя или None.
+    """
+
+    try:
+        user = await USER_MODEL.objects.filter_email(email).aget()
+    except USER_MODEL.DoesNotExist:
+        # Хэшируем пароль и для несуществующего пользователя,
+        # чтобы время ответа не выдавало наличие учетной записи.
+        await USER_MODEL().aset_password(password)
+        return None
+
+    if await user.acheck_password(password) and jwt_settings.USER_AUTHENTICATION_RULE(user):
+        return user
+    return None
+
+
+class AsyncAPIView(View):
+    """
+    Базовое асинхронное представление.
+
+    Ошибки обрабатываются тем же обработчиком исключений, что и в DRF,
+    ответы отдаются в том же формате.
+    """
+
+    authentication_required = False
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            if self.authentication_required:
+                await self.authenticate(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except Exception as exc:
+            return self.handle_exception(exc, request, *args, **kwargs)
+
+    def http_method_not_allowed(self, request, *args, **kwargs):
+        raise MethodNotAllowed(request.method)
+
+    async def authenticate(self, request):
+        result = await AsyncJWTAuthentication().aauthenticate(request)
+        if result is None:
+            raise NotAuthenticated()
+        request.user, request.auth = result
+
+    async def get_user(self, request):
+        """Пользователь запроса с загруженной строкой."""
+
+        if isinstance(request.user, LazyUser):
+            return await request.user.aload()
+        return request.user
+
+    def get_data(self, request):
+        if not request.body:
+            return {}
+        try:
+            return fast_json.loads(request.body)
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        return HttpResponse(
+            fast_json.dumps(data), status=status_code, content_type="application/json"
+        )
+
+    def handle_exception(self, exc, request, *args, **kwargs):
+        context = {"view": self, "request": request, "args": args, "kwargs": kwargs}
+        response = api_settings.EXCEPTION_HANDLER(exc, context)
+        if response is None:
+            raise exc
+
+        rendered = self.render(response.data, response.status_code)
+        for header, value in response.items():
+            if header.lower() != "content-type":
+                rendered[header] = value
+        return rendered
+
+
+class AsyncRegistrationAPIView(AsyncAPIView):
+    """
+    Асинхронное представление для регистрации пользователя
+    """
+
+    async def post(self, request):
+        serializer = RegistrationSerializer(data=self.get_data(request))
+        serializer.is_valid(raise_exception=True)
+        validated_data = serializer.validated_data
+        try:
+            await USER_MODEL.objects.acreate_user(
+                email=validated_data["email"],
+                password=validated_data["password"],
+                first_name=validated_data["first_name"],
+                last_name=validated_data["last_name"],
+                surname=validated_data.get("surname", ""),
+            )
+        except IntegrityError as e:
+            raise_duplicate_email(e)
+        return self.render(
+            {"message": f"Ссылка для активации аккаунта направлена на email {validated_data['email']}."},
+            status.HTTP_201_CREATED,
+        )
+
+
+class AsyncTokenObtainPairView(AsyncAPIView):
+    """
+    Асинхронное представление, для получения пары токенов.
+    """
+
+    async def post(self, request):
+        data = self.get_data(request)
+        email = throttling.get_login_email(data)
+        retry_after = await sync_to_async(throttling.check_login, thread_sensitive=False)(
+            request, email
+        )
+        if retry_after is not None:
+            raise Throttled(retry_after)
+
+        serializer = LoginSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+
+        user = await aauthenticate(
+            serializer.validated_data["email"], serializer.validated_data["password"]
+        )
+        if user is None:
+            await sync_to_async(throttling.record_login_failure, thread_sensitive=False)(
+                request, email
+            )
+            raise AuthenticationFailed(
+                _("No active account found with the given credentials"),
+                "no_active_account",
+            )
+
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            user.last_login = timezone.now()
+            await user.asave(update_fields=["last_login"])
+
+        refresh = await sync_to_async(RefreshToken.for_user)(user)
+        response = self.render(
+            {
+                "data": {
+                    "access": str(refresh.access_token),
+                },
+                "message": "Токен доступа",
+            }
+        )
+
+        set_refresh_cookie(response, str(refresh))
+
+        return response
+
+
+class AsyncTokenRefreshView(AsyncAPIView):
+    """
+    Асинхронное представление для обновления токена доступа.
+    Одновременные обновления одного токена объединяются.
+    """
+
+    async def post(self, request):
+        data = self.get_data(request)
+        if not isinstance(data, dict):
+            message = Serializer.default_error_messages["invalid"].format(
+                datatype=type(data).__name__
+            )
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]})
+        raw_token = data.get("refresh") or request.COOKIES.get(
+            settings.SIMPLE_JWT["AUTH_COOKIE_REFRESH"]
+        )
+        if not raw_token:
+            raise ValidationError({"refresh": [_("This field is required.")]})
+
+        data = await refresh_coalescing.acoalesce(
+            raw_token,
+            lambda: self.refresh_tokens(raw_token),
+            lambda: self.check_refresh(raw_token),
+        )
+        response = self.render(
+            {
+                "data": {"access": data["access"]},
+                "message": "Токен доступа",
+            }
+        )
+        if "refresh" in data:
+            set_refresh_cookie(response, data["refresh"])
+        return response
+
+    async def check_refresh(self, raw_token):
+        """Проверяет, что токен не отозван после выпуска по нему новых токенов."""
+
+        try:
+            refresh = await sync_to_async(RefreshToken)(raw_token)
+            check_token_version(
+                refresh,
+                await user_cache.aget_token_version(
+                    refresh.payload.get(jwt_settings.USER_ID_CLAIM)
+                ),
+            )
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+    async def refresh_tokens(self, raw_token):
+        try:
+            # Проверка черного списка может синхронизировать индекс с базой.
+            refresh = await sync_to_async(RefreshToken)(raw_token)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        user = await user_cache.aget_user(refresh.payload.get(jwt_settings.USER_ID_CLAIM))
+        if not jwt_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                _("No active account found for the given token."),
+                "no_active_account",
+            )
+        try:
+            check_token_version(refresh, user.token_version)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        access = refresh.access_token
+        set_user_claims(access, user)
+        data = {"access": str(access)}
+
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            try:
+                await sync_to_async(rotate_refresh_token)(refresh, user)
+            except TokenError as e:
+                raise InvalidToken(e.args[0])
+            data["refresh"] = str(refresh)
+
+        return data
+
+
+class AsyncLogoutAPIView(AsyncAPIView):
+    """
+    Асинхронное представление, для выхода из системы.
+    Refresh token принимает из куки.
+    """
+
+    authentication_required = True
+
+    async def post(self, request):
+        refresh_token = request.COOKIES.get('refreshToken')
+
+        if not refresh_token:
+            raise AuthenticationFailed('Токен обновления не предоставлен.')
+
+        serializer = LogoutSerializer(data={'refresh': refresh_token})
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        await sync_to_async(serializer.save)()
+        response = self.render({"message": "Выход из системы успешен."})
+
+        response.delete_cookie(
+            settings.SIMPLE_JWT['AUTH_COOKIE_REFRESH'],
+            path=settings.SIMPLE_JWT['AUTH_COOKIE_PATH']
+        )
+
+        return response
+
+
+class AsyncGetUserView(AsyncAPIView):
+    """
+    Асинхронное представление для получения и изменения данных
+    авторизованного пользователя.
+    """
+
+    authentication_required = True
+
+    async def get(self, request):
+        updated_at = await user_cache.aget_shared_field(request.user.id, "updated_at")
+        response = check_user_conditions(request, updated_at)
+        if response is not None:
+            return response
+
+        user = await self.get_user(request)
+        if user.updated_at != updated_at:
+            user_cache.invalidate(user.id)
+            user = await user_cache.aget_user(user.id)
+
+        response = self.render(
+            {
+                "data": UserSerializer(user).data,
+                "message": "Данные пользователя",
+            }
+        )
+        set_user_validators(response, user.id, user.updated_at)
+        return response
+
+    async def put(self, request, *args, **kwargs):
+        user = await self.get_user(request)
+        serializer = UserPatchSerializer(user, self.get_data(request), partial=True)
+        serializer.is_valid(raise_exception=True)
+        for attr, value in serializer.validated_data.items():
+            setattr(user, attr, value)
+        await user.asave()
+        return self.render({"message": "Данные пользователя обновлены."})
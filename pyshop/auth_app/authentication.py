@@ -0,0 +1,210 @@
+from django.utils.functional import SimpleLazyObject, empty
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+    TokenError,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from . import routers, token_cache, user_cache
+from .conf import get_setting
+from .tokens import CLAIMS_VERSION, check_token_version
+
+
+class LazyUser(SimpleLazyObject):
+    """
+    Пользователь, построенный из claims токена.
+
+    id, is_active и is_staff берутся из токена, строка пользователя
+    загружается только при обращении к любому другому атрибуту.
+    В асинхронном коде синхронная загрузка запрещена, строку заранее
+    загружает aload().
+    """
+
+    def __init__(self, claims, loader, aloader=None):
+        super().__init__(loader)
+        self.__dict__["_claims"] = claims
+        self.__dict__["_aloader"] = aloader
+
+    async def aload(self):
+        """Загружает строку пользователя, если она еще не загружена, и возвращает его."""
+
+        if self._wrapped is empty:
+            self._wrapped = await self._aloader()
+        return self._wrapped
+
+    def __getattr__(self, name):
+        if self._wrapped is empty and name in self._claims:
+            return self._claims[name]
+        return super().__getattr__(name)
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        if self._wrapped is empty:
+            return f"<LazyUser: {self._claims['id']}>"
+        return super().__repr__()
+
+
+class CustomJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без обязательной загрузки пользователя.
+
+    Если токен содержит claims пользователя, возвращается LazyUser.
+    Иначе пользователь берется из кэша пользователей, а при промахе -
+    из базы данных.
+
+    Проверенные токены кэшируются до истечения срока их действия.
+
+    Версия токенов в токене сравнивается с текущей версией пользователя,
+    которая берется из кэша пользователей.
+    """
+
+    def get_validated_token(self, raw_token):
+        cache = token_cache.get_token_cache()
+        if cache is None:
+            return super().get_validated_token(raw_token)
+
+        entry = cache.get(raw_token)
+        if entry is not None:
+            token_class, payload = entry
+            return token_class.from_payload(raw_token, payload)
+
+        validated_token = super().get_validated_token(raw_token)
+        if hasattr(validated_token, "from_payload"):
+            cache.set(raw_token, validated_token)
+        return validated_token
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        routers.set_user(user_id)
+
+        if not self.can_use_claims(validated_token):
+            return self.load_user(user_id, validated_token)
+
+        self.check_active_claim(validated_token)
+        try:
+            token_version = user_cache.get_token_version(user_id)
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        return self.get_lazy_user(user_id, validated_token, token_version)
+
+    def can_use_claims(self, validated_token):
+        return (
+            get_setting("LAZY_USER")
+            and validated_token.get("cv") == CLAIMS_VERSION
+            # Проверка хэша пароля требует строки пользователя.
+            and not api_settings.CHECK_REVOKE_TOKEN
+        )
+
+    def check_active_claim(self, validated_token):
+        if api_settings.CHECK_USER_IS_ACTIVE and not validated_token["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+    def get_lazy_user(self, user_id, validated_token, token_version):
+        self.check_token_version(validated_token, token_version)
+        claims = {
+            "id": user_id,
+            "pk": user_id,
+            "is_active": validated_token["is_active"],
+            "is_staff": validated_token["is_staff"],
+            "is_authenticated": True,
+            "is_anonymous": False,
+        }
+        return LazyUser(
+            claims,
+            lambda: self.load_user(user_id, validated_token),
+            lambda: self.aload_user(user_id, validated_token),
+        )
+
+    def load_user(self, user_id, validated_token):
+        try:
+            user = user_cache.get_user(user_id)
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        self.check_user(user, validated_token)
+        return user
+
+    async def aload_user(self, user_id, validated_token):
+        """Асинхронный вариант load_user()."""
+
+        try:
+            user = await user_cache.aget_user(user_id)
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        self.check_user(user, validated_token)
+        return user
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def check_token_version(self, validated_token, token_version):
+        try:
+            check_token_version(validated_token, token_version)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+    def check_user(self, user, validated_token):
+        """
+        Проверки пользователя, которые выполняет JWTAuthentication.get_user(),
+        и проверка версии токенов.
+        """
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        self.check_token_version(validated_token, user.token_version)
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+
+class AsyncJWTAuthentication(CustomJWTAuthentication):
+    """
+    JWT-аутентификация для асинхронных представлений.
+    Пользователь, как и в синхронной, строится из claims токена (LazyUser),
+    строка при необходимости загружается через асинхронный ORM.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        """Асинхронный вариант get_user()."""
+
+        user_id = self.get_user_id(validated_token)
+        routers.set_user(user_id)
+
+        if not self.can_use_claims(validated_token):
+            return await self.aload_user(user_id, validated_token)
+
+        self.check_active_claim(validated_token)
+        try:
+            token_version = await user_cache.aget_token_version(user_id)
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        return self.get_lazy_user(user_id, validated_token, token_version)
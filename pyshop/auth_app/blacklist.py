@@ -0,0 +1,250 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .conf import get_setting
+from .models import RefreshTokenRecord
+
+
+def record_key(jti_hash):
+    """
+    Ключ записи хранилища token_store в индексе.
+    Не совпадает с jti simplejwt (шестнадцатеричный uuid4).
+    """
+
+    return "#" + bytes(jti_hash).hex()
+
+
+class BloomFilter:
+    """
+    Фильтр Блума для строковых ключей.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class BlacklistIndex:
+    """
+    Индекс JTI токенов обновления из черного списка в памяти процесса.
+
+    Фильтр Блума отсекает подавляющее большинство проверок, точный словарь
+    jti -> exp отвечает на срабатывания фильтра. Новые записи других
+    воркеров подтягиваются из таблицы черного списка по возрастанию id
+    не чаще раза в sync_interval секунд, записи с истекшим exp удаляются.
+    Поэтому токен, отозванный в другом воркере, здесь принимается еще
+    до sync_interval секунд.
+
+    На PostgreSQL id выдается при вставке, а видна строка после фиксации:
+    запись с меньшим id может появиться позже уже загруженной большей.
+    Поэтому каждая синхронизация перечитывает id, загруженные за последние
+    sync_overlap секунд.
+
+    С sync_records в индекс попадают и отозванные записи RefreshTokenRecord
+    под ключом record_key(): их догружают по revoked_at, тоже с запасом
+    sync_overlap секунд, который покрывает и расхождение часов воркеров.
+    """
+
+    def __init__(
+        self,
+        capacity,
+        error_rate,
+        sync_interval,
+        prune_interval,
+        sync_overlap=0,
+        sync_records=False,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.prune_interval = prune_interval
+        self.sync_overlap = sync_overlap
+        self.sync_records = sync_records
+
+        self._entries = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._last_id = 0
+        self._records_synced_at = None
+        # (время синхронизации, наибольший id до нее) за последние sync_overlap секунд.
+        self._cursors = deque()
+        self._synced_at = None
+        self._pruned_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def is_blacklisted(self, jti):
+        self.sync_if_due()
+        if jti not in self._bloom:
+            return False
+        with self._lock:
+            return jti in self._entries
+
+    def might_contain(self, key):
+        """
+        Проверка только по фильтру Блума: False - ключа точно нет,
+        True - ответ нужно уточнить у источника записи.
+        """
+
+        self.sync_if_due()
+        return key in self._bloom
+
+    def add(self, jti, exp):
+        """Добавляет JTI с моментом истечения exp (unix time)."""
+
+        with self._lock:
+            self._add(jti, exp)
+
+    def _add(self, jti, exp):
+        self._entries[jti] = exp
+        self._bloom.add(jti)
+        if len(self._entries) > self._bloom.capacity:
+            self._rebuild(self._bloom.capacity * 2)
+
+    def _rebuild(self, capacity):
+        bloom = BloomFilter(capacity, self.error_rate)
+        for jti in self._entries:
+            bloom.add(jti)
+        self._bloom = bloom
+
+    def sync_if_due(self):
+        now = time.monotonic()
+        if self._synced_at is not None and now - self._synced_at < self.sync_interval:
+            return
+
+        with self._sync_lock:
+            if self._synced_at is not None and now - self._synced_at < self.sync_interval:
+                return
+            self.sync()
+            self._synced_at = time.monotonic()
+
+    def sync(self):
+        """
+        Загружает записи черного списка, появившиеся после синхронизации,
+        выполненной не меньше sync_overlap секунд назад.
+        """
+
+        now = time.monotonic()
+        self._cursors.append((now, self._last_id))
+        while len(self._cursors) > 1 and self._cursors[1][0] <= now - self.sync_overlap:
+            self._cursors.popleft()
+
+        rows = list(
+            BlacklistedToken.objects.filter(
+                id__gt=self._cursors[0][1], token__expires_at__gt=timezone.now()
+            )
+            .order_by("id")
+            .values_list("id", "token__jti", "token__expires_at")
+        )
+        records = self._load_records() if self.sync_records else []
+        with self._lock:
+            for row_id, jti, expires_at in rows:
+                self._add(jti, expires_at.timestamp())
+                self._last_id = max(self._last_id, row_id)
+            for key, expires_at in records:
+                self._add(record_key(key), expires_at.timestamp())
+
+            if time.monotonic() - self._pruned_at >= self.prune_interval:
+                self._prune()
+
+    def _load_records(self):
+        started = timezone.now()
+        records = RefreshTokenRecord.objects.filter(
+            status=RefreshTokenRecord.REVOKED, expires_at__gt=started
+        )
+        if self._records_synced_at is not None:
+            records = records.filter(
+                revoked_at__gte=self._records_synced_at
+                - timedelta(seconds=self.sync_overlap)
+            )
+        rows = list(records.values_list("jti_hash", "expires_at"))
+        self._records_synced_at = started
+        return rows
+
+    def _prune(self):
+        now = time.time()
+        expired = [jti for jti, exp in self._entries.items() if exp <= now]
+        for jti in expired:
+            del self._entries[jti]
+        if expired:
+            self._rebuild(self._bloom.capacity)
+        self._pruned_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bloom_capacity": self._bloom.capacity,
+                "bloom_bytes": len(self._bloom.bits),
+                "last_id": self._last_id,
+            }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _index, _index_lock
+    _index = None
+    _index_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_index():
+    """
+    Возвращает индекс черного списка процесса или None, если он отключен.
+    """
+
+    global _index
+    config = get_setting("BLACKLIST_INDEX")
+    if not config["ENABLED"]:
+        return None
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = BlacklistIndex(
+                    capacity=config["CAPACITY"],
+                    error_rate=config["ERROR_RATE"],
+                    sync_interval=config["SYNC_INTERVAL"],
+                    prune_interval=config["PRUNE_INTERVAL"],
+                    sync_overlap=config["SYNC_OVERLAP"],
+                    sync_records=get_setting("TOKEN_STORE")["ENABLED"],
+                )
+    return _index
+
+
+def reset_index():
+    """Сбрасывает индекс, следующий вызов создаст его по текущим настройкам."""
+
+    global _index
+    with _index_lock:
+        _index = None
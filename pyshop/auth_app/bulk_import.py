@@ -0,0 +1,308 @@
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import django
+from django.contrib.auth import get_user_model, hashers
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from . import sharding
+from .conf import get_setting
+from .serializers import DUPLICATE_EMAIL_MESSAGE, REGISTRATION_RULES, is_duplicate_email
+
+FORMATS = ("csv", "ndjson")
+
+
+def guess_format(name):
+    return "ndjson" if name.endswith((".ndjson", ".jsonl")) else "csv"
+
+
+def read_rows(lines, fmt):
+    """
+    Читает строки CSV или NDJSON.
+    Возвращает генератор (номер строки, данные или None, ошибка или None).
+    """
+
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row, None
+    elif fmt == "ndjson":
+        for line_num, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_num, None, "Некорректный JSON."
+                continue
+            if not isinstance(row, dict):
+                yield line_num, None, "Строка должна быть JSON-объектом."
+                continue
+            yield line_num, row, None
+    else:
+        raise ValueError(f"Unknown import format: {fmt}")
+
+
+def _init_worker():
+    django.setup()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_pool():
+    """
+    Пул процессов хэширования для импорта через API, общий для всех
+    запросов процесса. Создается при первом импорте и не останавливается,
+    поэтому число процессов не растет с числом запросов.
+    """
+
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    get_setting("USER_IMPORT")["WORKERS"], initializer=_init_worker
+                )
+    return _pool
+
+
+def reset_pool():
+    """Останавливает пул, следующий вызов создаст его по текущим настройкам."""
+
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+class Checkpoint:
+    """
+    Номер последней строки, записанной в базу.
+    Сохраняется после каждой пачки, поэтому прерванный импорт
+    продолжается со следующей пачки.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return 0
+        with open(self.path) as file:
+            return json.load(file)["line"]
+
+    def save(self, line):
+        if self.path is None:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump({"line": line}, file)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class UserImporter:
+    """
+    Массовый импорт пользователей.
+
+    Строки проверяются пакетно правилами регистрации, пароли хэшируются
+    в пуле процессов, пользователи создаются через bulk_create пачками
+    по batch_size. Ошибки по строкам передаются в on_error.
+
+    Без pool импорт создает свой пул из workers процессов и останавливает
+    его в конце, с pool - использует переданный (см. get_pool()).
+    """
+
+    def __init__(
+        self, batch_size=1000, workers=None, checkpoint=None, on_error=None, pool=None
+    ):
+        self.batch_size = batch_size
+        self.pool = pool
+        if workers is None:
+            workers = get_setting("USER_IMPORT")["WORKERS"] if pool is not None else os.cpu_count()
+        self.workers = workers
+        self.checkpoint = Checkpoint(checkpoint)
+        self.on_error = on_error or (lambda line, email, errors: None)
+        self.model = get_user_model()
+        self.seen = set()
+
+    def run(self, rows):
+        """
+        Импортирует строки из read_rows().
+        Возвращает отчет со счетчиками и скоростью.
+        """
+
+        started = time.monotonic()
+        resume_from = self.checkpoint.load()
+        report = {"rows": 0, "created": 0, "failed": 0, "skipped": 0}
+        # Email всех принятых строк: следующая пачка проверяется до того,
+        # как предыдущая записана в базу.
+        self.seen = set()
+
+        # Пока пул хэширует пароли одной пачки, предыдущая записывается в базу.
+        with self.open_pool() as pool:
+            batch = []
+            pending = None
+            for line, row, error in rows:
+                if line <= resume_from:
+                    report["skipped"] += 1
+                    continue
+
+                report["rows"] += 1
+                batch.append((line, row, error))
+                if len(batch) >= self.batch_size:
+                    prepared = self.prepare_batch(batch, pool, report)
+                    if pending is not None:
+                        self.write_batch(*pending, report)
+                    pending = prepared
+                    batch = []
+            if batch:
+                prepared = self.prepare_batch(batch, pool, report)
+                if pending is not None:
+                    self.write_batch(*pending, report)
+                pending = prepared
+            if pending is not None:
+                self.write_batch(*pending, report)
+
+        self.checkpoint.clear()
+        report["elapsed"] = time.monotonic() - started
+        report["rows_per_second"] = report["rows"] / report["elapsed"] if report["elapsed"] else 0
+        return report
+
+    def open_pool(self):
+        if self.pool is not None:
+            return nullcontext(self.pool)
+        return ProcessPoolExecutor(self.workers, initializer=_init_worker)
+
+    def prepare_batch(self, batch, pool, report):
+        """Проверяет пачку и отправляет пароли в пул хэширования."""
+
+        valid = self.validate(batch, report)
+        valid = self.exclude_existing(valid, report)
+
+        passwords = [data["password"] for _line, data in valid]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        hashes = pool.map(hashers.make_password, passwords, chunksize=chunksize)
+        return batch[-1][0], valid, hashes
+
+    def write_batch(self, last_line, valid, hashes, report):
+        users = [
+            (line, self.build_user(data, encoded))
+            for (line, data), encoded in zip(valid, hashes)
+        ]
+        self.insert(users, report)
+        self.checkpoint.save(last_line)
+
+    def validate(self, batch, report):
+        results = iter(
+            REGISTRATION_RULES.validate_many(
+                row for _line, row, error in batch if error is None
+            )
+        )
+        valid = []
+        for line, row, error in batch:
+            if error is not None:
+                self.fail(report, line, "", [error])
+                continue
+
+            data, errors = next(results)
+            if errors:
+                self.fail(
+                    report,
+                    line,
+                    row.get("email") or "",
+                    [message for messages in errors.values() for message in messages],
+                )
+                continue
+
+            data["email"] = self.model.objects.normalize_email(data["email"])
+            if data["email"] in self.seen:
+                self.fail(report, line, data["email"], [DUPLICATE_EMAIL_MESSAGE])
+                continue
+            self.seen.add(data["email"])
+            valid.append((line, data))
+        return valid
+
+    def exclude_existing(self, valid, report):
+        """
+        Отбрасывает строки с email, которые уже есть в базе
+        (один запрос, с шардированием - по запросу на шард).
+        """
+
+        emails = [data["email"] for _line, data in valid]
+        existing = set()
+        for using, group in sharding.group_by_shard(emails, sharding.shard_for_email).items():
+            existing.update(
+                self.model.objects.using(using)
+                .annotate(email_lower=Lower("email"))
+                .filter(email_lower__in=group)
+                .values_list("email_lower", flat=True)
+            )
+        result = []
+        for line, data in valid:
+            if data["email"] in existing:
+                self.fail(report, line, data["email"], [DUPLICATE_EMAIL_MESSAGE])
+            else:
+                result.append((line, data))
+        return result
+
+    def build_user(self, data, encoded_password):
+        return sharding.assign_id(
+            self.model(
+                email=data["email"],
+                password=encoded_password,
+                first_name=data["first_name"],
+                last_name=data["last_name"],
+                surname=data.get("surname", ""),
+            )
+        )
+
+    def insert(self, users, report):
+        groups = sharding.group_by_shard(users, lambda item: sharding.shard_for_id(item[1].pk))
+        for using, group in groups.items():
+            self.insert_group(using, group, report)
+
+    def insert_group(self, using, users, report):
+        try:
+            with transaction.atomic(using=using):
+                self.model.objects.using(using).bulk_create([user for _line, user in users])
+            report["created"] += len(users)
+        except IntegrityError:
+            # Пользователь появился между проверкой и вставкой:
+            # вставляем пачку построчно, чтобы найти конфликтующие строки.
+            for line, user in users:
+                try:
+                    with transaction.atomic(using=using):
+                        user.save(force_insert=True, using=using)
+                    report["created"] += 1
+                except IntegrityError as exc:
+                    if is_duplicate_email(exc):
+                        message = DUPLICATE_EMAIL_MESSAGE
+                    else:
+                        message = f"Ошибка записи в базу: {exc}"
+                    self.fail(report, line, user.email, [message])
+
+    def fail(self, report, line, email, errors):
+        report["failed"] += 1
+        self.on_error(line, email, errors)
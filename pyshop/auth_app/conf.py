@@ -0,0 +1,187 @@
+from django.conf import settings
+
+DEFAULTS = {
+    "PASSWORD_HASHING": {
+        # Вычислять хэши паролей в пуле, а не в потоке запроса.
+        "ENABLED": True,
+        # "thread" или "process".
+        "BACKEND": "thread",
+        "WORKERS": 4,
+        # Сколько задач может ожидать свободного воркера.
+        "QUEUE_SIZE": 32,
+        # Сколько секунд ждать места в очереди, прежде чем отказать.
+        "QUEUE_TIMEOUT": 5,
+    },
+    "USER_CACHE": {
+        # Кэшировать пользователей, загружаемых при JWT-аутентификации.
+        "ENABLED": True,
+        # "local" - LRU в памяти процесса, "shared" - кэш Django из CACHE_ALIAS.
+        "BACKEND": "local",
+        "CACHE_ALIAS": "default",
+        "MAX_SIZE": 10000,
+        # Время жизни записи в секундах.
+        "TTL": 60,
+    },
+    "TOKEN_CACHE": {
+        # Не проверять повторно подпись и claims уже проверенных токенов доступа.
+        "ENABLED": True,
+        "MAX_SIZE": 10000,
+    },
+    "BLACKLIST_INDEX": {
+        # Проверять черный список токенов обновления по индексу в памяти.
+        "ENABLED": True,
+        # Ожидаемое число записей и доля ложных срабатываний фильтра Блума.
+        "CAPACITY": 100000,
+        "ERROR_RATE": 0.001,
+        # Как часто подтягивать записи других воркеров, в секундах.
+        # Токен, отозванный в другом воркере, принимается еще до
+        # SYNC_INTERVAL секунд.
+        "SYNC_INTERVAL": 1.0,
+        # Сколько секунд перечитывать уже загруженные id: на PostgreSQL
+        # строка с меньшим id может зафиксироваться позже большей.
+        # Должно быть больше самой долгой транзакции с записью в черный список.
+        "SYNC_OVERLAP": 5.0,
+        # Как часто удалять записи с истекшим сроком, в секундах.
+        "PRUNE_INTERVAL": 300,
+    },
+    "TOKEN_PURGE": {
+        # Удалять просроченные токены в фоновом потоке каждого воркера,
+        # поток запускает purge.start_scheduler() из хука post_fork.
+        "SCHEDULE": False,
+        # Интервал между запусками, в секундах.
+        "INTERVAL": 3600,
+        "BATCH_SIZE": 1000,
+        # Пауза между пачками, в секундах.
+        "PAUSE": 0.1,
+    },
+    "TOKEN_STORE": {
+        # Хранить выданные токены обновления в RefreshTokenRecord
+        # вместо OutstandingToken из simplejwt.
+        "ENABLED": True,
+    },
+    "REFRESH_COALESCING": {
+        # Отдавать одновременным обновлениям одного токена один результат.
+        "ENABLED": True,
+        # "shared" - между воркерами через CACHE_ALIAS, "local" - внутри
+        # процесса. С несколькими воркерами нужен "shared" с кэшем, общим
+        # для воркеров (Redis, Memcached): с "local" повторное обновление
+        # в другом воркере отзывает семейство токенов.
+        "BACKEND": "shared",
+        "CACHE_ALIAS": "default",
+        # Сколько секунд повторное обновление тем же токеном получает
+        # уже выпущенные токены.
+        "GRACE": 5,
+        # Сколько секунд ждать результата лидера.
+        "WAIT_TIMEOUT": 2,
+        "MAX_SIZE": 10000,
+    },
+    "SIGNING": {
+        # HS* - подпись SECRET_KEY средствами simplejwt,
+        # "EdDSA" или "RS256" - подпись ключами из KEYS_DIR.
+        "ALGORITHM": "HS256",
+        # Каталог с ключами <kid>.pem. Файлы с открытым ключом только
+        # проверяют подпись: так ключ выводится из ротации.
+        "KEYS_DIR": None,
+        # kid ключа подписи. Без него подписывает единственный закрытый
+        # ключ каталога, при нескольких закрытых ключах он обязателен.
+        "ACTIVE_KID": None,
+        # Время кэширования JWKS в секундах. Новый ключ должен быть
+        # опубликован не меньше чем за JWKS_MAX_AGE до того, как станет активным.
+        "JWKS_MAX_AGE": 3600,
+    },
+    "INTROSPECTION": {
+        # Наибольшее число токенов в одном запросе проверки.
+        "MAX_TOKENS": 1000,
+    },
+    # Строить пользователя из claims токена и загружать строку по требованию.
+    "LAZY_USER": True,
+    "ADMISSION_CONTROL": {
+        # Ограничивать одновременные дорогие запросы (хэширование пароля).
+        "ENABLED": True,
+        # Имена URL дорогих запросов, ограничиваются только POST.
+        "URL_NAMES": ("auth_app:login", "auth_app:registration"),
+        # Сколько дорогих запросов выполняется в процессе одновременно.
+        "MAX_CONCURRENT": 8,
+        # Сколько запросов ждут места, остальные сразу получают 503.
+        "QUEUE_SIZE": 16,
+        # Сколько секунд запрос ждет места в очереди.
+        "QUEUE_TIMEOUT": 0.5,
+        # Предел для всех воркеров через кэш CACHE_ALIAS, None - без предела.
+        "GLOBAL_MAX_CONCURRENT": None,
+        # Время жизни общего счетчика в секундах.
+        "GLOBAL_TTL": 60,
+        "CACHE_ALIAS": "default",
+    },
+    "LOGIN_THROTTLE": {
+        # Отклонять вход после частых неудачных попыток, не хэшируя пароль.
+        "ENABLED": True,
+        # "local" - счетчики в памяти процесса, "shared" - в кэше CACHE_ALIAS.
+        "BACKEND": "local",
+        "CACHE_ALIAS": "default",
+        # Длина скользящего окна в секундах.
+        "WINDOW": 300,
+        # Сколько неудачных попыток за окно допускается с одного IP
+        # и для одного email со всех IP. Предел email выше обычного
+        # числа ошибок владельца: чужие попытки блокируют его вход
+        # только при подборе пароля.
+        "IP_LIMIT": 50,
+        "EMAIL_LIMIT": 20,
+        # Стоимость одной неудачной попытки.
+        "FAILURE_COST": 1,
+        "MAX_SIZE": 100000,
+    },
+    "USER_IMPORT": {
+        # Процессы хэширования паролей для импорта через API, общие
+        # для всех запросов воркера. Команда import_users создает
+        # свой пул на время импорта.
+        "WORKERS": 2,
+    },
+    "SQLITE_MAINTENANCE": {
+        # Выполнять checkpoint WAL и PRAGMA optimize в фоновом потоке каждого
+        # воркера, поток запускает db_maintenance.start_scheduler() из хука post_fork.
+        "SCHEDULE": False,
+        # Интервал между запусками, в секундах.
+        "INTERVAL": 300,
+        # PASSIVE не ждет соединений, TRUNCATE ждет их и обрезает WAL.
+        "CHECKPOINT_MODE": "PASSIVE",
+    },
+    "READ_REPLICAS": {
+        # Алиас основной базы в DATABASES.
+        "PRIMARY": "default",
+        # Алиасы реплик, None - базы DATABASES с TEST["MIRROR"] == PRIMARY.
+        "ALIASES": None,
+        # Модели, которые читаются с реплик. Черного списка и записей
+        # токенов обновления здесь нет: отзыв токена должен быть виден сразу.
+        # Пользователь для аутентификации тоже читается с основной базы.
+        "MODELS": ("auth_app.user",),
+        # Сколько секунд после записи клиент читает с основной базы.
+        "STICKY_SECONDS": 5,
+        "COOKIE_NAME": "primary_pin",
+        # Кэш отметок о записи пользователя: по ним читают с основной базы
+        # его запросы без cookie закрепления и запросы в других воркерах.
+        "CACHE_ALIAS": "default",
+    },
+    "SHARDING": {
+        # Распределять пользователей по базам SHARDS по хэшу email.
+        # Токены и остальные модели остаются в базе по умолчанию.
+        "ENABLED": False,
+        # Алиасы баз-шардов со всеми миграциями. После изменения списка
+        # пользователей переносит команда rebalance_user_shards.
+        "SHARDS": ("default",),
+    },
+}
+
+
+def get_setting(name):
+    """
+    Возвращает настройку приложения из settings.AUTH_APP,
+    дополненную значениями по умолчанию.
+    """
+
+    default = DEFAULTS[name]
+    value = getattr(settings, "AUTH_APP", {}).get(name)
+
+    if isinstance(default, dict):
+        return {**default, **(value or {})}
+
+    return default if value is None else value
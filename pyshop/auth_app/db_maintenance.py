@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+
+from django.db import DatabaseError, connections
+
+from .conf import get_setting
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_MODES = ("PASSIVE", "FULL", "RESTART", "TRUNCATE")
+
+
+def sqlite_aliases():
+    return [alias for alias in connections if connections[alias].vendor == "sqlite"]
+
+
+def checkpoint(using="default", mode="PASSIVE"):
+    """
+    Переносит страницы из WAL в файл базы.
+    Возвращает (busy, страниц в WAL, перенесено страниц); для базы
+    не в режиме WAL SQLite возвращает (0, -1, -1).
+
+    PASSIVE не ждет читателей и писателей, TRUNCATE ждет их
+    и обрезает WAL до нуля.
+    """
+
+    mode = mode.upper()
+    if mode not in CHECKPOINT_MODES:
+        raise ValueError(f"Неизвестный режим checkpoint: {mode}")
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"PRAGMA wal_checkpoint({mode})")
+        return tuple(cursor.fetchone())
+
+
+def optimize(using="default"):
+    """
+    Обновляет статистику планировщика для таблиц, где она устарела.
+    """
+
+    with connections[using].cursor() as cursor:
+        cursor.execute("PRAGMA optimize")
+
+
+def run_maintenance(mode="PASSIVE", aliases=None):
+    """
+    Выполняет checkpoint и optimize для всех баз SQLite.
+    Возвращает {alias: отчет}.
+    """
+
+    report = {}
+    for alias in aliases or sqlite_aliases():
+        started = time.monotonic()
+        try:
+            busy, wal_pages, checkpointed = checkpoint(alias, mode)
+            optimize(alias)
+        except DatabaseError as e:
+            report[alias] = {"error": str(e)}
+            continue
+        report[alias] = {
+            "busy": bool(busy),
+            "wal_pages": wal_pages,
+            "checkpointed": checkpointed,
+            "elapsed": time.monotonic() - started,
+        }
+    return report
+
+
+def _run_scheduler(interval, mode):
+    while True:
+        time.sleep(interval)
+        try:
+            report = run_maintenance(mode)
+            logger.info("SQLite maintenance: %s", report)
+        except Exception:
+            logger.exception("SQLite maintenance failed")
+        finally:
+            connections.close_all()
+
+
+def start_scheduler():
+    """
+    Запускает фоновый поток обслуживания SQLite, если он включен в настройках.
+
+    Вызывается в воркере после fork (хук post_fork в gunicorn.conf.py),
+    как и purge.start_scheduler(). Без веб-сервера обслуживание
+    по расписанию выполняет sqlite_maintenance --interval.
+    """
+
+    config = get_setting("SQLITE_MAINTENANCE")
+    if not config["SCHEDULE"] or not sqlite_aliases():
+        return None
+
+    thread = threading.Thread(
+        target=_run_scheduler,
+        args=(config["INTERVAL"], config["CHECKPOINT_MODE"]),
+        name="sqlite-maintenance",
+        daemon=True,
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,154 @@
+import csv
+import io
+import json
+import zlib
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+
+from . import sharding
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+FIELDS = (
+    "id",
+    "email",
+    "first_name",
+    "last_name",
+    "surname",
+    "username",
+    "is_active",
+    "is_staff",
+    "notification",
+    "date_joined",
+    "updated_at",
+)
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def iter_chunks(chunk_size=5000):
+    """
+    Читает таблицу пользователей пачками по первичному ключу (keyset).
+    В памяти одновременно находится не больше одной пачки, транзакция
+    между пачками не удерживается. С шардированием шарды читаются
+    по очереди, порядок по ключу соблюдается внутри шарда.
+    """
+
+    for using in sharding.user_databases():
+        queryset = get_user_model().objects.using(using).order_by("pk").values_list(*FIELDS)
+        last_pk = None
+        while True:
+            chunk = list(
+                (queryset if last_pk is None else queryset.filter(pk__gt=last_pk))[:chunk_size]
+            )
+            if not chunk:
+                break
+            yield chunk
+            last_pk = chunk[-1][0]
+
+
+def encode_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def encode_ndjson(chunks):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for chunk in chunks:
+        yield "".join(
+            encoder.encode(dict(zip(FIELDS, row))) + "\n" for row in chunk
+        ).encode()
+
+
+class _Sink(io.RawIOBase):
+    """Файл, из которого записанные байты забираются после каждой группы строк."""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def encode_parquet(chunks):
+    """
+    Колоночный формат Parquet: каждая пачка записывается отдельной
+    группой строк. Требует pyarrow.
+    """
+
+    if pyarrow is None:
+        raise ImportError("pyarrow is required for the parquet export format.")
+
+    sink = _Sink()
+    writer = None
+    for chunk in chunks:
+        columns = list(zip(*chunk))
+        table = pyarrow.table({name: list(column) for name, column in zip(FIELDS, columns)})
+        if writer is None:
+            writer = pyarrow.parquet.ParquetWriter(sink, table.schema, compression="zstd")
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+ENCODERS = {"csv": encode_csv, "ndjson": encode_ndjson, "parquet": encode_parquet}
+
+
+def gzip_stream(parts, level=6):
+    """Сжимает поток байтов в gzip на лету."""
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for part in parts:
+        data = compressor.compress(part)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_users(fmt="csv", compress=False, chunk_size=5000):
+    """
+    Возвращает генератор байтов выгрузки пользователей в формате fmt.
+    Parquet сжимается внутри формата, поэтому gzip к нему не применяется.
+    """
+
+    parts = ENCODERS[fmt](iter_chunks(chunk_size))
+    if compress and fmt != "parquet":
+        parts = gzip_stream(parts)
+    return parts
+
+
+def get_filename(fmt, compress):
+    extension = FORMATS[fmt][1]
+    if compress and fmt != "parquet":
+        extension += ".gz"
+    return f"users.{extension}"
@@ -0,0 +1,222 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.contrib.auth import hashers
+
+from .conf import get_setting
+
+
+class HashingPoolOverloaded(Exception):
+    """
+    Очередь пула хэширования заполнена, задача не принята.
+    """
+
+
+def _run(func, args):
+    """Выполняет задачу в воркере и возвращает время её начала."""
+
+    return time.monotonic(), func(*args)
+
+
+class HashingExecutor:
+    """
+    Пул для хэширования паролей с ограниченной очередью.
+
+    Одновременно принимается не больше workers + queue_size задач,
+    остальные ждут места не дольше queue_timeout секунд и получают
+    HashingPoolOverloaded.
+    """
+
+    def __init__(self, workers=4, queue_size=32, backend="thread", queue_timeout=5):
+        if backend == "process":
+            self._pool = ProcessPoolExecutor(max_workers=workers)
+        elif backend == "thread":
+            self._pool = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="password-hashing"
+            )
+        else:
+            raise ValueError(f"Unknown hashing backend: {backend}")
+
+        self.backend = backend
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def run(self, func, *args):
+        """Выполняет func(*args) в пуле и возвращает результат."""
+
+        self._admit(self._slots.acquire(timeout=self.queue_timeout))
+        submitted_at = time.monotonic()
+        try:
+            started_at, result = self._pool.submit(_run, func, args).result()
+        finally:
+            self._release()
+
+        self._record_wait(started_at - submitted_at)
+        return result
+
+    async def arun(self, func, *args):
+        """Асинхронный вариант run(), не блокирующий цикл событий."""
+
+        acquired = self._slots.acquire(blocking=False)
+        if not acquired:
+            acquired = await asyncio.to_thread(
+                self._slots.acquire, timeout=self.queue_timeout
+            )
+        self._admit(acquired)
+        submitted_at = time.monotonic()
+        try:
+            started_at, result = await asyncio.wrap_future(
+                self._pool.submit(_run, func, args)
+            )
+        finally:
+            self._release()
+
+        self._record_wait(started_at - submitted_at)
+        return result
+
+    def _admit(self, acquired):
+        with self._lock:
+            if not acquired:
+                self._rejected += 1
+                raise HashingPoolOverloaded("Password hashing queue is full")
+            self._in_flight += 1
+            self._submitted += 1
+
+    def _release(self):
+        self._slots.release()
+        with self._lock:
+            self._in_flight -= 1
+
+    def _record_wait(self, wait):
+        wait = max(wait, 0.0)
+        with self._lock:
+            self._completed += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+    def stats(self):
+        """Возвращает текущую глубину очереди и время ожидания задач."""
+
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self._in_flight,
+                "queue_depth": max(self._in_flight - self.workers, 0),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "wait_avg": self._wait_total / self._completed if self._completed else 0.0,
+                "wait_max": self._wait_max,
+            }
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _executor, _executor_lock
+    # Пул родителя не переживает fork: воркер gunicorn создаст свой.
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_executor():
+    """
+    Возвращает пул хэширования процесса или None, если пул отключен.
+    """
+
+    global _executor
+    config = get_setting("PASSWORD_HASHING")
+    if not config["ENABLED"]:
+        return None
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = HashingExecutor(
+                    workers=config["WORKERS"],
+                    queue_size=config["QUEUE_SIZE"],
+                    backend=config["BACKEND"],
+                    queue_timeout=config["QUEUE_TIMEOUT"],
+                )
+    return _executor
+
+
+def reset_executor():
+    """Останавливает пул, следующий вызов создаст его по текущим настройкам."""
+
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown()
+
+
+def stats():
+    """Статистика пула хэширования текущего процесса."""
+
+    executor = get_executor()
+    return executor.stats() if executor is not None else None
+
+
+def make_password(raw_password):
+    """Хэширует пароль в пуле."""
+
+    executor = get_executor()
+    if raw_password is None or executor is None:
+        return hashers.make_password(raw_password)
+    return executor.run(hashers.make_password, raw_password)
+
+
+def verify_password(raw_password, encoded):
+    """
+    Проверяет пароль в пуле.
+    Возвращает пару (пароль верный, хэш нужно обновить).
+    """
+
+    executor = get_executor()
+    if executor is None:
+        return hashers.verify_password(raw_password, encoded)
+    return executor.run(hashers.verify_password, raw_password, encoded)
+
+
+async def amake_password(raw_password):
+    """Асинхронный вариант make_password()."""
+
+    executor = get_executor()
+    if raw_password is None:
+        return hashers.make_password(raw_password)
+    if executor is None:
+        return await asyncio.to_thread(hashers.make_password, raw_password)
+    return await executor.arun(hashers.make_password, raw_password)
+
+
+async def averify_password(raw_password, encoded):
+    """Асинхронный вариант verify_password()."""
+
+    executor = get_executor()
+    if executor is None:
+        return await asyncio.to_thread(hashers.verify_password, raw_password, encoded)
+    return await executor.arun(hashers.verify_password, raw_password, encoded)
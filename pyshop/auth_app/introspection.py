@@ -0,0 +1,165 @@
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext as _
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from . import blacklist, sharding, signing, token_cache, token_store, user_cache
+from .models import RefreshTokenRecord
+from .tokens import TOKEN_VERSION_CLAIM, AccessToken
+
+TOKEN_TYPES = {"access", "refresh"}
+
+
+def decode_tokens(raw_tokens):
+    """
+    Проверяет подписи и сроки токенов.
+    Возвращает список (payload, error) в порядке raw_tokens.
+    """
+
+    backend = signing.get_token_backend()
+    cache = token_cache.get_token_cache()
+    results = []
+
+    for raw_token in raw_tokens:
+        entry = cache.get(raw_token) if cache is not None else None
+        if entry is not None:
+            results.append((entry[1], None))
+            continue
+
+        try:
+            payload = backend.decode(raw_token)
+        except TokenBackendError:
+            results.append((None, _("Token is invalid or expired")))
+            continue
+
+        token_type = payload.get(api_settings.TOKEN_TYPE_CLAIM)
+        if token_type not in TOKEN_TYPES:
+            results.append((None, _("Token has wrong type")))
+            continue
+        if api_settings.JTI_CLAIM not in payload:
+            results.append((None, _("Token has no id")))
+            continue
+
+        if cache is not None and token_type == "access":
+            cache.set(raw_token, AccessToken.from_payload(raw_token, payload))
+        results.append((payload, None))
+
+    return results
+
+
+def get_revoked_jtis(jtis):
+    """
+    JTI токенов обновления, которые больше нельзя использовать.
+    Выполняет один запрос к базе на весь список.
+    """
+
+    if not jtis:
+        return set()
+
+    if not token_store.is_enabled():
+        return set(
+            BlacklistedToken.objects.filter(token__jti__in=jtis).values_list(
+                "token__jti", flat=True
+            )
+        )
+
+    hashes = {token_store.jti_hash(jti): jti for jti in jtis}
+    statuses = dict(
+        RefreshTokenRecord.objects.filter(jti_hash__in=list(hashes)).values_list(
+            "jti_hash", "status"
+        )
+    )
+    revoked = {
+        hashes[bytes(key)]
+        for key, status in statuses.items()
+        if status != RefreshTokenRecord.ACTIVE
+    }
+
+    # Токены, выпущенные до появления хранилища, проверяются по индексу
+    # черного списка в памяти.
+    index = blacklist.get_index()
+    if index is not None:
+        known = {hashes[bytes(key)] for key in statuses}
+        revoked.update(
+            jti for jti in jtis if jti not in known and index.is_blacklisted(jti)
+        )
+    return revoked
+
+
+def get_token_versions(user_ids):
+    """
+    Текущие версии токенов пользователей: из кэша пользователей,
+    для промахов - одним запросом к базе.
+    """
+
+    versions = {}
+    missing = []
+    cache = user_cache.get_user_cache()
+    for user_id in user_ids:
+        version = cache.get_field(user_id, "token_version") if cache is not None else None
+        if version is None:
+            missing.append(user_id)
+        else:
+            versions[user_id] = version
+
+    for using, ids in sharding.group_by_shard(missing).items():
+        versions.update(
+            get_user_model()
+            .objects.using(using)
+            .filter(pk__in=ids)
+            .values_list("pk", "token_version")
+        )
+    return versions
+
+
+def introspect(raw_tokens):
+    """
+    Проверяет пачку токенов.
+    Для каждого токена возвращает активность, claims и статус черного списка.
+    """
+
+    decoded = decode_tokens(raw_tokens)
+    payloads = [payload for payload, _error in decoded if payload is not None]
+
+    revoked = get_revoked_jtis(
+        [
+            payload[api_settings.JTI_CLAIM]
+            for payload in payloads
+            if payload[api_settings.TOKEN_TYPE_CLAIM] == "refresh"
+        ]
+    )
+    versions = get_token_versions(
+        {
+            payload[api_settings.USER_ID_CLAIM]
+            for payload in payloads
+            if api_settings.USER_ID_CLAIM in payload
+        }
+    )
+
+    results = []
+    for payload, error in decoded:
+        if payload is None:
+            results.append(
+                {"active": False, "blacklisted": False, "claims": None, "error": error}
+            )
+            continue
+
+        blacklisted = payload[api_settings.JTI_CLAIM] in revoked
+        user_id = payload.get(api_settings.USER_ID_CLAIM)
+        if user_id not in versions:
+            error = _("User not found")
+        elif payload.get(TOKEN_VERSION_CLAIM, 0) != versions[user_id]:
+            error = _("Token has been revoked")
+        elif blacklisted:
+            error = _("Token is blacklisted")
+
+        results.append(
+            {
+                "active": error is None,
+                "blacklisted": blacklisted,
+                "claims": payload,
+                "error": error,
+            }
+        )
+    return results
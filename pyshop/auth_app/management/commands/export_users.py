@@ -0,0 +1,44 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_app import export
+
+
+class Command(BaseCommand):
+    help = (
+        "Потоковая выгрузка таблицы пользователей в CSV, NDJSON или Parquet. "
+        "Таблица читается пачками по первичному ключу, память не зависит от размера таблицы."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=list(export.FORMATS), default="csv")
+        parser.add_argument("--output", default="-", help="Файл выгрузки или - для stdout.")
+        parser.add_argument("--gzip", action="store_true", help="Сжимать выгрузку на лету.")
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if options["format"] == "parquet" and export.pyarrow is None:
+            raise CommandError("pyarrow is required for the parquet export format.")
+
+        parts = export.export_users(
+            options["format"], options["gzip"], options["chunk_size"]
+        )
+        if options["output"] == "-":
+            output = sys.stdout.buffer
+        else:
+            output = open(options["output"], "wb")
+
+        size = 0
+        try:
+            for part in parts:
+                output.write(part)
+                size += len(part)
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+
+        if options["output"] != "-":
+            self.stdout.write(
+                self.style.SUCCESS(f"Exported {size / 1024:.1f} KiB to {options['output']}.")
+            )
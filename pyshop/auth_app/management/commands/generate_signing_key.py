@@ -0,0 +1,74 @@
+import os
+from datetime import datetime
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_app.conf import get_setting
+
+
+def generate_private_key(algorithm):
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    if algorithm.startswith("RS"):
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    raise CommandError(f"Unsupported signing algorithm: {algorithm}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Создает ключ подписи JWT в каталоге ключей. "
+        "С --retire KID оставляет у ключа KID только открытую часть."
+    )
+
+    def add_arguments(self, parser):
+        config = get_setting("SIGNING")
+        parser.add_argument("--algorithm", default=config["ALGORITHM"])
+        parser.add_argument("--keys-dir", default=config["KEYS_DIR"])
+        parser.add_argument("--kid", default=None)
+        parser.add_argument("--retire", metavar="KID", default=None)
+
+    def handle(self, *args, **options):
+        if not options["keys_dir"]:
+            raise CommandError("Keys directory is not configured.")
+        keys_dir = Path(options["keys_dir"])
+        keys_dir.mkdir(parents=True, exist_ok=True)
+
+        if options["retire"]:
+            return self.retire(keys_dir / f"{options['retire']}.pem")
+
+        kid = options["kid"] or datetime.now().strftime("%Y%m%d%H%M%S")
+        path = keys_dir / f"{kid}.pem"
+        if path.exists():
+            raise CommandError(f"Key {kid} already exists.")
+
+        private_key = generate_private_key(options["algorithm"])
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as file:
+            file.write(pem)
+
+        self.stdout.write(self.style.SUCCESS(f"Created {options['algorithm']} key {kid}."))
+        self.stdout.write(
+            f"The key is published in JWKS after restart. Make it active with "
+            f"ACTIVE_KID={kid} no sooner than JWKS_MAX_AGE seconds later."
+        )
+
+    def retire(self, path):
+        if not path.exists():
+            raise CommandError(f"Key {path.stem} not found.")
+
+        private_key = serialization.load_pem_private_key(path.read_bytes(), None)
+        pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        path.write_bytes(pem)
+
+        self.stdout.write(self.style.SUCCESS(f"Key {path.stem} is now verify-only."))
@@ -0,0 +1,74 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_app.bulk_import import FORMATS, UserImporter, guess_format, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Импортирует пользователей из CSV или NDJSON с колонками email, password, "
+        "first_name, last_name, surname. Ошибки по строкам пишутся в отчет, "
+        "прерванный импорт продолжается с последней записанной пачки."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл с пользователями или - для stdin.")
+        parser.add_argument("--format", choices=FORMATS, default=None)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument("--report", default=None, help="CSV-файл отчета об ошибках.")
+        parser.add_argument(
+            "--checkpoint",
+            default=None,
+            help="Файл прогресса, по умолчанию <path>.checkpoint.",
+        )
+        parser.add_argument(
+            "--restart", action="store_true", help="Начать с начала, игнорируя прогресс."
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or guess_format(path)
+
+        checkpoint = options["checkpoint"]
+        if checkpoint is None and path != "-":
+            checkpoint = f"{path}.checkpoint"
+
+        report_file = open(options["report"], "a", newline="") if options["report"] else None
+        writer = csv.writer(report_file or self.stderr)
+
+        def on_error(line, email, errors):
+            writer.writerow([line, email, "; ".join(errors)])
+
+        importer = UserImporter(
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            checkpoint=checkpoint,
+            on_error=on_error,
+        )
+        if options["restart"]:
+            importer.checkpoint.clear()
+
+        try:
+            source = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        except OSError as e:
+            raise CommandError(f"Cannot open {path}: {e}")
+
+        try:
+            with source:
+                report = importer.run(read_rows(source, fmt))
+        finally:
+            if report_file is not None:
+                report_file.close()
+
+        if report["skipped"]:
+            self.stdout.write(f"Resumed after {report['skipped']} already imported rows.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['created']} of {report['rows']} rows, "
+                f"{report['failed']} failed, {report['elapsed']:.2f}s "
+                f"({report['rows_per_second']:.1f} rows/s)."
+            )
+        )
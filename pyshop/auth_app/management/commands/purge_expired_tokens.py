@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from auth_app.conf import get_setting
+from auth_app.purge import purge_expired_tokens
+
+
+def format_size(size):
+    rows, size_bytes = size
+    if size_bytes is None:
+        return f"{rows} rows"
+    return f"{rows} rows, {size_bytes / 1024:.1f} KiB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет просроченные выданные токены и записи черного списка "
+        "пачками с паузой между ними. Повторный запуск продолжает очистку. "
+        "С --interval повторяет очистку каждые N секунд, не завершаясь."
+    )
+
+    def add_arguments(self, parser):
+        config = get_setting("TOKEN_PURGE")
+        parser.add_argument("--batch-size", type=int, default=config["BATCH_SIZE"])
+        parser.add_argument("--pause", type=float, default=config["PAUSE"])
+        parser.add_argument("--max-batches", type=int, default=None)
+        parser.add_argument("--interval", type=float, default=None)
+
+    def handle(self, *args, **options):
+        while True:
+            self.purge(options)
+            if options["interval"] is None:
+                break
+            connections.close_all()
+            time.sleep(options["interval"])
+
+    def purge(self, options):
+        report = purge_expired_tokens(
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+            max_batches=options["max_batches"],
+        )
+
+        self.stdout.write(
+            f"Outstanding tokens: {format_size(report['outstanding_before'])} -> "
+            f"{format_size(report['outstanding_after'])}"
+        )
+        self.stdout.write(
+            f"Blacklisted tokens: {format_size(report['blacklisted_before'])} -> "
+            f"{format_size(report['blacklisted_after'])}"
+        )
+        self.stdout.write(
+            f"Refresh token records: {format_size(report['records_before'])} -> "
+            f"{format_size(report['records_after'])}"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Removed {report['outstanding_deleted']} outstanding, "
+                f"{report['blacklisted_deleted']} blacklisted tokens and "
+                f"{report['records_deleted']} refresh token records "
+                f"in {report['batches']} batches, {report['elapsed']:.2f}s."
+            )
+        )
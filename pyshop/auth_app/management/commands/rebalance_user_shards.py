@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from auth_app.sharding import LegacyUserIds, get_shards, rebalance, rekey_legacy_users
+
+
+def aliases(value):
+    return tuple(alias for alias in value.split(",") if alias)
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит пользователей в шарды по раскладке --shards "
+        "(по умолчанию SHARDING['SHARDS']). Добавление шарда: migrate "
+        "--database нового шарда, rebalance_user_shards --shards <новый список> "
+        "--copy-only, переключение SHARDS в настройках, rebalance_user_shards. "
+        "Вывод шарда из работы - то же с --source <шард>. Пользователям "
+        "с id, выданными до шардирования, --rekey-legacy сначала выдает новые id "
+        "(их токены перестают действовать), без него перенос не выполняется."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shards", type=aliases, default=None)
+        parser.add_argument("--source", type=aliases, default=())
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--copy-only", action="store_true")
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--rekey-legacy", action="store_true")
+
+    def handle(self, *args, **options):
+        shards = options["shards"] or get_shards()
+        for alias in (*shards, *options["source"]):
+            if alias not in connections:
+                raise CommandError(f"Нет базы {alias} в DATABASES.")
+
+        if options["rekey_legacy"] and not options["dry_run"]:
+            for alias in dict.fromkeys((*shards, *options["source"])):
+                rekeyed = rekey_legacy_users(alias, options["batch_size"])
+                self.stdout.write(f"{alias}: assigned new ids to {len(rekeyed)} users.")
+
+        try:
+            report = rebalance(
+                shards=shards,
+                sources=options["source"],
+                batch_size=options["batch_size"],
+                copy_only=options["copy_only"],
+                dry_run=options["dry_run"],
+            )
+        except LegacyUserIds as e:
+            raise CommandError(f"{e} Run with --rekey-legacy to assign new ids.")
+
+        moved = ", ".join(f"{alias}: {count}" for alias, count in report["moved"].items())
+        self.stdout.write(f"Scanned {report['scanned']} users, to move: {moved or 'none'}.")
+        if report["legacy"]:
+            self.stderr.write(
+                self.style.WARNING(
+                    f"{report['legacy']} users have ids from before sharding, "
+                    f"run with --rekey-legacy to assign new ids."
+                )
+            )
+        if options["dry_run"]:
+            action, count = "Would move", sum(report["moved"].values())
+        else:
+            action, count = "Copied" if options["copy_only"] else "Moved", report["copied"]
+        self.stdout.write(
+            self.style.SUCCESS(f"{action} {count} users in {report['elapsed']:.2f}s.")
+        )
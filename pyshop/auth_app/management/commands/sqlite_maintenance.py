@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from auth_app.conf import get_setting
+from auth_app.db_maintenance import CHECKPOINT_MODES, run_maintenance, sqlite_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит WAL в файл базы (PRAGMA wal_checkpoint) и обновляет "
+        "статистику планировщика (PRAGMA optimize) для баз SQLite. "
+        "С --interval повторяет обслуживание каждые N секунд, не завершаясь."
+    )
+
+    def add_arguments(self, parser):
+        config = get_setting("SQLITE_MAINTENANCE")
+        parser.add_argument(
+            "--mode",
+            choices=CHECKPOINT_MODES,
+            type=str.upper,
+            default=config["CHECKPOINT_MODE"],
+        )
+        parser.add_argument("--database", action="append", dest="aliases")
+        parser.add_argument("--interval", type=float, default=None)
+
+    def handle(self, *args, **options):
+        aliases = options["aliases"] or sqlite_aliases()
+        if not aliases:
+            raise CommandError("Нет баз SQLite.")
+
+        while True:
+            self.maintain(options["mode"], aliases)
+            if options["interval"] is None:
+                break
+            connections.close_all()
+            time.sleep(options["interval"])
+
+    def maintain(self, mode, aliases):
+        report = run_maintenance(mode, aliases)
+        for alias, result in report.items():
+            if "error" in result:
+                self.stderr.write(self.style.ERROR(f"{alias}: {result['error']}"))
+                continue
+            if result["wal_pages"] < 0:
+                self.stdout.write(f"{alias}: not in WAL mode, optimized.")
+                continue
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{alias}: checkpointed {result['checkpointed']} of "
+                    f"{result['wal_pages']} WAL pages"
+                    f"{' (busy)' if result['busy'] else ''}, "
+                    f"{result['elapsed']:.3f}s."
+                )
+            )
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from auth_app.conf import get_setting
+from auth_app.routers import replica_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Копирует основную базу SQLite в файлы реплик онлайн-резервным "
+        "копированием. Заменяет репликацию при локальной проверке "
+        "ReplicaRouter; --interval повторяет копирование, изображая "
+        "задержку репликации."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=None)
+
+    def handle(self, *args, **options):
+        primary = connections[get_setting("READ_REPLICAS")["PRIMARY"]]
+        replicas = [connections[alias] for alias in replica_aliases()]
+        if primary.vendor != "sqlite" or not replicas:
+            raise CommandError("Нужны основная база SQLite и хотя бы одна реплика SQLite.")
+        for replica in replicas:
+            if replica.vendor != "sqlite":
+                raise CommandError(f"{replica.alias}: реплика не SQLite.")
+
+        while True:
+            started = time.monotonic()
+            primary.ensure_connection()
+            for replica in replicas:
+                replica.ensure_connection()
+                primary.connection.backup(replica.connection)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Copied {primary.alias} to {', '.join(r.alias for r in replicas)} "
+                    f"in {time.monotonic() - started:.3f}s."
+                )
+            )
+            if options["interval"] is None:
+                return
+            time.sleep(options["interval"])
@@ -1,9 +1,45 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth.base_user import BaseUserManager
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from . import sharding
+
+# Сколько раз вставлять пользователя с новым id при совпадении id в шарде.
+ID_ATTEMPTS = 3
 
 
 class UserManager(BaseUserManager):
     """Кастомный менеджер для модели User"""
 
+    @classmethod
+    def normalize_email(cls, email):
+        """Приводит email к нижнему регистру целиком, а не только домен."""
+
+        return (email or "").strip().lower()
+
+    def filter_email(self, email):
+        """
+        Пользователи с email без учета регистра.
+        Запрос использует уникальный индекс по LOWER(email),
+        с шардированием - в шарде этого email.
+        """
+
+        email = self.normalize_email(email)
+        return (
+            self.db_manager(hints={"email": email})
+            .alias(email_lower=Lower("email"))
+            .filter(email_lower=email)
+        )
+
+    def filter_pk(self, pk):
+        """Пользователь по id, с шардированием - в шарде этого id."""
+
+        return self.db_manager(hints={"user_id": pk}).filter(pk=pk)
+
+    def get_by_natural_key(self, username):
+        return self.filter_email(username).get()
+
     def create_user(self, email, first_name, last_name, password=None, **extra_fields):
         """Создает и возвращает пользователя."""
 
@@ -23,9 +59,65 @@ class UserManager(BaseUserManager):
             **extra_fields
         )
         user.set_password(password)
-        user.save()
+        self._insert(user)
         return user
 
+    async def acreate_user(self, email, first_name, last_name, password=None, **extra_fields):
+        """Асинхронный вариант create_user()."""
+
+        if email is None:
+            raise ValueError("Users must have an email address.")
+
+        if first_name is None:
+            raise ValueError("Users must have an first_name.")
+
+        if last_name is None:
+            raise ValueError("Users must have an last-name.")
+
+        user = self.model(
+            first_name=first_name,
+            last_name=last_name,
+            email=self.normalize_email(email),
+            **extra_fields
+        )
+        await user.aset_password(password)
+        await sync_to_async(self._insert_in_savepoint)(user)
+        return user
+
+    def _insert_in_savepoint(self, user):
+        """
+        _insert() в точке сохранения, если уже открыта транзакция:
+        ошибка вставки (занятый email) не ломает транзакцию.
+        """
+
+        if not transaction.get_connection(self.db).in_atomic_block:
+            return self._insert(user)
+        with transaction.atomic(using=self.db):
+            self._insert(user)
+
+    def _insert(self, user):
+        """
+        Сохраняет нового пользователя. С шардированием присваивает id
+        со слотом email и при совпадении id повторяет вставку с новым.
+        Email уникален во всех шардах: все пользователи с одним email
+        попадают в один шард и проверяются его индексом.
+        """
+
+        if not sharding.is_enabled():
+            user.save()
+            return
+
+        for attempt in range(ID_ATTEMPTS):
+            user.pk = sharding.new_user_id(user.email)
+            try:
+                # Иначе save() с заданным id начнет с UPDATE.
+                with transaction.atomic(using=sharding.shard_for_id(user.pk)):
+                    user.save(force_insert=True)
+                return
+            except IntegrityError:
+                if attempt == ID_ATTEMPTS - 1 or not self.filter_pk(user.pk).exists():
+                    raise
+
     def create_superuser(self, email, first_name, last_name, password, **extra_fields):
         """Создает и возвращает пользователя с привилегиями суперпользователя."""
 
@@ -38,10 +130,6 @@ class UserManager(BaseUserManager):
         if last_name is None:
             raise ValueError("Users must have an last-name.")
 
-        user = self.create_user(email, first_name, last_name, password, **extra_fields)
-        user.is_superuser = True
-        user.is_active = True
-        user.is_staff = True
-        user.save()
-
-        return user
+        # Флаги передаются в create_user: пользователь создается одним INSERT.
+        extra_fields.update(is_superuser=True, is_active=True, is_staff=True)
+        return self.create_user(email, first_name, last_name, password, **extra_fields)
@@ -0,0 +1,138 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.urls import reverse
+
+from utils.fast_json import FastJSONRenderer
+
+from . import admission, routers
+from .conf import get_setting
+
+
+class AdmissionControlMiddleware:
+    """
+    Допуск дорогих запросов (вход, регистрация) через контроллер
+    из auth_app.admission. Остальные запросы проходят без ограничений.
+
+    Отказ возвращается сразу ответом 503 с Retry-After, собранным
+    обработчиком исключений DRF проекта.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self._paths = None
+
+    @property
+    def paths(self):
+        # URLconf загружается после создания middleware.
+        if self._paths is None:
+            config = get_setting("ADMISSION_CONTROL")
+            self._paths = frozenset(reverse(name) for name in config["URL_NAMES"])
+        return self._paths
+
+    def get_controller(self, request):
+        if request.method != "POST" or request.path_info not in self.paths:
+            return None
+        return admission.get_controller()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        controller = self.get_controller(request)
+        if controller is None:
+            return self.get_response(request)
+        try:
+            controller.acquire()
+        except admission.AdmissionRejected as e:
+            return self.rejected_response(e)
+        try:
+            return self.get_response(request)
+        finally:
+            controller.release()
+
+    async def __acall__(self, request):
+        controller = self.get_controller(request)
+        if controller is None:
+            return await self.get_response(request)
+        try:
+            await controller.aacquire()
+        except admission.AdmissionRejected as e:
+            return self.rejected_response(e)
+        try:
+            return await self.get_response(request)
+        finally:
+            controller.release()
+
+    @staticmethod
+    def rejected_response(exc):
+        from utils.errors_handler import custom_exception_handler
+
+        response = custom_exception_handler(exc, {"view": None})
+        response.accepted_renderer = FastJSONRenderer()
+        response.accepted_media_type = FastJSONRenderer.media_type
+        response.renderer_context = {}
+        return response.render()
+
+
+class ReplicaPinningMiddleware:
+    """
+    Чтение своих записей при чтении с реплик (auth_app.routers.ReplicaRouter).
+
+    Запросы с небезопасными методами и запросы с cookie закрепления
+    читают с основной базы. После записи ставится cookie
+    на READ_REPLICAS["STICKY_SECONDS"] секунд, а для аутентифицированного
+    пользователя - отметка в кэше (auth_app.routers.set_user).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    safe_methods = frozenset(("GET", "HEAD", "OPTIONS"))
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.config = get_setting("READ_REPLICAS")
+
+    def is_pinned(self, request):
+        return (
+            request.method not in self.safe_methods
+            or self.config["COOKIE_NAME"] in request.COOKIES
+        )
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        token = routers.begin_request(self.is_pinned(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = routers.end_request(token)
+        return self.process_response(response, wrote)
+
+    async def __acall__(self, request):
+        token = routers.begin_request(self.is_pinned(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            wrote = routers.end_request(token)
+        return self.process_response(response, wrote)
+
+    def process_response(self, response, wrote):
+        if wrote:
+            response.set_cookie(
+                self.config["COOKIE_NAME"],
+                "1",
+                max_age=self.config["STICKY_SECONDS"],
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
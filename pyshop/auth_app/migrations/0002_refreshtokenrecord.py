@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RefreshTokenRecord',
+            fields=[
+                ('jti_hash', models.BinaryField(max_length=16, primary_key=True, serialize=False, verbose_name='хэш jti')),
+                ('family', models.BinaryField(db_index=True, max_length=16, verbose_name='семейство')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='истекает')),
+                ('status', models.PositiveSmallIntegerField(choices=[(0, 'активен'), (1, 'заменен новым'), (2, 'отозван')], default=0, verbose_name='статус')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='refresh_tokens', to=settings.AUTH_USER_MODEL, verbose_name='пользователь')),
+            ],
+            options={
+                'db_table': 'refresh_token',
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:58
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_case_duplicates(apps, schema_editor):
+    """
+    Останавливает миграцию, если есть email, различающиеся только регистром:
+    ограничение на них не создастся, а какой аккаунт оставить, решает человек.
+    """
+
+    User = apps.get_model("auth_app", "User")
+    users = User.objects.using(schema_editor.connection.alias)
+    duplicates = list(
+        users.annotate(email_lower=Lower("email"))
+        .values("email_lower")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .values_list("email_lower", flat=True)
+    )
+    if not duplicates:
+        return
+
+    groups = [
+        ", ".join(
+            f"{pk}: {email}"
+            for pk, email in users.filter(email__iexact=email).order_by("pk").values_list("pk", "email")
+        )
+        for email in duplicates
+    ]
+    raise RuntimeError(
+        "Пользователи с email, различающимися только регистром (id: email), "
+        "объедините или переименуйте их и повторите миграцию:\n" + "\n".join(groups)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('auth_app', '0003_user_token_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='user_email_lower_uniq'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0004_user_email_lower_uniq'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='refreshtokenrecord',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='refresh_tokens', to=settings.AUTH_USER_MODEL, verbose_name='пользователь'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0005_refreshtokenrecord_user_no_constraint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='is_staff',
+            field=models.BooleanField(default=False, verbose_name='технический персонал'),
+        ),
+    ]
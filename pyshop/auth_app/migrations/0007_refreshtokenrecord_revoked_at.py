@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 21:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_app', '0006_alter_user_is_staff'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='refreshtokenrecord',
+            name='revoked_at',
+            field=models.DateTimeField(db_index=True, null=True, verbose_name='отозван'),
+        ),
+    ]
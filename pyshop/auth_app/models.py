@@ -1,12 +1,18 @@
 from django.db import models
 from django.core.validators import MinLengthValidator
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 
+from . import hashing, user_cache
 from .managers import UserManager
 from .validators import CustomUsernameValidator
 
+# Ограничение уникальности email без учета регистра.
+EMAIL_LOWER_UNIQUE = "user_email_lower_uniq"
+
 
 class User(AbstractUser):
     """Модель пользователя"""
@@ -67,15 +73,184 @@ class User(AbstractUser):
 
     updated_at = models.DateTimeField(verbose_name="дата изменения", auto_now=True)
 
+    token_version = models.PositiveIntegerField(
+        verbose_name="версия токенов", default=0
+    )
+
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["first_name", "last_name"]
     objects = UserManager()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using, fields, from_queryset)
+        self._snapshot(fields)
+
+    def _snapshot(self, fields=None):
+        """Запоминает значения полей, совпадающие с базой."""
+
+        loaded = self.__dict__.setdefault("_loaded_values", {})
+        for field in self._meta.concrete_fields:
+            if fields is not None and field.name not in fields and field.attname not in fields:
+                continue
+            if field.attname in self.__dict__:
+                loaded[field.attname] = self.__dict__[field.attname]
+
+    def get_dirty_fields(self):
+        """
+        Поля, измененные после загрузки из базы или последнего сохранения.
+        Незагруженные (отложенные) поля, к которым не обращались, не учитываются.
+        """
+
+        loaded = self.__dict__.get("_loaded_values", {})
+        return [
+            field.attname
+            for field in self._meta.concrete_fields
+            if not field.primary_key
+            and field.attname in self.__dict__
+            and (field.attname not in loaded or loaded[field.attname] != self.__dict__[field.attname])
+        ]
+
     def save(self, *args, **kwargs):
+        """
+        Сохраняет только измененные поля (и updated_at) одним UPDATE.
+        Если ничего не изменилось, запрос к базе не выполняется
+        и updated_at не меняется.
+
+        Новый пароль, заданный set_password(), увеличивает версию токенов
+        в том же UPDATE: выданные до смены пароля токены отзываются.
+        """
+
+        if self._password is not None and not self._state.adding:
+            self.token_version += 1
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "token_version" not in update_fields:
+                kwargs["update_fields"] = [*update_fields, "token_version"]
+
+        if (
+            not args
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+            and not self._state.adding
+            and "_loaded_values" in self.__dict__
+        ):
+            dirty = self.get_dirty_fields()
+            if not dirty:
+                return
+            kwargs["update_fields"] = [*dirty, "updated_at"]
+
         super().save(*args, **kwargs)
+        self._snapshot(kwargs.get("update_fields"))
+        user_cache.invalidate(self.pk, self._state.db)
+
+    def delete(self, *args, **kwargs):
+        user_cache.invalidate(self.pk, self._state.db)
+        return super().delete(*args, **kwargs)
+
+    def set_password(self, raw_password):
+        """Хэширует пароль в пуле хэширования."""
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+        user_cache.invalidate(self.pk)
+
+    def check_password(self, raw_password):
+        """Проверяет пароль в пуле хэширования."""
+        is_correct, must_update = hashing.verify_password(raw_password, self.password)
+        if is_correct and must_update:
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=["password"])
+        return is_correct
+
+    async def aset_password(self, raw_password):
+        """Асинхронный вариант set_password()."""
+        self.password = await hashing.amake_password(raw_password)
+        self._password = raw_password
+        user_cache.invalidate(self.pk)
+
+    async def acheck_password(self, raw_password):
+        """Асинхронный вариант check_password()."""
+        is_correct, must_update = await hashing.averify_password(
+            raw_password, self.password
+        )
+        if is_correct and must_update:
+            await self.aset_password(raw_password)
+            self._password = None
+            await self.asave(update_fields=["password"])
+        return is_correct
+
+    def revoke_tokens(self):
+        """
+        Делает недействительными все выданные пользователю токены,
+        увеличивая версию токенов одним UPDATE.
+
+        С локальным кэшем пользователей другие процессы увидят новую версию
+        не позже чем через USER_CACHE["TTL"] секунд, с общим кэшем - сразу.
+        """
+        type(self).objects.filter_pk(self.pk).update(
+            token_version=F("token_version") + 1
+        )
+        self.refresh_from_db(fields=["token_version"])
+        user_cache.invalidate(self.pk, self._state.db)
+
+    async def arevoke_tokens(self):
+        """Асинхронный вариант revoke_tokens()."""
+        await type(self).objects.filter_pk(self.pk).aupdate(
+            token_version=F("token_version") + 1
+        )
+        await self.arefresh_from_db(fields=["token_version"])
+        user_cache.invalidate(self.pk, self._state.db)
 
     def __str__(self):
         return self.last_name
 
     class Meta:
         db_table = "user"
+        constraints = [
+            models.UniqueConstraint(Lower("email"), name=EMAIL_LOWER_UNIQUE),
+        ]
+
+
+class RefreshTokenRecord(models.Model):
+    """Выданный токен обновления в компактном виде"""
+
+    ACTIVE = 0
+    ROTATED = 1
+    REVOKED = 2
+    STATUS_CHOICES = (
+        (ACTIVE, "активен"),
+        (ROTATED, "заменен новым"),
+        (REVOKED, "отозван"),
+    )
+
+    jti_hash = models.BinaryField(
+        verbose_name="хэш jti", max_length=16, primary_key=True
+    )
+
+    user = models.ForeignKey(
+        User,
+        verbose_name="пользователь",
+        on_delete=models.CASCADE,
+        related_name="refresh_tokens",
+        # С шардированием пользователь может жить в другой базе.
+        db_constraint=False,
+    )
+
+    family = models.BinaryField(verbose_name="семейство", max_length=16, db_index=True)
+
+    expires_at = models.DateTimeField(verbose_name="истекает", db_index=True)
+
+    status = models.PositiveSmallIntegerField(
+        verbose_name="статус", choices=STATUS_CHOICES, default=ACTIVE
+    )
+
+    # По нему воркеры подтягивают отозванные токены в индекс черного списка.
+    revoked_at = models.DateTimeField(verbose_name="отозван", null=True, db_index=True)
+
+    class Meta:
+        db_table = "refresh_token"
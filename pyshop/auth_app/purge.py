@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+
+from django.db import DatabaseError, connections, router, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from .conf import get_setting
+from .models import RefreshTokenRecord
+
+logger = logging.getLogger(__name__)
+
+
+def table_size(model):
+    """
+    Возвращает (число строк, размер таблицы в байтах).
+    Размер известен для PostgreSQL и для SQLite с модулем dbstat, иначе None.
+    """
+
+    using = router.db_for_write(model)
+    connection = connections[using]
+    table = model._meta.db_table
+    rows = model.objects.using(using).count()
+
+    if connection.vendor == "postgresql":
+        query, params = "SELECT pg_total_relation_size(%s)", [table]
+    elif connection.vendor == "sqlite":
+        query, params = "SELECT SUM(pgsize) FROM dbstat WHERE name = %s", [table]
+    else:
+        return rows, None
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(query, params)
+            size = cursor.fetchone()[0]
+    except DatabaseError:
+        size = None
+    return rows, size
+
+
+def purge_expired_tokens(batch_size=1000, pause=0.1, max_batches=None, cutoff=None):
+    """
+    Удаляет просроченные выданные токены, их записи в черном списке
+    и записи хранилища токенов обновления.
+
+    Строки удаляются пачками по batch_size, каждая пачка - в своей
+    короткой транзакции. Между пачками - пауза pause секунд.
+
+    Прерванный запуск безопасно продолжается повторным вызовом:
+    удаляются только строки с expires_at < cutoff.
+    """
+
+    cutoff = cutoff or timezone.now()
+    using = router.db_for_write(OutstandingToken)
+    started = time.monotonic()
+    report = {
+        "outstanding_before": table_size(OutstandingToken),
+        "blacklisted_before": table_size(BlacklistedToken),
+        "records_before": table_size(RefreshTokenRecord),
+        "outstanding_deleted": 0,
+        "blacklisted_deleted": 0,
+        "records_deleted": 0,
+        "batches": 0,
+    }
+
+    while max_batches is None or report["batches"] < max_batches:
+        ids = list(
+            OutstandingToken.objects.using(using)
+            .filter(expires_at__lt=cutoff)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+
+        with transaction.atomic(using=using):
+            blacklisted, _ = (
+                BlacklistedToken.objects.using(using).filter(token_id__in=ids).delete()
+            )
+            outstanding, _ = (
+                OutstandingToken.objects.using(using).filter(id__in=ids).delete()
+            )
+
+        report["blacklisted_deleted"] += blacklisted
+        report["outstanding_deleted"] += outstanding
+        report["batches"] += 1
+
+        if len(ids) < batch_size:
+            break
+        time.sleep(pause)
+
+    while max_batches is None or report["batches"] < max_batches:
+        keys = list(
+            RefreshTokenRecord.objects.using(using)
+            .filter(expires_at__lt=cutoff)
+            .values_list("jti_hash", flat=True)[:batch_size]
+        )
+        if not keys:
+            break
+
+        with transaction.atomic(using=using):
+            records, _ = (
+                RefreshTokenRecord.objects.using(using)
+                .filter(jti_hash__in=keys)
+                .delete()
+            )
+
+        report["records_deleted"] += records
+        report["batches"] += 1
+
+        if len(keys) < batch_size:
+            break
+        time.sleep(pause)
+
+    report["outstanding_after"] = table_size(OutstandingToken)
+    report["blacklisted_after"] = table_size(BlacklistedToken)
+    report["records_after"] = table_size(RefreshTokenRecord)
+    report["elapsed"] = time.monotonic() - started
+    return report
+
+
+def _run_scheduler(interval, batch_size, pause):
+    while True:
+        time.sleep(interval)
+        try:
+            report = purge_expired_tokens(batch_size=batch_size, pause=pause)
+            logger.info("Expired tokens purged: %s", report)
+        except Exception:
+            logger.exception("Expired tokens purge failed")
+        finally:
+            connections.close_all()
+
+
+def start_scheduler():
+    """
+    Запускает фоновый поток очистки, если он включен в настройках.
+
+    Вызывается в воркере после fork (хук post_fork в gunicorn.conf.py),
+    а не в AppConfig.ready(): ready() выполняется и в управляющих командах,
+    и в родительском процессе автоперезагрузки runserver, и в мастере
+    gunicorn до fork. Без веб-сервера очистку по расписанию выполняет
+    purge_expired_tokens --interval.
+    """
+
+    config = get_setting("TOKEN_PURGE")
+    if not config["SCHEDULE"]:
+        return None
+
+    thread = threading.Thread(
+        target=_run_scheduler,
+        args=(config["INTERVAL"], config["BATCH_SIZE"], config["PAUSE"]),
+        name="expired-tokens-purge",
+        daemon=True,
+    )
+    thread.start()
+    return thread
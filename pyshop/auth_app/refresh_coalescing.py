@@ -0,0 +1,289 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+
+from django.core.cache import caches
+
+from .conf import get_setting
+from .user_cache import LocalBackend
+
+
+class RefreshCoalescer:
+    """
+    Объединение одновременных обновлений одного токена обновления.
+
+    Первый запрос с токеном (лидер) выполняет обновление, остальные ждут
+    его результата и получают те же токены. Результат хранится GRACE
+    секунд, поэтому запросы, пришедшие чуть позже, тоже не выпускают
+    новые токены и не вызывают срабатывание защиты от повторного
+    использования токена обновления.
+
+    Внутри процесса запросы ждут лидера на threading.Event. С общим кэшем
+    лидер между воркерами выбирается через cache.add(), а результат
+    публикуется в кэше. С локальным бэкендом каждый воркер выпускает
+    свои токены, и повторное обновление в другом воркере срабатывает
+    как повторное использование токена, поэтому при нескольких воркерах
+    нужен общий кэш.
+
+    Перед выдачей сохраненного результата вызывающий код заново проверяет
+    токен (check): выход из системы или отзыв токенов действует сразу,
+    а не по окончании GRACE.
+    """
+
+    key_prefix = "auth_app:refresh:"
+    poll_interval = 0.02
+
+    def __init__(self, grace, wait_timeout, max_size, cache_alias=None):
+        self.grace = grace
+        self.wait_timeout = wait_timeout
+        self.shared = caches[cache_alias] if cache_alias else None
+        self.computed = 0
+        self.coalesced = 0
+
+        self._results = LocalBackend(max_size, grace)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(raw_token):
+        return hashlib.sha256(raw_token.encode()).hexdigest()
+
+    def coalesce(self, raw_token, compute, check=None):
+        """
+        Возвращает результат compute() для raw_token, вычисляя его
+        не более одного раза за окно GRACE.
+
+        check() вызывается перед выдачей уже вычисленного результата
+        и выбрасывает исключение, если токен за это время отозван.
+        """
+
+        key = self.get_key(raw_token)
+        result = self._get_result(key)
+        if result is not None:
+            return self._serve(result, check)
+
+        event, is_leader = self._enter(key)
+        if not is_leader:
+            event.wait(self.wait_timeout)
+            result = self._get_result(key)
+            if result is not None:
+                return self._serve(result, check)
+            return self._compute(key, compute)
+
+        locked = False
+        try:
+            if self.shared is not None:
+                locked = self._lock_shared(key)
+                if not locked:
+                    result = self._wait_shared(key)
+                    if result is not None:
+                        return self._serve(result, check)
+            return self._compute(key, compute)
+        finally:
+            self._leave(key, event)
+            if locked:
+                self.shared.delete(self.key_prefix + "lock:" + key)
+
+    async def acoalesce(self, raw_token, acompute, acheck=None):
+        """Асинхронный вариант coalesce(), acompute и acheck - корутинные функции."""
+
+        key = self.get_key(raw_token)
+        result = await self._aget_result(key)
+        if result is not None:
+            return await self._aserve(result, acheck)
+
+        event, is_leader = self._enter(key)
+        if not is_leader:
+            deadline = time.monotonic() + self.wait_timeout
+            while not event.is_set() and time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+            result = await self._aget_result(key)
+            if result is not None:
+                return await self._aserve(result, acheck)
+            return await self._acompute(key, acompute)
+
+        locked = False
+        try:
+            if self.shared is not None:
+                locked = await self._alock_shared(key)
+                if not locked:
+                    result = await self._await_shared(key)
+                    if result is not None:
+                        return await self._aserve(result, acheck)
+            return await self._acompute(key, acompute)
+        finally:
+            self._leave(key, event)
+            if locked:
+                await self.shared.adelete(self.key_prefix + "lock:" + key)
+
+    @staticmethod
+    def _serve(result, check):
+        if check is not None:
+            check()
+        return result
+
+    @staticmethod
+    async def _aserve(result, acheck):
+        if acheck is not None:
+            await acheck()
+        return result
+
+    def _enter(self, key):
+        with self._lock:
+            event = self._in_flight.get(key)
+            if event is not None:
+                return event, False
+            event = self._in_flight[key] = threading.Event()
+            return event, True
+
+    def _leave(self, key, event):
+        with self._lock:
+            self._in_flight.pop(key, None)
+        event.set()
+
+    def _get_result(self, key):
+        result = self._results.get(key)
+        if result is None and self.shared is not None:
+            result = self.shared.get(self.key_prefix + key)
+        return self._hit(result)
+
+    async def _aget_result(self, key):
+        result = self._results.get(key)
+        if result is None and self.shared is not None:
+            result = await self.shared.aget(self.key_prefix + key)
+        return self._hit(result)
+
+    def _hit(self, result):
+        if result is None:
+            return None
+        with self._lock:
+            self.coalesced += 1
+        # Представление изменяет данные ответа, поэтому отдаем копию.
+        return dict(result)
+
+    def _compute(self, key, compute):
+        result = compute()
+        self._store(key, result)
+        if self.shared is not None:
+            self.shared.set(self.key_prefix + key, result, self.grace)
+        return dict(result)
+
+    async def _acompute(self, key, acompute):
+        result = await acompute()
+        self._store(key, result)
+        if self.shared is not None:
+            await self.shared.aset(self.key_prefix + key, result, self.grace)
+        return dict(result)
+
+    def _store(self, key, result):
+        self._results.set(key, dict(result))
+        with self._lock:
+            self.computed += 1
+
+    def _lock_shared(self, key):
+        return self.shared.add(self.key_prefix + "lock:" + key, 1, self.wait_timeout)
+
+    async def _alock_shared(self, key):
+        return await self.shared.aadd(
+            self.key_prefix + "lock:" + key, 1, self.wait_timeout
+        )
+
+    def _wait_shared(self, key):
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            result = self.shared.get(self.key_prefix + key)
+            if result is not None:
+                return self._hit(result)
+            time.sleep(self.poll_interval)
+        return None
+
+    async def _await_shared(self, key):
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            result = await self.shared.aget(self.key_prefix + key)
+            if result is not None:
+                return self._hit(result)
+            await asyncio.sleep(self.poll_interval)
+        return None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "computed": self.computed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._in_flight),
+            }
+
+
+_coalescer = None
+_coalescer_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _coalescer, _coalescer_lock
+    _coalescer = None
+    _coalescer_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_coalescer():
+    """
+    Возвращает объединитель обновлений процесса или None, если он отключен.
+    """
+
+    global _coalescer
+    config = get_setting("REFRESH_COALESCING")
+    if not config["ENABLED"]:
+        return None
+
+    if _coalescer is None:
+        with _coalescer_lock:
+            if _coalescer is None:
+                if config["BACKEND"] == "shared":
+                    cache_alias = config["CACHE_ALIAS"]
+                elif config["BACKEND"] == "local":
+                    cache_alias = None
+                else:
+                    raise ValueError(
+                        f"Unknown refresh coalescing backend: {config['BACKEND']}"
+                    )
+                _coalescer = RefreshCoalescer(
+                    grace=config["GRACE"],
+                    wait_timeout=config["WAIT_TIMEOUT"],
+                    max_size=config["MAX_SIZE"],
+                    cache_alias=cache_alias,
+                )
+    return _coalescer
+
+
+def reset_coalescer():
+    """Сбрасывает объединитель, следующий вызов создаст его по текущим настройкам."""
+
+    global _coalescer
+    with _coalescer_lock:
+        _coalescer = None
+
+
+def coalesce(raw_token, compute, check=None):
+    coalescer = get_coalescer()
+    if coalescer is None:
+        return compute()
+    return coalescer.coalesce(raw_token, compute, check)
+
+
+async def acoalesce(raw_token, acompute, acheck=None):
+    coalescer = get_coalescer()
+    if coalescer is None:
+        return await acompute()
+    return await coalescer.acoalesce(raw_token, acompute, acheck)
+
+
+def stats():
+    """Счетчики объединенных обновлений текущего процесса."""
+
+    coalescer = get_coalescer()
+    return coalescer.stats() if coalescer is not None else None
@@ -0,0 +1,185 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+from . import sharding
+from .conf import get_setting
+
+# Состояние текущего запроса: {"pinned": читать с основной базы,
+# "wrote": в запросе была запись, "user_id": пользователь запроса}.
+# Изменяемый словарь, а не значения ContextVar, чтобы запись
+# из sync_to_async была видна middleware.
+_state = ContextVar("auth_app_replica_state", default=None)
+
+PIN_KEY_PREFIX = "auth_app:replica_pin:"
+
+
+def replica_aliases():
+    config = get_setting("READ_REPLICAS")
+    if config["ALIASES"] is not None:
+        return tuple(config["ALIASES"])
+    return tuple(
+        alias
+        for alias, database in settings.DATABASES.items()
+        if database.get("TEST", {}).get("MIRROR") == config["PRIMARY"]
+    )
+
+
+def begin_request(pinned):
+    """Начинает состояние запроса, возвращает токен для end_request."""
+
+    return _state.set({"pinned": pinned, "wrote": False, "user_id": None})
+
+
+def end_request(token):
+    """
+    Завершает состояние запроса, возвращает True, если в запросе была запись
+    (без реплик записи не отмечаются). После записи аутентифицированного
+    пользователя его запросы читают с основной базы STICKY_SECONDS,
+    в том числе без cookie закрепления и в других воркерах.
+    """
+
+    state = _state.get()
+    _state.reset(token)
+    if not (state and state["wrote"]):
+        return False
+    if state["user_id"] is not None:
+        config = get_setting("READ_REPLICAS")
+        caches[config["CACHE_ALIAS"]].set(
+            f"{PIN_KEY_PREFIX}{state['user_id']}", True, config["STICKY_SECONDS"]
+        )
+    return True
+
+
+def set_user(user_id):
+    """
+    Запоминает пользователя запроса (вызывается при аутентификации).
+    Если он недавно писал в базу, запрос читает с основной базы.
+    """
+
+    state = _state.get()
+    if state is None:
+        return
+    state["user_id"] = user_id
+    if not state["pinned"] and replica_aliases():
+        config = get_setting("READ_REPLICAS")
+        if caches[config["CACHE_ALIAS"]].get(f"{PIN_KEY_PREFIX}{user_id}"):
+            state["pinned"] = True
+
+
+@contextmanager
+def use_primary():
+    """Все чтения внутри блока идут в основную базу."""
+
+    token = begin_request(True)
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def is_pinned():
+    state = _state.get()
+    return bool(state and state["pinned"])
+
+
+def mark_write():
+    """
+    Запись в запросе: дальше запрос и клиент читают с основной базы.
+    Без реплик закреплять чтение не нужно, запись не отмечается.
+    """
+
+    state = _state.get()
+    if state is not None and replica_aliases():
+        state["pinned"] = state["wrote"] = True
+
+
+class ShardRouter:
+    """
+    Пользователи в шардах auth_app.sharding, если SHARDING["ENABLED"].
+
+    Шард выбирается по подсказкам запроса: экземпляру пользователя,
+    user_id (UserManager.filter_pk) или email (UserManager.filter_email).
+    Запросы к пользователям без подсказок и все остальные модели
+    передаются следующим роутерам.
+    """
+
+    def __init__(self):
+        if sharding.is_enabled() and not get_setting("TOKEN_STORE")["ENABLED"]:
+            # OutstandingToken из simplejwt ссылается на пользователя
+            # внешним ключом в базе по умолчанию.
+            raise ImproperlyConfigured("SHARDING требует включенного TOKEN_STORE.")
+
+    def db_for_read(self, model, **hints):
+        if model is not get_user_model() or not sharding.is_enabled():
+            return None
+        instance = hints.get("instance")
+        if isinstance(instance, model):
+            if instance.pk is not None:
+                return sharding.shard_for_id(instance.pk)
+            return sharding.shard_for_email(instance.email)
+        if "user_id" in hints:
+            return sharding.shard_for_id(hints["user_id"])
+        if "email" in hints:
+            return sharding.shard_for_email(hints["email"])
+        return None
+
+    def db_for_write(self, model, **hints):
+        alias = self.db_for_read(model, **hints)
+        if alias is not None:
+            mark_write()
+        return alias
+
+
+class ReplicaRouter:
+    """
+    Чтение моделей из READ_REPLICAS["MODELS"] с реплик, запись и все
+    остальное - в основную базу.
+
+    После записи запрос до конца читает с основной базы (чтение своих
+    записей), следующие запросы клиента - в течение STICKY_SECONDS
+    по cookie, которую ставит ReplicaPinningMiddleware, и по отметке
+    пользователя в кэше CACHE_ALIAS (клиенты только с заголовком
+    Authorization). Внутри транзакции основной базы чтение тоже идет в нее.
+
+    Пользователь при аутентификации (user_cache.get_user) читается
+    с основной базы, записи хранилища токенов (RefreshTokenRecord)
+    в MODELS не входят: отзыв токенов виден сразу.
+    Остальные чтения пользователей (вход по email, выгрузка, время
+    изменения профиля для 304) отстают от записи на задержку реплики.
+    """
+
+    def __init__(self):
+        config = get_setting("READ_REPLICAS")
+        self.primary = config["PRIMARY"]
+        self.replicas = replica_aliases()
+        self.models = frozenset(label.lower() for label in config["MODELS"])
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or model._meta.label_lower not in self.models:
+            return None
+        if is_pinned() or connections[self.primary].in_atomic_block:
+            return self.primary
+        return random.choice(self.replicas)
+
+    def db_for_write(self, model, **hints):
+        mark_write()
+        return self.primary
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {self.primary, *self.replicas}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схему реплик переносит репликация.
+        if db in self.replicas:
+            return False
+        return None
@@ -94,6 +94,22 @@ parameter_authorization = OpenApiParameter(
     required=True,
     default="Bearer ENTER_YOUR_TOKEN_HERE",
 )
+parameter_export_format = OpenApiParameter(
+    name="file_format",
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    enum=["csv", "ndjson", "parquet"],
+    default="csv",
+    description="Формат выгрузки.",
+)
+parameter_export_compress = OpenApiParameter(
+    name="compress",
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    enum=["gzip"],
+    required=False,
+    description="Сжатие выгрузки.",
+)
 
 response_delete_course_204 = inline_serializer(
     name="response_delete_course_204",
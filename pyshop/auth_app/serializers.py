@@ -1,18 +1,68 @@
+from contextlib import nullcontext
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
-from rest_framework_simplejwt.exceptions import TokenError
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
 from django.core.validators import MinLengthValidator, MaxLengthValidator
-from tutorial.quickstart.serializers import UserSerializer
+from django.db import IntegrityError, transaction
 
-from .validators import PasswordValidator, FIOValidator
+from . import refresh_coalescing, user_cache
+from .conf import get_setting
+from .models import EMAIL_LOWER_UNIQUE
+from .tokens import (
+    RefreshToken,
+    check_token_version,
+    rotate_refresh_token,
+    set_user_claims,
+)
+from .validators import RecordValidator, fio_validator, password_validator
 
 USER_MODEL = get_user_model()
 
+DUPLICATE_EMAIL_MESSAGE = "Пользователь с таким email уже существует"
+
+
+def is_duplicate_email(exc):
+    """
+    Проверяет, что IntegrityError - нарушение уникальности email:
+    ограничения EMAIL_LOWER_UNIQUE или уникального столбца email.
+    """
+
+    table = USER_MODEL._meta.db_table
+    cause = exc.__cause__
+    diag = getattr(cause, "diag", None)
+    if diag is not None and diag.constraint_name:
+        # PostgreSQL сообщает имя ограничения: user_email_lower_uniq,
+        # user_email_key или user_email_<hash>_uniq.
+        return diag.constraint_name.startswith(f"{table}_email_")
+
+    # SQLite: "UNIQUE constraint failed: index 'user_email_lower_uniq'"
+    # или "UNIQUE constraint failed: user.email", MySQL: "Duplicate entry
+    # '...' for key 'user.user_email_lower_uniq'" или "'user.email'".
+    message = str(cause or exc)
+    return EMAIL_LOWER_UNIQUE in message or f"{table}.email'" in message or message.endswith(
+        f"{table}.email"
+    )
+
+
+def raise_duplicate_email(exc):
+    """
+    Переводит нарушение уникальности email при вставке
+    в ошибку валидации с прежним сообщением.
+    """
+
+    if is_duplicate_email(exc):
+        raise serializers.ValidationError({"email": [DUPLICATE_EMAIL_MESSAGE]}) from exc
+    raise exc
+
 
 class RegistrationSerializer(serializers.ModelSerializer):
     """
@@ -25,42 +75,50 @@ class RegistrationSerializer(serializers.ModelSerializer):
     """
 
     password = serializers.CharField(
-        write_only=True, validators=[PasswordValidator()], min_length=8
+        write_only=True, validators=[password_validator], min_length=8
     )
     first_name = serializers.CharField(
-        validators=[FIOValidator()], min_length=2, max_length=50
+        validators=[fio_validator], min_length=2, max_length=50
     )
     last_name = serializers.CharField(
-        validators=[FIOValidator()], min_length=2, max_length=50
+        validators=[fio_validator], min_length=2, max_length=50
+    )
+    surname = serializers.CharField(
+        validators=[fio_validator],
+        min_length=2,
+        max_length=50,
+        required=False,
+        allow_blank=True,
     )
 
     class Meta:
         model = USER_MODEL
         fields = ("id", "email", "password", "first_name", "last_name", "surname")
-
-    def validate(self, data):
-        surname = data.get("surname", "")
-        if surname:
-            FIOValidator().validate_fio(surname)
-
-        return data
+        # Без UniqueValidator: он выполняет отдельный запрос exists().
+        extra_kwargs = {"email": {"validators": []}}
 
     def validate_email(self, value):
-        email = value.lower()
-        if USER_MODEL.objects.filter(email=email).exists():
-            raise serializers.ValidationError(
-                "Пользователь с таким email уже существует"
-            )
-        return email
+        return USER_MODEL.objects.normalize_email(value)
 
     def create(self, validated_data):
-        user = USER_MODEL.objects.create_user(
-            email=validated_data["email"],
-            password=validated_data["password"],
-            first_name=validated_data["first_name"],
-            last_name=validated_data["last_name"],
-            surname=validated_data["surname"],
+        # Уникальность email проверяет индекс при вставке, без отдельного запроса.
+        # Точка сохранения нужна, только если уже открыта транзакция.
+        savepoint = (
+            transaction.atomic()
+            if transaction.get_connection().in_atomic_block
+            else nullcontext()
         )
+        try:
+            with savepoint:
+                user = USER_MODEL.objects.create_user(
+                    email=validated_data["email"],
+                    password=validated_data["password"],
+                    first_name=validated_data["first_name"],
+                    last_name=validated_data["last_name"],
+                    surname=validated_data.get("surname", ""),
+                )
+        except IntegrityError as e:
+            raise_duplicate_email(e)
         return user
 
 
@@ -83,20 +141,109 @@ class LogoutSerializer(serializers.Serializer):
         RefreshToken(self.validated_data["refresh"]).blacklist()
 
 
+# Правила регистрации для пакетной проверки (импорт пользователей),
+# построенные по полям RegistrationSerializer, чтобы не расходиться с API.
+REGISTRATION_RULES = RecordValidator.from_serializer(RegistrationSerializer())
+
+
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """
     Кастомный сериализатор для TokenObtainPairView с указанием длины полей.
     """
 
+    token_class = RefreshToken
+
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
 
         self.fields["password"] = serializers.CharField(
             write_only=True,
             required=True,
-            validators=[PasswordValidator()],
+            validators=[password_validator],
             min_length=8,
         )
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Кастомный сериализатор для TokenRefreshView.
+    Claims пользователя в новом токене доступа берутся из базы,
+    а не копируются из токена обновления.
+    Одновременные обновления одного токена объединяются.
+    """
+
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        # Одновременные обновления одним токеном получают один результат.
+        return refresh_coalescing.coalesce(
+            attrs["refresh"],
+            lambda: self.refresh_tokens(attrs),
+            lambda: self.check_refresh(attrs),
+        )
+
+    def check_refresh(self, attrs):
+        """Проверяет, что токен не отозван после выпуска по нему новых токенов."""
+
+        refresh = self.token_class(attrs["refresh"])
+        check_token_version(
+            refresh,
+            user_cache.get_token_version(refresh.payload.get(api_settings.USER_ID_CLAIM)),
+        )
+
+    def refresh_tokens(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user = user_cache.get_user(refresh.payload.get(api_settings.USER_ID_CLAIM))
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"],
+                "no_active_account",
+            )
+        check_token_version(refresh, user.token_version)
+
+        access = refresh.access_token
+        set_user_claims(access, user)
+        data = {"access": str(access)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            data["refresh"] = str(rotate_refresh_token(refresh, user))
+
+        return data
+
+
+class LoginSerializer(serializers.Serializer):
+    """
+    Сериализатор учетных данных для асинхронного входа.
+    """
+
+    email = serializers.CharField(required=True)
+    password = serializers.CharField(
+        write_only=True,
+        required=True,
+        validators=[password_validator],
+        min_length=8,
+    )
+
+class UserSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор данных пользователя.
+    """
+
+    class Meta:
+        model = USER_MODEL
+        fields = (
+            "id",
+            "email",
+            "first_name",
+            "last_name",
+            "surname",
+            "username",
+            "notification",
+            "date_joined",
+        )
+
+
 #
 class UserSerializerInData(serializers.Serializer):
     """
@@ -123,4 +270,24 @@ class UserPatchSerializer(serializers.ModelSerializer):
         )
 
 
+class IntrospectionSerializer(serializers.Serializer):
+    """
+    Сериализатор для пакетной проверки токенов.
+    """
+
+    tokens = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=get_setting("INTROSPECTION")["MAX_TOKENS"],
+    )
+
+
+class IntrospectionResultSerializer(serializers.Serializer):
+    """
+    Результат проверки одного токена.
+    """
 
+    active = serializers.BooleanField()
+    blacklisted = serializers.BooleanField()
+    claims = serializers.DictField(allow_null=True)
+    error = serializers.CharField(allow_null=True)
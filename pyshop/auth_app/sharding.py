@@ -0,0 +1,313 @@
+import hashlib
+import os
+import random
+import threading
+import time
+from contextlib import ExitStack
+from functools import lru_cache
+
+from django.contrib.auth import get_user_model
+from django.db import models, router, transaction
+
+from .conf import get_setting
+
+# Пользователь живет в одном из SLOTS слотов: слот выбирается хэшем
+# нормализованного email и записывается в младшие биты id, поэтому
+# шард находится и по email (вход), и по id (токены). Слоты распределяются
+# по шардам рандеву-хэшированием: при добавлении шарда переезжает
+# примерно 1/N слотов. Число слотов - часть формата id, его нельзя менять.
+SLOT_BITS = 10
+SLOTS = 1 << SLOT_BITS
+# id = миллисекунды с EPOCH_MS | счетчик | слот, всего 53 бита:
+# id остается точным числом в JavaScript.
+COUNTER_BITS = 2
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+
+
+class LegacyUserIds(Exception):
+    """
+    В базах есть пользователи с id, выданными до шардирования: слот id
+    не совпадает со слотом email, и такого пользователя нельзя одновременно
+    найти по id (токены) и по email (вход).
+    """
+
+
+def is_enabled():
+    return get_setting("SHARDING")["ENABLED"]
+
+
+def get_shards():
+    return tuple(get_setting("SHARDING")["SHARDS"])
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+def email_slot(email):
+    """Слот пользователя по нормализованному email."""
+
+    return _hash(email) % SLOTS
+
+
+def id_slot(pk):
+    return pk & (SLOTS - 1)
+
+
+@lru_cache(maxsize=16)
+def slot_table(shards):
+    """Шард каждого слота для списка шардов shards."""
+
+    return tuple(
+        max(shards, key=lambda alias: _hash(f"{alias}:{slot}")) for slot in range(SLOTS)
+    )
+
+
+def shard_for_email(email):
+    """Алиас шарда пользователя с email или None без шардирования."""
+
+    if not is_enabled():
+        return None
+    return slot_table(get_shards())[email_slot(email)]
+
+
+def shard_for_id(pk):
+    """Алиас шарда пользователя с id или None без шардирования."""
+
+    if not is_enabled():
+        return None
+    return slot_table(get_shards())[id_slot(int(pk))]
+
+
+def is_legacy(pk, email):
+    """id выдан до шардирования: слот id не совпадает со слотом email."""
+
+    return id_slot(pk) != email_slot(get_user_model().objects.normalize_email(email))
+
+
+def legacy_users(using, batch_size=1000):
+    """(id, email) пользователей базы using с id, выданными до шардирования."""
+
+    model = get_user_model()
+    last_pk = None
+    while True:
+        queryset = model.objects.using(using).order_by("pk").values_list("pk", "email")
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        batch = list(queryset[:batch_size])
+        if not batch:
+            return
+        last_pk = batch[-1][0]
+        for pk, email in batch:
+            if is_legacy(pk, email):
+                yield pk, email
+
+
+def user_references(model):
+    """
+    Ссылки на пользователя: (модель, столбец, база) для внешних ключей
+    других моделей и таблиц связей многие-ко-многим. None вместо базы -
+    база самого пользователя.
+    """
+
+    references = [
+        (rel.related_model, rel.field.attname, router.db_for_write(rel.related_model))
+        for rel in model._meta.related_objects
+        if not rel.many_to_many
+    ]
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        column = through._meta.get_field(field.m2m_field_name()).attname
+        references.append((through, column, None))
+    return references
+
+
+def rekey_legacy_users(using="default", batch_size=1000):
+    """
+    Выдает пользователям базы using с id до шардирования новые id
+    со слотом email. Ссылки на пользователя (токены, группы, разрешения,
+    журнал админки) переписываются в той же транзакции, внешние ключи
+    проверяются при ее фиксации. Выданные токены содержат старый id:
+    такие пользователи входят заново. Возвращает {старый id: новый id}.
+    """
+
+    from . import user_cache
+
+    model = get_user_model()
+    references = user_references(model)
+    rekeyed = {}
+    for pk, email in list(legacy_users(using, batch_size)):
+        new_pk = new_user_id(model.objects.normalize_email(email))
+        with ExitStack() as stack:
+            for alias in sorted({using, *(db or using for _model, _column, db in references)}):
+                stack.enter_context(transaction.atomic(using=alias))
+            model._base_manager.using(using).filter(pk=pk).update(
+                **{model._meta.pk.attname: new_pk}
+            )
+            for related, column, db in references:
+                related._base_manager.using(db or using).filter(**{column: pk}).update(
+                    **{column: new_pk}
+                )
+        user_cache.invalidate(pk)
+        rekeyed[pk] = new_pk
+    return rekeyed
+
+
+def user_databases():
+    """Базы, в которых лежат пользователи; None - база по умолчанию роутеров."""
+
+    return get_shards() if is_enabled() else (None,)
+
+
+def group_by_shard(items, key=shard_for_id):
+    """
+    Раскладывает items по шардам: {алиас: [элементы]}.
+    Без шардирования все элементы попадают под ключ None.
+    """
+
+    if not is_enabled():
+        return {None: list(items)}
+    groups = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    return groups
+
+
+class IdGenerator:
+    """
+    Уникальные в процессе id со слотом. Если счетчик слота в текущей
+    миллисекунде исчерпан, берется следующая миллисекунда. Начало
+    счетчика случайно, поэтому совпадения между процессами редки,
+    и вставка при совпадении повторяется с новым id.
+    """
+
+    def __init__(self):
+        self._offset = random.getrandbits(COUNTER_BITS)
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    def new_id(self, slot):
+        with self._lock:
+            now = int(time.time() * 1000) - EPOCH_MS
+            last, used = self._slots.get(slot, (-1, 0))
+            if now <= last:
+                if used == 1 << COUNTER_BITS:
+                    now, used = last + 1, 0
+                else:
+                    now = last
+            else:
+                used = 0
+            self._slots[slot] = (now, used + 1)
+            counter = (self._offset + used) & ((1 << COUNTER_BITS) - 1)
+        return (now << (COUNTER_BITS + SLOT_BITS)) | (counter << SLOT_BITS) | slot
+
+
+_generator = IdGenerator()
+
+
+def _reset_after_fork():
+    global _generator
+    _generator = IdGenerator()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def new_user_id(email):
+    return _generator.new_id(email_slot(email))
+
+
+def assign_id(user):
+    """Присваивает новому пользователю id со слотом его email."""
+
+    if is_enabled() and user.pk is None:
+        user.pk = new_user_id(user.email)
+    return user
+
+
+def copy_users(users, using):
+    """
+    Записывает пользователей в базу using как есть, без pre_save
+    (updated_at не меняется), так же как loaddata. Строка, уже
+    измененная в using позже копии, не перезаписывается.
+    Возвращает число записанных строк.
+    """
+
+    model = get_user_model()
+    existing = dict(
+        model.objects.using(using)
+        .filter(pk__in=[user.pk for user in users])
+        .values_list("pk", "updated_at")
+    )
+    fresh = [
+        user for user in users if user.pk not in existing or existing[user.pk] < user.updated_at
+    ]
+    with transaction.atomic(using=using):
+        for user in fresh:
+            models.Model.save_base(user, using=using, raw=True)
+    return len(fresh)
+
+
+def rebalance(shards=None, sources=(), batch_size=1000, copy_only=False, dry_run=False):
+    """
+    Переносит пользователей в шарды по раскладке shards (по умолчанию
+    SHARDS из настроек). Просматриваются базы раскладки и sources
+    (например, выводимый из работы шард), пачками по первичному ключу.
+
+    copy_only копирует пользователей, не удаляя их из старых баз:
+    так новую раскладку можно заполнить до переключения настроек,
+    а после переключения повторным запуском перенести изменения
+    и удалить старые копии.
+
+    Если в базах есть пользователи, созданные до шардирования (слот id
+    не совпадает со слотом email), перенос не начинается: выбрасывается
+    LegacyUserIds. Таким пользователям сначала выдает новые id
+    rekey_legacy_users(). dry_run только считает их в "legacy".
+    Группы и разрешения пользователей не переносятся.
+    """
+
+    model = get_user_model()
+    shards = tuple(shards or get_shards())
+    table = slot_table(shards)
+    started = time.monotonic()
+    report = {"scanned": 0, "moved": {}, "copied": 0, "legacy": 0}
+    sources = tuple(dict.fromkeys((*shards, *sources)))
+
+    if not dry_run:
+        legacy = sum(1 for source in sources for _user in legacy_users(source, batch_size))
+        if legacy:
+            raise LegacyUserIds(f"{legacy} users have ids from before sharding.")
+
+    for source in sources:
+        last_pk = None
+        while True:
+            queryset = model.objects.using(source).order_by("pk")
+            if last_pk is not None:
+                queryset = queryset.filter(pk__gt=last_pk)
+            batch = list(queryset[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            report["scanned"] += len(batch)
+
+            moves = {}
+            for user in batch:
+                target = table[id_slot(user.pk)]
+                if is_legacy(user.pk, user.email):
+                    report["legacy"] += 1
+                if target != source:
+                    moves.setdefault(target, []).append(user)
+
+            for target, users in moves.items():
+                report["moved"][target] = report["moved"].get(target, 0) + len(users)
+                if dry_run:
+                    continue
+                report["copied"] += copy_users(users, target)
+                if not copy_only:
+                    # Без каскада: токены пользователя не переезжают вместе с ним.
+                    model.objects.using(source).filter(
+                        pk__in=[user.pk for user in users]
+                    )._raw_delete(source)
+
+    report["elapsed"] = time.monotonic() - started
+    return report
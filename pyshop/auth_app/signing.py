@@ -0,0 +1,177 @@
+import threading
+from pathlib import Path
+
+import jwt
+from django.utils.translation import gettext_lazy as _
+from jwt import InvalidTokenError, algorithms
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.settings import api_settings
+
+from .conf import get_setting
+
+# Классы PyJWT, которыми ключ переводится в JWK.
+JWK_ALGORITHMS = {
+    "RS256": "RSAAlgorithm",
+    "RS384": "RSAAlgorithm",
+    "RS512": "RSAAlgorithm",
+    "EdDSA": "OKPAlgorithm",
+}
+
+
+class SigningKey:
+    """
+    Ключ из набора ключей подписи.
+    Ключ без закрытой части (выведенный из ротации) только проверяет подпись.
+    """
+
+    def __init__(self, kid, algorithm, pem):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.private_key = None
+
+        prepared = jwt.get_algorithm_by_name(algorithm).prepare_key(pem)
+        if hasattr(prepared, "public_key"):
+            self.private_key = prepared
+            self.public_key = prepared.public_key()
+        else:
+            self.public_key = prepared
+
+    @property
+    def can_sign(self):
+        return self.private_key is not None
+
+    def to_jwk(self):
+        jwk_class = getattr(algorithms, JWK_ALGORITHMS[self.algorithm])
+        jwk = jwk_class.to_jwk(self.public_key, as_dict=True)
+        jwk.update({"kid": self.kid, "alg": self.algorithm, "use": "sig"})
+        return jwk
+
+
+def load_keys(keys_dir, algorithm):
+    """
+    Загружает ключи из файлов <kid>.pem каталога keys_dir.
+    Возвращает словарь kid -> SigningKey.
+    """
+
+    keys = {}
+    for path in sorted(Path(keys_dir).glob("*.pem")):
+        keys[path.stem] = SigningKey(path.stem, algorithm, path.read_bytes())
+    return keys
+
+
+class KeySetTokenBackend(TokenBackend):
+    """
+    Бэкенд токенов с набором асимметричных ключей.
+
+    Токены подписываются активным ключом, его kid записывается в заголовок.
+    Проверка выполняется ключом из заголовка, поэтому токены, подписанные
+    предыдущим ключом, остаются действительными, пока он есть в наборе.
+    """
+
+    def __init__(self, algorithm, keys, active_kid, **kwargs):
+        super().__init__(algorithm, **kwargs)
+        if active_kid not in keys or not keys[active_kid].can_sign:
+            raise TokenBackendError(
+                f"No private signing key with kid '{active_kid}' for {algorithm}"
+            )
+
+        self.keys = keys
+        self.active_key = keys[active_kid]
+        self.signing_key = self.active_key.private_key
+
+    def encode(self, payload):
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload["aud"] = self.audience
+        if self.issuer is not None:
+            jwt_payload["iss"] = self.issuer
+
+        return jwt.encode(
+            jwt_payload,
+            self.signing_key,
+            algorithm=self.algorithm,
+            headers={"kid": self.active_key.kid},
+            json_encoder=self.json_encoder,
+        )
+
+    def get_verifying_key(self, token):
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except InvalidTokenError as ex:
+            raise TokenBackendError(_("Token is invalid or expired")) from ex
+
+        key = self.keys.get(kid)
+        if key is None:
+            raise TokenBackendError(_("Token is invalid or expired"))
+        return key.public_key
+
+    def jwks(self):
+        return {"keys": [key.to_jwk() for key in self.keys.values()]}
+
+
+_token_backend = None
+_token_backend_lock = threading.Lock()
+
+
+def get_token_backend():
+    """
+    Возвращает бэкенд токенов по настройке SIGNING.
+    Для алгоритмов HS* используется стандартный бэкенд simplejwt.
+    """
+
+    global _token_backend
+    if _token_backend is None:
+        with _token_backend_lock:
+            if _token_backend is None:
+                _token_backend = create_token_backend(get_setting("SIGNING"))
+    return _token_backend
+
+
+def create_token_backend(config):
+    algorithm = config["ALGORITHM"]
+    if algorithm.startswith("HS"):
+        from rest_framework_simplejwt.state import token_backend
+
+        return token_backend
+
+    if algorithm not in JWK_ALGORITHMS:
+        raise TokenBackendError(f"Unsupported signing algorithm: {algorithm}")
+
+    keys = load_keys(config["KEYS_DIR"], algorithm)
+    active_kid = config["ACTIVE_KID"]
+    if active_kid is None:
+        # Новый ключ подписывает только после публикации в JWKS, поэтому
+        # при нескольких закрытых ключах активный задается явно.
+        signing_kids = [kid for kid, key in keys.items() if key.can_sign]
+        if len(signing_kids) > 1:
+            raise TokenBackendError(
+                f"ACTIVE_KID is required with several private keys: {', '.join(signing_kids)}"
+            )
+        active_kid = signing_kids[0] if signing_kids else None
+    return KeySetTokenBackend(
+        algorithm,
+        keys,
+        active_kid,
+        audience=api_settings.AUDIENCE,
+        issuer=api_settings.ISSUER,
+        leeway=api_settings.LEEWAY,
+        json_encoder=api_settings.JSON_ENCODER,
+    )
+
+
+def reset_token_backend():
+    """Сбрасывает бэкенд, следующий вызов загрузит ключи заново."""
+
+    global _token_backend
+    with _token_backend_lock:
+        _token_backend = None
+
+
+def jwks():
+    """Открытые ключи набора в формате JWKS."""
+
+    backend = get_token_backend()
+    if isinstance(backend, KeySetTokenBackend):
+        return backend.jwks()
+    return {"keys": []}
@@ -0,0 +1,22 @@
+from django.urls import include, path
+
+from auth_app.async_views import (
+    AsyncGetUserView,
+    AsyncLogoutAPIView,
+    AsyncRegistrationAPIView,
+    AsyncTokenObtainPairView,
+    AsyncTokenRefreshView,
+)
+
+# Асинхронные представления auth_app.urls при ASYNC_AUTH_VIEWS=True.
+auth_patterns = [
+    path("register/", AsyncRegistrationAPIView.as_view(), name="registration"),
+    path("login/", AsyncTokenObtainPairView.as_view(), name="login"),
+    path("refresh/", AsyncTokenRefreshView.as_view(), name="login_refresh"),
+    path("logout/", AsyncLogoutAPIView.as_view(), name="logout"),
+    path("me/", AsyncGetUserView.as_view(), name="get_user"),
+]
+
+urlpatterns = [
+    path("api/", include((auth_patterns, "auth_app"))),
+]
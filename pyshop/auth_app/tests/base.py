@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from auth_app import (
+    admission,
+    blacklist,
+    refresh_coalescing,
+    throttling,
+    token_cache,
+    user_cache,
+)
+
+PASSWORD = "Passw0rd!"
+
+
+def reset_state():
+    """Сбрасывает кэши и счетчики процесса, чтобы тесты не влияли друг на друга."""
+
+    cache.clear()
+    admission.reset_controller()
+    blacklist.reset_index()
+    refresh_coalescing.reset_coalescer()
+    throttling.reset_limiter()
+    token_cache.reset_token_cache()
+    user_cache.reset_user_cache()
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class AuthAppTestCase(TestCase):
+    """
+    Тесты приложения с чистым состоянием процесса.
+    auth_app - разделы AUTH_APP, заменяемые на время теста.
+    """
+
+    auth_app = {}
+
+    def setUp(self):
+        if self.auth_app:
+            override = override_settings(AUTH_APP={**settings.AUTH_APP, **self.auth_app})
+            override.enable()
+            self.addCleanup(override.disable)
+        reset_state()
+        self.addCleanup(reset_state)
+
+    def create_user(self, email="ivan@example.com", password=PASSWORD, **extra_fields):
+        extra_fields.setdefault("is_active", True)
+        return get_user_model().objects.create_user(
+            email, "Иван", "Петров", password, **extra_fields
+        )
+
+    def login(self, email="ivan@example.com", password=PASSWORD, **extra):
+        return self.client.post(
+            "/api/login/",
+            {"email": email, "password": password},
+            content_type="application/json",
+            **extra,
+        )
+
+    def refresh(self, token):
+        self.client.cookies["refreshToken"] = token
+        return self.client.post("/api/refresh/", {}, content_type="application/json")
+
+    def auth_header(self, response):
+        return {"HTTP_AUTHORIZATION": f"Bearer {response.json()['data']['access']}"}
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from auth_app.admission import AdmissionController, AdmissionRejected
+
+
+class AdmissionControllerTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_rejects_when_queue_is_full(self):
+        controller = AdmissionController(max_concurrent=1, queue_size=0)
+        controller.acquire()
+        with self.assertRaises(AdmissionRejected):
+            asyncio.run(controller.aacquire())
+        self.assertEqual(controller.stats()["shed"]["queue_full"], 1)
+
+    def test_async_wait_times_out(self):
+        controller = AdmissionController(max_concurrent=1, queue_timeout=0.05)
+        controller.acquire()
+        with self.assertRaises(AdmissionRejected):
+            asyncio.run(controller.aacquire())
+        stats = controller.stats()
+        self.assertEqual(stats["shed"]["timeout"], 1)
+        self.assertEqual((stats["in_flight"], stats["waiting"]), (1, 0))
+
+    def test_async_waiter_gets_slot_released_from_thread(self):
+        controller = AdmissionController(max_concurrent=1, queue_timeout=5)
+        controller.acquire()
+        threading.Timer(0.05, controller.release).start()
+
+        started = time.monotonic()
+        asyncio.run(controller.aacquire())
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(controller.stats()["in_flight"], 1)
+
+    def test_cancelled_wait_does_not_hold_slot(self):
+        controller = AdmissionController(max_concurrent=1, queue_timeout=5)
+        controller.acquire()
+
+        async def cancel_waiter():
+            waiter = asyncio.create_task(controller.aacquire())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            controller.release()
+            await asyncio.wait_for(controller.aacquire(), 0.1)
+
+        asyncio.run(cancel_waiter())
+        stats = controller.stats()
+        self.assertEqual((stats["in_flight"], stats["waiting"]), (1, 0))
+
+    def test_global_limit_releases_local_slot(self):
+        controller = AdmissionController(
+            max_concurrent=4, global_max_concurrent=1, cache_alias="default"
+        )
+        controller.acquire()
+        with self.assertRaises(AdmissionRejected):
+            controller.acquire()
+        with self.assertRaises(AdmissionRejected):
+            asyncio.run(controller.aacquire())
+        self.assertEqual(controller.stats()["in_flight"], 1)
+        self.assertEqual(cache.get(controller.key), 1)
+
+    def test_cancelled_global_acquire_releases_counter(self):
+        controller = AdmissionController(
+            max_concurrent=4, global_max_concurrent=4, cache_alias="default"
+        )
+
+        async def cancel_acquire():
+            task = asyncio.create_task(controller.aacquire())
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            # Поток с запросом к кэшу завершается уже после отмены.
+            await asyncio.sleep(0.1)
+
+        asyncio.run(cancel_acquire())
+        self.assertEqual(controller.stats()["in_flight"], 0)
+        self.assertEqual(cache.get(controller.key), 0)
+
+    def test_global_counter_outlives_ttl_while_in_use(self):
+        controller = AdmissionController(
+            global_max_concurrent=4, global_ttl=1, cache_alias="default"
+        )
+        controller.acquire()
+        time.sleep(0.6)
+        controller.acquire()
+        time.sleep(0.6)
+        # Без продления ключ истек бы через global_ttl после первого входа.
+        self.assertEqual(cache.get(controller.key), 2)
+        controller.release()
+        controller.release()
+        self.assertEqual(cache.get(controller.key), 0)
@@ -0,0 +1,92 @@
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory, override_settings
+from django.utils.functional import empty
+
+from auth_app import user_cache
+from auth_app.authentication import AsyncJWTAuthentication, CustomJWTAuthentication, LazyUser
+from auth_app.tokens import AccessToken
+
+from .base import AuthAppTestCase
+
+
+class LazyUserTests(AuthAppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user(is_staff=True)
+        self.token = str(AccessToken.for_user(self.user))
+        # Версия токенов берется из кэша пользователей, прогреваем его.
+        user_cache.get_user(self.user.pk)
+
+    def authenticate(self):
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        user, _token = CustomJWTAuthentication().authenticate(request)
+        return user
+
+    def test_request_without_user_fields_makes_no_queries(self):
+        # Проверка прав администратора читает только claims токена.
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                "/api/introspect/",
+                {"tokens": ["a.b.c"]},
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Bearer {self.token}",
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_claims_do_not_load_user(self):
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+            self.assertEqual(
+                (user.pk, user.id, user.is_active, user.is_staff, user.is_authenticated),
+                (self.user.pk, self.user.pk, True, True, True),
+            )
+        self.assertIsInstance(user, LazyUser)
+        self.assertIs(user._wrapped, empty)
+
+    def test_other_field_loads_user(self):
+        user = self.authenticate()
+        user_cache.invalidate(self.user.pk)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, self.user.email)
+            self.assertEqual(user.first_name, self.user.first_name)
+        self.assertIsNot(user._wrapped, empty)
+
+    def test_inactive_claim_is_rejected_without_queries(self):
+        self.user.is_active = False
+        token = str(AccessToken.for_user(self.user))
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/me/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual(response.status_code, 401)
+
+
+class AsyncLazyUserTests(LazyUserTests):
+    def authenticate(self):
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        user, _token = async_to_sync(AsyncJWTAuthentication().aauthenticate)(request)
+        return user
+
+    def test_aload(self):
+        user = self.authenticate()
+        user_cache.invalidate(self.user.pk)
+
+        with self.assertNumQueries(1):
+            loaded = async_to_sync(user.aload)()
+            self.assertEqual(user.email, self.user.email)
+        self.assertEqual(loaded.pk, self.user.pk)
+        self.assertIs(async_to_sync(user.aload)(), loaded)
+
+    def test_profile_is_loaded_asynchronously(self):
+        with override_settings(ASYNC_AUTH_VIEWS=True, ROOT_URLCONF="auth_app.tests.async_urls"):
+            user_cache.invalidate(self.user.pk)
+            headers = {"HTTP_AUTHORIZATION": f"Bearer {self.token}"}
+            response = self.client.get("/api/me/", **headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["data"]["email"], self.user.email)
+
+            response = self.client.put(
+                "/api/me/", {"first_name": "Петр"}, content_type="application/json", **headers
+            )
+            self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Петр")
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from auth_app.blacklist import BlacklistIndex, record_key
+from auth_app.models import RefreshTokenRecord
+
+
+def blacklist(jti, row_id=None):
+    token = OutstandingToken.objects.create(
+        jti=jti, token=jti, expires_at=timezone.now() + timedelta(days=1)
+    )
+    return BlacklistedToken.objects.create(id=row_id, token=token)
+
+
+def revoke_record(key, revoked_at):
+    return RefreshTokenRecord.objects.create(
+        jti_hash=key,
+        user_id=1,
+        family=key,
+        expires_at=timezone.now() + timedelta(days=1),
+        status=RefreshTokenRecord.REVOKED,
+        revoked_at=revoked_at,
+    )
+
+
+class BlacklistIndexTests(TestCase):
+    def make_index(self, sync_overlap):
+        return BlacklistIndex(
+            capacity=100,
+            error_rate=0.001,
+            sync_interval=0,
+            prune_interval=300,
+            sync_overlap=sync_overlap,
+            sync_records=True,
+        )
+
+    def test_sync_loads_new_entries(self):
+        index = self.make_index(sync_overlap=5)
+        blacklist("first")
+        self.assertTrue(index.is_blacklisted("first"))
+        self.assertFalse(index.is_blacklisted("second"))
+
+        blacklist("second")
+        self.assertTrue(index.is_blacklisted("second"))
+
+    def test_sync_rereads_late_committed_ids(self):
+        index = self.make_index(sync_overlap=60)
+        blacklist("early", row_id=1)
+        blacklist("later", row_id=10)
+        index.sync()
+
+        # Транзакция с id 5 зафиксировалась после загрузки id 10.
+        blacklist("late", row_id=5)
+        index.sync()
+        self.assertTrue(index.is_blacklisted("late"))
+
+    def test_sync_loads_revoked_records(self):
+        index = self.make_index(sync_overlap=60)
+        revoke_record(b"a" * 16, timezone.now())
+        index.sync()
+        self.assertTrue(index.might_contain(record_key(b"a" * 16)))
+        self.assertFalse(index.might_contain(record_key(b"b" * 16)))
+
+        # Отзыв зафиксировался после синхронизации, но помечен временем до нее.
+        revoke_record(b"b" * 16, timezone.now() - timedelta(seconds=30))
+        index.sync()
+        self.assertTrue(index.might_contain(record_key(b"b" * 16)))
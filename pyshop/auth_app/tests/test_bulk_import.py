@@ -0,0 +1,99 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from auth_app import bulk_import
+from auth_app.serializers import DUPLICATE_EMAIL_MESSAGE
+
+from .base import PASSWORD, AuthAppTestCase
+
+
+class UserImportAPITests(AuthAppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(bulk_import.reset_pool)
+        self.create_user(email="admin@example.com", is_staff=True)
+        self.headers = self.auth_header(self.login(email="admin@example.com"))
+
+    def upload(self, content, name="users.csv", **params):
+        return self.client.post(
+            "/api/users/import/",
+            {"file": SimpleUploadedFile(name, content.encode())},
+            query_params=params,
+            **self.headers,
+        )
+
+    def test_import_uses_shared_pool(self):
+        content = (
+            "email,password,first_name,last_name\n"
+            f"petr@example.com,{PASSWORD},Петр,Петров\n"
+            f"anna@example.com,{PASSWORD},Анна,Петрова\n"
+        )
+        response = self.upload(content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["created"], 2)
+
+        pool = bulk_import.get_pool()
+        self.upload(content.replace("example.com", "example.org"))
+        self.assertIs(bulk_import.get_pool(), pool)
+        self.assertTrue(
+            get_user_model().objects.get(email="anna@example.org").check_password(PASSWORD)
+        )
+
+    def test_file_format_parameter(self):
+        content = (
+            f'{{"email": "petr@example.com", "password": "{PASSWORD}", '
+            '"first_name": "Петр", "last_name": "Петров"}\n'
+        )
+        response = self.upload(content, name="users.txt", file_format="ndjson")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["created"], 1)
+
+        response = self.upload(content, file_format="xml")
+        self.assertEqual(response.status_code, 400)
+
+
+class UserImporterTests(AuthAppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.errors = []
+        pool = ThreadPoolExecutor(1)
+        self.addCleanup(pool.shutdown)
+        self.importer = bulk_import.UserImporter(
+            batch_size=1,
+            pool=pool,
+            on_error=lambda line, email, errors: self.errors.append((line, errors)),
+        )
+
+    def run_import(self, *emails):
+        content = "email,password,first_name,last_name\n" + "".join(
+            f"{email},{PASSWORD},Петр,Петров\n" for email in emails
+        )
+        return self.importer.run(bulk_import.read_rows(io.StringIO(content), "csv"))
+
+    def test_duplicates_across_batches(self):
+        # Повтор отсекается при проверке, а не построчной вставкой.
+        with mock.patch("auth_app.bulk_import.is_duplicate_email") as is_duplicate:
+            report = self.run_import("petr@example.com", "anna@example.com", "Petr@example.com")
+        is_duplicate.assert_not_called()
+        self.assertEqual((report["created"], report["failed"]), (2, 1))
+        self.assertEqual(self.errors, [(4, [DUPLICATE_EMAIL_MESSAGE])])
+
+    def test_row_fallback_classifies_errors(self):
+        existing = self.create_user("anna@example.com")
+        duplicate = self.importer.build_user(
+            {"email": "anna@example.com", "first_name": "Анна", "last_name": "Петрова"}, ""
+        )
+        other = self.importer.build_user(
+            {"email": "petr@example.com", "first_name": "Петр", "last_name": "Петров"}, ""
+        )
+        other.pk = existing.pk
+        report = {"created": 0, "failed": 0}
+
+        self.importer.insert_group("default", [(2, duplicate), (3, other)], report)
+        self.assertEqual((report["created"], report["failed"]), (0, 2))
+        self.assertEqual(self.errors[0], (2, [DUPLICATE_EMAIL_MESSAGE]))
+        self.assertNotEqual(self.errors[1][1], [DUPLICATE_EMAIL_MESSAGE])
@@ -0,0 +1,24 @@
+import threading
+from io import StringIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+
+
+class SQLiteMaintenanceTests(TransactionTestCase):
+    # Вне транзакции теста: внутри нее checkpoint получает "table is locked".
+
+    def test_command_reports_each_database(self):
+        stdout = StringIO()
+        call_command("sqlite_maintenance", stdout=stdout)
+        self.assertEqual(stdout.getvalue(), "default: not in WAL mode, optimized.\n")
+
+    def test_app_ready_does_not_start_scheduler(self):
+        config = {"SCHEDULE": True, "INTERVAL": 300, "CHECKPOINT_MODE": "PASSIVE"}
+        with override_settings(AUTH_APP={**settings.AUTH_APP, "SQLITE_MAINTENANCE": config}):
+            apps.get_app_config("auth_app").ready()
+        self.assertNotIn(
+            "sqlite-maintenance", [thread.name for thread in threading.enumerate()]
+        )
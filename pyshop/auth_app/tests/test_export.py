@@ -0,0 +1,100 @@
+import csv
+import gzip
+import io
+import json
+import unittest
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+
+from auth_app import export
+from auth_app.tokens import AccessToken
+
+from .base import AuthAppTestCase
+
+USER_MODEL = get_user_model()
+
+
+class ExportTests(AuthAppTestCase):
+    def setUp(self):
+        super().setUp()
+        admin = self.create_user("admin@example.com", is_staff=True)
+        for number in range(6):
+            self.create_user(f"user{number}@example.com", surname=f"Иванович {number}")
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(admin)}"}
+        self.pks = list(USER_MODEL.objects.order_by("pk").values_list("pk", flat=True))
+
+    def download(self, **params):
+        response = self.client.get("/api/users/export/", params, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content)
+
+    def test_chunks_cover_every_row_once(self):
+        for chunk_size in (1, 2, 3, 7, 100):
+            with self.subTest(chunk_size=chunk_size):
+                chunks = list(export.iter_chunks(chunk_size))
+                self.assertTrue(all(len(chunk) <= chunk_size for chunk in chunks))
+                self.assertEqual([row[0] for chunk in chunks for row in chunk], self.pks)
+
+    def test_csv(self):
+        response, content = self.download()
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="users.csv"')
+
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+        self.assertEqual([int(row["id"]) for row in rows], self.pks)
+        self.assertEqual(tuple(rows[0]), export.FIELDS)
+        self.assertEqual(rows[1]["email"], "user0@example.com")
+        self.assertEqual(rows[1]["surname"], "Иванович 0")
+
+    def test_ndjson(self):
+        response, content = self.download(file_format="ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+
+        rows = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual([row["id"] for row in rows], self.pks)
+        user = USER_MODEL.objects.get(email="user0@example.com")
+        expected = {field: getattr(user, field) for field in export.FIELDS}
+        self.assertEqual(rows[1], json.loads(DjangoJSONEncoder().encode(expected)))
+        self.assertEqual(rows[1]["surname"], "Иванович 0")
+
+    def test_gzip(self):
+        for fmt in ("csv", "ndjson"):
+            with self.subTest(fmt=fmt):
+                response, content = self.download(file_format=fmt, compress="gzip")
+                self.assertEqual(
+                    response["Content-Disposition"], f'attachment; filename="users.{fmt}.gz"'
+                )
+                plain = b"".join(export.export_users(fmt))
+                self.assertEqual(gzip.decompress(content), plain)
+
+    @unittest.skipIf(export.pyarrow is None, "pyarrow is not installed")
+    def test_parquet(self):
+        import pyarrow.parquet
+
+        _response, content = self.download(file_format="parquet")
+        table = pyarrow.parquet.read_table(io.BytesIO(content))
+        self.assertEqual(table.column_names, list(export.FIELDS))
+        self.assertEqual(table.column("id").to_pylist(), self.pks)
+
+    def test_parquet_without_pyarrow(self):
+        with mock.patch.object(export, "pyarrow", None):
+            response = self.client.get(
+                "/api/users/export/", {"file_format": "parquet"}, **self.headers
+            )
+            with self.assertRaises(ImportError):
+                list(export.export_users("parquet"))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["message"], ["Формат parquet недоступен на сервере."])
+
+    def test_unknown_format(self):
+        response = self.client.get("/api/users/export/", {"file_format": "xml"}, **self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_non_admin_is_forbidden(self):
+        user = USER_MODEL.objects.get(email="user0@example.com")
+        response = self.client.get(
+            "/api/users/export/", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+        self.assertEqual(response.status_code, 403)
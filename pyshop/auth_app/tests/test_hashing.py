@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from auth_app import hashing
+from auth_app.hashing import HashingExecutor, HashingPoolOverloaded
+
+from .base import AuthAppTestCase
+
+
+class HashingExecutorTests(SimpleTestCase):
+    def make_executor(self, **kwargs):
+        executor = HashingExecutor(**kwargs)
+        self.addCleanup(executor.shutdown)
+        return executor
+
+    def fill(self, executor, count):
+        """Занимает count мест пула задачами, ждущими release.set()."""
+
+        release = threading.Event()
+        threads = [
+            threading.Thread(target=executor.run, args=(release.wait,)) for _ in range(count)
+        ]
+        for thread in threads:
+            thread.start()
+        while executor.stats()["in_flight"] < count:
+            time.sleep(0.001)
+
+        def drain():
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        self.addCleanup(drain)
+        return drain
+
+    def test_saturation_rejects(self):
+        executor = self.make_executor(workers=1, queue_size=1, queue_timeout=0.05)
+        drain = self.fill(executor, 2)
+
+        with self.assertRaises(HashingPoolOverloaded):
+            executor.run(len, "")
+        with self.assertRaises(HashingPoolOverloaded):
+            asyncio.run(executor.arun(len, ""))
+
+        stats = executor.stats()
+        self.assertEqual(
+            (stats["in_flight"], stats["queue_depth"], stats["submitted"], stats["rejected"]),
+            (2, 1, 2, 2),
+        )
+
+        drain()
+        stats = executor.stats()
+        self.assertEqual((stats["in_flight"], stats["queue_depth"], stats["completed"]), (0, 0, 2))
+        # Вторая задача ждала в очереди, пока выполнялась первая.
+        self.assertGreater(stats["wait_max"], 0)
+        self.assertEqual(executor.run(len, "abc"), 3)
+        self.assertEqual(executor.stats()["completed"], 3)
+
+    def test_arun_does_not_block_event_loop(self):
+        executor = self.make_executor(workers=1, queue_size=0, queue_timeout=5)
+
+        async def main():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            # Вторая задача ждет места в пуле, тоже не блокируя цикл.
+            results = await asyncio.gather(
+                executor.arun(time.sleep, 0.1), executor.arun(time.sleep, 0.1)
+            )
+            task.cancel()
+            return ticks, results
+
+        ticks, results = asyncio.run(main())
+        self.assertEqual(results, [None, None])
+        self.assertGreaterEqual(ticks, 10)
+        self.assertEqual(executor.stats()["completed"], 2)
+
+
+class HashingOverloadResponseTests(AuthAppTestCase):
+    auth_app = {"ADMISSION_CONTROL": {"ENABLED": False}}
+
+    def test_overloaded_pool_returns_503(self):
+        self.create_user()
+        executor = HashingExecutor(workers=1, queue_size=0, queue_timeout=0.01)
+        self.addCleanup(executor.shutdown)
+        release = threading.Event()
+        thread = threading.Thread(target=executor.run, args=(release.wait,))
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(release.set)
+        while executor.stats()["in_flight"] < 1:
+            time.sleep(0.001)
+
+        with mock.patch.object(hashing, "get_executor", return_value=executor):
+            response = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertEqual(executor.stats()["rejected"], 1)
+
+
+@override_settings(ASYNC_AUTH_VIEWS=True, ROOT_URLCONF="auth_app.tests.async_urls")
+class AsyncHashingOverloadResponseTests(HashingOverloadResponseTests):
+    pass
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import jwt
+
+from auth_app.tokens import AccessToken, RefreshToken
+
+from .base import AuthAppTestCase
+
+
+class IntrospectionTests(AuthAppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        admin = self.create_user("admin@example.com", is_staff=True)
+        self.headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(admin)}"}
+
+    def introspect(self, *tokens, **headers):
+        return self.client.post(
+            "/api/introspect/",
+            {"tokens": [str(token) for token in tokens]},
+            content_type="application/json",
+            **(headers or self.headers),
+        )
+
+    def get_results(self, *tokens):
+        response = self.introspect(*tokens)
+        self.assertEqual(response.status_code, 200)
+        return response.json()["data"]
+
+    def test_active_tokens(self):
+        refresh = RefreshToken.for_user(self.user)
+        results = self.get_results(refresh.access_token, refresh)
+
+        for result in results:
+            self.assertTrue(result["active"])
+            self.assertFalse(result["blacklisted"])
+            self.assertIsNone(result["error"])
+            self.assertEqual(result["claims"]["user_id"], self.user.pk)
+        self.assertEqual(
+            [result["claims"]["token_type"] for result in results], ["access", "refresh"]
+        )
+
+    def test_expired_token(self):
+        access = AccessToken.for_user(self.user)
+        access.set_exp(lifetime=-timedelta(seconds=1))
+
+        [result] = self.get_results(access)
+        self.assertFalse(result["active"])
+        self.assertIsNone(result["claims"])
+
+    def test_revoked_refresh_token(self):
+        refresh = RefreshToken.for_user(self.user)
+        other = RefreshToken.for_user(self.user)
+        refresh.blacklist()
+
+        revoked, active = self.get_results(refresh, other)
+        self.assertEqual((revoked["active"], revoked["blacklisted"]), (False, True))
+        self.assertEqual(revoked["error"], "Token is blacklisted")
+        self.assertEqual((active["active"], active["blacklisted"]), (True, False))
+
+    def test_tokens_revoked_by_token_version(self):
+        refresh = RefreshToken.for_user(self.user)
+        self.user.revoke_tokens()
+
+        for result in self.get_results(refresh.access_token, refresh):
+            self.assertFalse(result["active"])
+            self.assertFalse(result["blacklisted"])
+            self.assertEqual(result["error"], "Token has been revoked")
+
+    def test_garbage_is_inactive(self):
+        forged = jwt.encode(
+            {"token_type": "access", "jti": "1", "user_id": self.user.pk}, "not-the-secret"
+        )
+        results = self.get_results("not-a-token", "a.b.c", forged)
+        self.assertEqual(len(results), 3)
+        for result in results:
+            self.assertEqual(
+                (result["active"], result["blacklisted"], result["claims"]), (False, False, None)
+            )
+            self.assertIsNotNone(result["error"])
+
+    def test_non_admin_is_forbidden(self):
+        token = AccessToken.for_user(self.user)
+        response = self.introspect(token, HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual(response.status_code, 403)
+
+    def test_anonymous_is_rejected(self):
+        response = self.client.post(
+            "/api/introspect/", {"tokens": ["a.b.c"]}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+class BlacklistIntrospectionTests(IntrospectionTests):
+    # Токены без хранилища отзываются через BlacklistedToken simplejwt.
+    auth_app = {"TOKEN_STORE": {"ENABLED": False}}
@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils import timezone
+
+from .base import AuthAppTestCase
+
+
+class ProfileTests(AuthAppTestCase):
+    auth_app = {"USER_CACHE": {"ENABLED": True, "BACKEND": "local", "TTL": 60}}
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.headers = self.auth_header(self.login())
+
+    def get_profile(self, **extra):
+        return self.client.get("/api/me/", **self.headers, **extra)
+
+    def test_profile_has_validators(self):
+        response = self.get_profile()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["data"],
+            {
+                "id": self.user.pk,
+                "email": "ivan@example.com",
+                "first_name": "Иван",
+                "last_name": "Петров",
+                "surname": "",
+                "username": "",
+                "notification": False,
+                "date_joined": response.json()["data"]["date_joined"],
+            },
+        )
+        self.assertTrue(response["ETag"])
+        self.assertTrue(response["Last-Modified"])
+
+    def test_not_modified(self):
+        etag = self.get_profile()["ETag"]
+        response = self.get_profile(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_changed_profile_is_sent_again(self):
+        etag = self.get_profile()["ETag"]
+        response = self.client.put(
+            "/api/me/", {"first_name": "Петр"}, content_type="application/json", **self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.get_profile(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["data"]["first_name"], "Петр")
+
+    def test_change_in_other_worker_is_not_hidden_by_local_cache(self):
+        etag = self.get_profile()["ETag"]
+        # Изменение в другом воркере не сбрасывает кэш этого процесса.
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            first_name="Петр", updated_at=timezone.now()
+        )
+
+        response = self.get_profile(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["first_name"], "Петр")
+        self.assertEqual(self.get_profile(HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+
+@override_settings(ASYNC_AUTH_VIEWS=True, ROOT_URLCONF="auth_app.tests.async_urls")
+class AsyncProfileTests(ProfileTests):
+    pass
@@ -0,0 +1,32 @@
+import uuid
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from auth_app.models import RefreshTokenRecord
+
+
+class PurgeExpiredTokensTests(TestCase):
+    def test_command_removes_only_expired_records(self):
+        user = get_user_model().objects.create_user(
+            "ivan@example.com", "Иван", "Петров", "Passw0rd!"
+        )
+        now = timezone.now()
+        for key, expires_at in (
+            (b"e" * 16, now - timedelta(days=1)),
+            (b"a" * 16, now + timedelta(days=1)),
+        ):
+            RefreshTokenRecord.objects.create(
+                jti_hash=key, user=user, family=uuid.uuid4().bytes, expires_at=expires_at
+            )
+
+        call_command("purge_expired_tokens", stdout=StringIO())
+
+        self.assertEqual(
+            list(RefreshTokenRecord.objects.values_list("jti_hash", flat=True)),
+            [b"a" * 16],
+        )
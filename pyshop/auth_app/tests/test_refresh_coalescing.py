@@ -0,0 +1,35 @@
+from django.test import override_settings
+
+from .base import AuthAppTestCase
+
+
+class RefreshCoalescingTests(AuthAppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.token = self.login().cookies["refreshToken"].value
+
+    def test_repeated_refresh_gets_same_tokens(self):
+        first = self.refresh(self.token)
+        second = self.refresh(self.token)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.json()["data"], second.json()["data"])
+
+    def test_revoked_tokens_are_not_served_from_grace(self):
+        self.assertEqual(self.refresh(self.token).status_code, 200)
+        self.user.revoke_tokens()
+        self.assertEqual(self.refresh(self.token).status_code, 403)
+
+    def test_logged_out_token_is_not_served_from_grace(self):
+        login = self.login()
+        token = login.cookies["refreshToken"].value
+        self.assertEqual(self.refresh(token).status_code, 200)
+
+        self.client.cookies["refreshToken"] = token
+        self.assertEqual(self.client.post("/api/logout/", **self.auth_header(login)).status_code, 200)
+        self.assertEqual(self.refresh(token).status_code, 403)
+
+
+@override_settings(ASYNC_AUTH_VIEWS=True, ROOT_URLCONF="auth_app.tests.async_urls")
+class AsyncRefreshCoalescingTests(RefreshCoalescingTests):
+    pass
@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase, override_settings
+
+from auth_app.serializers import is_duplicate_email
+
+from .base import PASSWORD, AuthAppTestCase
+
+
+class RegistrationTests(AuthAppTestCase):
+    def register(self, email):
+        return self.client.post(
+            "/api/register/",
+            {"email": email, "password": PASSWORD, "first_name": "Иван", "last_name": "Петров"},
+            content_type="application/json",
+        )
+
+    def test_duplicate_email_in_other_case_is_rejected(self):
+        self.assertEqual(self.register("ivan@example.com").status_code, 201)
+
+        response = self.register("Ivan@Example.com")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"message": ["Пользователь с таким email уже существует"]})
+        # Ошибка вставки не ломает открытую транзакцию теста.
+        self.assertEqual(get_user_model().objects.count(), 1)
+
+    def test_is_duplicate_email(self):
+        user = self.create_user()
+        for email in ("ivan@example.com", "IVAN@example.com"):
+            with self.subTest(email=email), self.assertRaises(IntegrityError) as raised:
+                with transaction.atomic():
+                    self.create_user(email=email)
+            self.assertTrue(is_duplicate_email(raised.exception))
+
+        with self.assertRaises(IntegrityError) as raised:
+            with transaction.atomic():
+                get_user_model()(pk=user.pk, email="petr@example.com").save(force_insert=True)
+        self.assertFalse(is_duplicate_email(raised.exception))
+
+
+@override_settings(ASYNC_AUTH_VIEWS=True, ROOT_URLCONF="auth_app.tests.async_urls")
+class AsyncRegistrationTests(RegistrationTests):
+    pass
+
+
+class EmailConstraintMigrationTests(TransactionTestCase):
+    before = [("auth_app", "0003_user_token_version")]
+    after = [("auth_app", "0004_user_email_lower_uniq")]
+
+    def tearDown(self):
+        get_user_model().objects.all().delete()
+        call_command("migrate", "auth_app", verbosity=0)
+
+    def test_case_duplicates_are_reported(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        User = executor.loader.project_state(self.before).apps.get_model("auth_app", "User")
+        User.objects.create(email="ivan@example.com", first_name="Иван", last_name="Петров")
+        User.objects.create(email="Ivan@Example.com", first_name="Иван", last_name="Петров")
+
+        executor = MigrationExecutor(connection)
+        with self.assertRaisesMessage(RuntimeError, "ivan@example.com"):
+            executor.migrate(self.after)
+
+        User.objects.filter(email="Ivan@Example.com").update(email="ivan2@example.com")
+        MigrationExecutor(connection).migrate(self.after)
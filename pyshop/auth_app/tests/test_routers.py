@@ -0,0 +1,118 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from auth_app import routers, user_cache
+from auth_app.conf import get_setting
+from auth_app.models import RefreshTokenRecord
+
+from .base import AuthAppTestCase
+
+USER_MODEL = get_user_model()
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    # Без транзакции теста: внутри нее чтение идет в основную базу.
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.router = routers.ReplicaRouter()
+        self.router.replicas = ("replica1",)
+        patcher = mock.patch.object(routers, "replica_aliases", return_value=("replica1",))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read_alias(self, model=USER_MODEL):
+        return self.router.db_for_read(model) or "default"
+
+    def test_users_are_read_from_replica(self):
+        token = routers.begin_request(False)
+        self.addCleanup(routers.end_request, token)
+        self.assertEqual(self.read_alias(), "replica1")
+
+    def test_token_records_are_read_from_primary(self):
+        token = routers.begin_request(False)
+        self.addCleanup(routers.end_request, token)
+        self.assertEqual(self.read_alias(RefreshTokenRecord), "default")
+
+    def test_use_primary(self):
+        with routers.use_primary():
+            self.assertEqual(self.read_alias(), "default")
+
+    def test_write_pins_user_in_shared_cache(self):
+        token = routers.begin_request(True)
+        routers.set_user(1)
+        routers.mark_write()
+        self.assertTrue(routers.end_request(token))
+
+        # Следующий запрос пользователя без cookie закрепления.
+        token = routers.begin_request(False)
+        self.addCleanup(routers.end_request, token)
+        routers.set_user(1)
+        self.assertEqual(self.read_alias(), "default")
+
+    def test_other_users_are_not_pinned(self):
+        token = routers.begin_request(True)
+        routers.set_user(1)
+        routers.mark_write()
+        routers.end_request(token)
+
+        token = routers.begin_request(False)
+        self.addCleanup(routers.end_request, token)
+        routers.set_user(2)
+        self.assertEqual(self.read_alias(), "replica1")
+
+    def test_pin_expires(self):
+        token = routers.begin_request(True)
+        routers.set_user(1)
+        routers.mark_write()
+        routers.end_request(token)
+        cache.delete(f"{routers.PIN_KEY_PREFIX}1")
+
+        token = routers.begin_request(False)
+        self.addCleanup(routers.end_request, token)
+        routers.set_user(1)
+        self.assertEqual(self.read_alias(), "replica1")
+
+
+class RequestRoutingTests(AuthAppTestCase):
+    def test_no_pin_cookie_without_replicas(self):
+        self.create_user()
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(get_setting("READ_REPLICAS")["COOKIE_NAME"], response.cookies)
+
+    def test_write_sets_pin_cookie_with_replicas(self):
+        self.create_user()
+        with mock.patch.object(routers, "replica_aliases", return_value=("replica1",)):
+            response = self.login()
+        self.assertIn(get_setting("READ_REPLICAS")["COOKIE_NAME"], response.cookies)
+
+    def test_profile_update_pins_user(self):
+        user = self.create_user()
+        headers = self.auth_header(self.login())
+        with mock.patch.object(routers, "replica_aliases", return_value=("replica1",)):
+            response = self.client.put(
+                "/api/me/", {"first_name": "Петр"}, content_type="application/json", **headers
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(cache.get(f"{routers.PIN_KEY_PREFIX}{user.pk}"))
+
+    def test_authentication_reads_user_from_primary(self):
+        user = self.create_user()
+        user_cache.reset_user_cache()
+        pinned = []
+
+        def db_for_read(router, model, **hints):
+            if model is USER_MODEL:
+                pinned.append(routers.is_pinned())
+            return None
+
+        token = routers.begin_request(False)
+        self.addCleanup(routers.end_request, token)
+        with mock.patch.object(routers.ReplicaRouter, "db_for_read", db_for_read):
+            user_cache.get_user(user.pk)
+        self.assertEqual(pinned, [True])
@@ -0,0 +1,69 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .base import PASSWORD, AuthAppTestCase
+
+USER_MODEL = get_user_model()
+TABLE = USER_MODEL._meta.db_table
+
+
+class SaveQueriesTests(AuthAppTestCase):
+    """Сохранение пользователя выполняет ровно те запросы, что нужны."""
+
+    def assertUpdates(self, queries, *columns):
+        updates = [query["sql"] for query in queries if query["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1, updates)
+        match = re.fullmatch(rf'UPDATE "{TABLE}" SET (.*) WHERE "{TABLE}"."id" = \d+', updates[0])
+        self.assertIsNotNone(match, updates[0])
+        self.assertEqual(re.findall(r'(?:^|, )"(\w+)" = ', match[1]), list(columns))
+
+    def assertSingleInsert(self, queries):
+        self.assertEqual(len(queries), 1, [query["sql"] for query in queries])
+        self.assertTrue(queries[0]["sql"].startswith(f'INSERT INTO "{TABLE}"'))
+
+    def test_create_user_inserts_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            USER_MODEL.objects.create_user("ivan@example.com", "Иван", "Петров", PASSWORD)
+        self.assertSingleInsert(queries)
+
+    def test_create_superuser_inserts_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            USER_MODEL.objects.create_superuser("admin@example.com", "Иван", "Петров", PASSWORD)
+        self.assertSingleInsert(queries)
+
+    def test_unchanged_save_does_not_query(self):
+        user = USER_MODEL.objects.get(pk=self.create_user().pk)
+        with self.assertNumQueries(0):
+            user.save()
+
+    def test_changed_field_is_updated_alone(self):
+        user = USER_MODEL.objects.get(pk=self.create_user().pk)
+        user.first_name = "Петр"
+        with CaptureQueriesContext(connection) as queries:
+            user.save()
+        self.assertEqual(len(queries), 1)
+        self.assertUpdates(queries, "first_name", "updated_at")
+
+
+class ProfileUpdateQueriesTests(AuthAppTestCase):
+    assertUpdates = SaveQueriesTests.assertUpdates
+
+    def test_profile_put_updates_changed_field(self):
+        self.create_user()
+        headers = self.auth_header(self.login())
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(
+                "/api/me/", {"first_name": "Петр"}, content_type="application/json", **headers
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertUpdates(queries, "first_name", "updated_at")
+        self.assertEqual(USER_MODEL.objects.get().first_name, "Петр")
+
+
+@override_settings(ASYNC_AUTH_VIEWS=True, ROOT_URLCONF="auth_app.tests.async_urls")
+class AsyncProfileUpdateQueriesTests(ProfileUpdateQueriesTests):
+    pass
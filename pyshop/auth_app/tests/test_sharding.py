@@ -0,0 +1,105 @@
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from auth_app import sharding
+from auth_app.models import RefreshTokenRecord
+from auth_app.routers import ShardRouter
+
+from .base import AuthAppTestCase
+
+USER_MODEL = get_user_model()
+SHARDED = {"ENABLED": True, "SHARDS": ("default",)}
+
+
+def sharding_settings(**sharding_config):
+    return override_settings(AUTH_APP={**settings.AUTH_APP, "SHARDING": sharding_config})
+
+
+class ShardRoutingTests(SimpleTestCase):
+    def test_user_is_found_by_id_and_by_email_on_same_shard(self):
+        router = ShardRouter()
+        with sharding_settings(ENABLED=True, SHARDS=("default", "shard2")):
+            for number in range(200):
+                email = f"user{number}@example.com"
+                pk = sharding.new_user_id(email)
+                self.assertFalse(sharding.is_legacy(pk, email))
+                self.assertEqual(
+                    router.db_for_read(USER_MODEL, user_id=pk),
+                    router.db_for_read(USER_MODEL, email=email),
+                )
+
+
+class ShardedAuthTests(AuthAppTestCase):
+    auth_app = {"SHARDING": SHARDED, "REFRESH_COALESCING": {"ENABLED": False}}
+
+    def test_new_user_id_has_email_slot(self):
+        user = self.create_user()
+        self.assertEqual(sharding.id_slot(user.pk), sharding.email_slot(user.email))
+
+    def test_logout(self):
+        self.create_user()
+        login = self.login()
+        refresh = login.cookies["refreshToken"].value
+
+        response = self.client.post("/api/logout/", **self.auth_header(login))
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(
+            list(RefreshTokenRecord.objects.values_list("status", flat=True)),
+            [RefreshTokenRecord.REVOKED],
+        )
+        self.assertFalse(OutstandingToken.objects.exists())
+        self.assertFalse(BlacklistedToken.objects.exists())
+        self.assertEqual(self.refresh(refresh).status_code, 403)
+
+
+class LegacyUserTests(AuthAppTestCase):
+    auth_app = {"REFRESH_COALESCING": {"ENABLED": False}}
+
+    def setUp(self):
+        super().setUp()
+        # Пользователь и его токены созданы до включения шардирования.
+        self.user = self.create_user()
+        self.assertTrue(sharding.is_legacy(self.user.pk, self.user.email))
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_rebalance_refuses_legacy_users(self):
+        with sharding_settings(**SHARDED):
+            with self.assertRaises(sharding.LegacyUserIds):
+                sharding.rebalance()
+            report = sharding.rebalance(dry_run=True)
+        self.assertEqual(report["legacy"], 1)
+
+    def test_rekey_rewrites_user_id_and_references(self):
+        rekeyed = sharding.rekey_legacy_users()
+
+        new_pk = rekeyed[self.user.pk]
+        self.assertEqual(list(rekeyed), [self.user.pk])
+        self.assertEqual(sharding.id_slot(new_pk), sharding.email_slot(self.user.email))
+        self.assertFalse(USER_MODEL.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(
+            set(RefreshTokenRecord.objects.values_list("user_id", flat=True)), {new_pk}
+        )
+        self.assertEqual(sharding.rekey_legacy_users(), {})
+
+        with sharding_settings(**SHARDED):
+            self.assertEqual(sharding.rebalance()["legacy"], 0)
+            login = self.login()
+            self.assertEqual(login.status_code, 200)
+            response = self.client.get("/api/me/", **self.auth_header(login))
+        self.assertEqual(response.json()["data"]["id"], new_pk)
+
+    def test_command_rekeys_legacy_users(self):
+        with sharding_settings(**SHARDED):
+            with self.assertRaises(CommandError):
+                call_command("rebalance_user_shards", stdout=StringIO())
+
+            stdout = StringIO()
+            call_command("rebalance_user_shards", "--rekey-legacy", stdout=stdout)
+        self.assertIn("default: assigned new ids to 1 users.", stdout.getvalue())
+        self.assertFalse(USER_MODEL.objects.filter(pk=self.user.pk).exists())
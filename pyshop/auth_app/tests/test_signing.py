@@ -0,0 +1,105 @@
+import tempfile
+from io import StringIO
+
+import jwt
+from django.conf import settings
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework_simplejwt.exceptions import TokenBackendError
+
+from auth_app import signing, token_cache
+
+from .base import AuthAppTestCase
+
+
+class KeySetSigningTests(AuthAppTestCase):
+    def setUp(self):
+        super().setUp()
+        keys_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(keys_dir.cleanup)
+        self.keys_dir = keys_dir.name
+        self.addCleanup(signing.reset_token_backend)
+        self.generate_key("k1")
+        self.use_keys(active_kid=None)
+        self.create_user()
+
+    def generate_key(self, kid):
+        call_command(
+            "generate_signing_key",
+            "--algorithm", "EdDSA",
+            "--keys-dir", self.keys_dir,
+            "--kid", kid,
+            stdout=StringIO(),
+        )
+
+    def use_keys(self, active_kid):
+        config = {
+            "ALGORITHM": "EdDSA",
+            "KEYS_DIR": self.keys_dir,
+            "ACTIVE_KID": active_kid,
+            "JWKS_MAX_AGE": 600,
+        }
+        override = override_settings(
+            AUTH_APP={**settings.AUTH_APP, **self.auth_app, "SIGNING": config}
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        signing.reset_token_backend()
+        # Проверенные токены не должны браться из кэша прежнего набора ключей.
+        token_cache.reset_token_cache()
+
+    def get_me(self, access):
+        return self.client.get("/api/me/", HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def test_eddsa_tokens_are_signed_and_verified(self):
+        access = self.login().json()["data"]["access"]
+
+        header = jwt.get_unverified_header(access)
+        self.assertEqual((header["alg"], header["kid"]), ("EdDSA", "k1"))
+        self.assertEqual(self.get_me(access).status_code, 200)
+
+    def test_old_key_verifies_after_rotation(self):
+        old_access = self.login().json()["data"]["access"]
+
+        self.generate_key("k2")
+        self.use_keys(active_kid="k2")
+        new_access = self.login().json()["data"]["access"]
+
+        self.assertEqual(jwt.get_unverified_header(new_access)["kid"], "k2")
+        self.assertEqual(self.get_me(old_access).status_code, 200)
+        self.assertEqual(self.get_me(new_access).status_code, 200)
+
+        # Выведенный из ротации ключ только проверяет подпись.
+        call_command(
+            "generate_signing_key", "--keys-dir", self.keys_dir, "--retire", "k1", stdout=StringIO()
+        )
+        self.use_keys(active_kid="k2")
+        self.assertEqual(self.get_me(old_access).status_code, 200)
+        self.assertFalse(signing.get_token_backend().keys["k1"].can_sign)
+
+    def test_new_key_does_not_sign_without_active_kid(self):
+        self.generate_key("k2")
+        self.use_keys(active_kid=None)
+        with self.assertRaises(TokenBackendError):
+            signing.get_token_backend()
+
+    def test_jwks(self):
+        self.generate_key("k2")
+        self.use_keys(active_kid="k1")
+
+        response = self.client.get("/.well-known/jwks.json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "public, max-age=600")
+
+        keys = response.json()["keys"]
+        self.assertEqual([key["kid"] for key in keys], ["k1", "k2"])
+        for key in keys:
+            self.assertEqual(
+                (key["kty"], key["crv"], key["alg"], key["use"]), ("OKP", "Ed25519", "EdDSA", "sig")
+            )
+            self.assertNotIn("d", key)
+
+        access = self.login().json()["data"]["access"]
+        public_key = jwt.PyJWK(keys[0]).key
+        claims = jwt.decode(access, public_key, algorithms=["EdDSA"])
+        self.assertEqual(claims["token_type"], "access")
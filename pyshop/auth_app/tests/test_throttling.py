@@ -0,0 +1,96 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from auth_app.throttling import LocalWindows, LoginLimiter, SharedWindows
+
+from .base import AuthAppTestCase
+
+WRONG_PASSWORD = "Wr0ngpass!"
+
+
+class LoginThrottleTests(AuthAppTestCase):
+    auth_app = {
+        "LOGIN_THROTTLE": {"BACKEND": "local", "WINDOW": 300, "IP_LIMIT": 6, "EMAIL_LIMIT": 3},
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.create_user()
+
+    def test_email_limit_across_ips(self):
+        for number in range(3):
+            response = self.login(password=WRONG_PASSWORD, REMOTE_ADDR=f"10.0.0.{number}")
+            self.assertEqual(response.status_code, 401)
+
+        response = self.login(REMOTE_ADDR="192.168.0.1")
+        self.assertEqual(response.status_code, 429)
+        self.assertLessEqual(int(response["Retry-After"]), 600)
+        self.assertEqual(self.login("petr@example.com", REMOTE_ADDR="192.168.0.1").status_code, 401)
+
+    def test_ip_limit(self):
+        for number in range(6):
+            self.login(f"user{number}@example.com", WRONG_PASSWORD)
+        self.assertEqual(self.login().status_code, 429)
+
+    def test_non_string_email_is_counted(self):
+        for _attempt in range(3):
+            response = self.client.post(
+                "/api/login/",
+                {"email": 12345, "password": WRONG_PASSWORD},
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 401)
+
+        response = self.client.post(
+            "/api/login/",
+            {"email": 12345, "password": WRONG_PASSWORD},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 429)
+
+
+@override_settings(ASYNC_AUTH_VIEWS=True, ROOT_URLCONF="auth_app.tests.async_urls")
+class AsyncLoginThrottleTests(LoginThrottleTests):
+    pass
+
+
+class RetryAfterTests(SimpleTestCase):
+    window = 100
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def assertRetryAfter(self, limiter, failures, now):
+        """Через Retry-After попытка разрешена, секундой раньше - еще нет."""
+
+        for at in failures:
+            limiter.record_failure("10.0.0.1", None, now=at)
+        retry_after = limiter.check("10.0.0.1", None, now=now)
+        self.assertIsNotNone(retry_after)
+        self.assertIsNotNone(limiter.check("10.0.0.1", None, now=now + retry_after - 1))
+        self.assertIsNone(limiter.check("10.0.0.1", None, now=now + retry_after))
+        return retry_after
+
+    def make_limiters(self):
+        return (
+            LoginLimiter(LocalWindows(self.window, 100), ip_limit=4, email_limit=4),
+            LoginLimiter(SharedWindows(self.window, "default"), ip_limit=4, email_limit=4),
+        )
+
+    def test_limit_reached_in_current_window(self):
+        for limiter in self.make_limiters():
+            with self.subTest(backend=type(limiter.windows).__name__):
+                # Ниже предела оценка опустится только после того, как
+                # доля окна 100-200 станет меньше 4/6.
+                self.assertEqual(
+                    self.assertRetryAfter(limiter, [110] * 6, now=120), 80 + 34
+                )
+
+    def test_limit_reached_with_previous_window(self):
+        for limiter in self.make_limiters():
+            with self.subTest(backend=type(limiter.windows).__name__):
+                # 2 + 4 * (1 - offset / 100) < 4 при offset > 50.
+                self.assertEqual(
+                    self.assertRetryAfter(limiter, [50] * 4 + [110] * 2, now=110), 41
+                )
@@ -0,0 +1,56 @@
+import hashlib
+import time
+from datetime import timedelta
+from unittest import mock
+
+from rest_framework_simplejwt.backends import TokenBackend
+
+from auth_app import token_cache
+from auth_app.tokens import AccessToken
+
+from .base import AuthAppTestCase
+
+
+class VerifiedTokenCacheTests(AuthAppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.cache = token_cache.get_token_cache()
+
+    def get_me(self, token):
+        return self.client.get("/api/me/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_keyed_by_sha256(self):
+        token = AccessToken.for_user(self.user)
+        raw_token = str(token)
+        self.cache.set(raw_token, token)
+
+        key = hashlib.sha256(raw_token.encode()).digest()
+        self.assertEqual(list(self.cache.backend._data), [key])
+        self.assertEqual(self.cache.get(raw_token.encode())[1], token.payload)
+
+    def test_hit_skips_signature_verification(self):
+        token = str(AccessToken.for_user(self.user))
+        self.assertEqual(self.get_me(token).status_code, 200)
+
+        with mock.patch.object(TokenBackend, "decode", side_effect=AssertionError) as decode:
+            self.assertEqual(self.get_me(token).status_code, 200)
+        decode.assert_not_called()
+        self.assertEqual((self.cache.stats()["hits"], self.cache.stats()["misses"]), (1, 1))
+
+    def test_expired_token_is_not_served(self):
+        token = AccessToken.for_user(self.user)
+        token.set_exp(lifetime=timedelta(seconds=1))
+        token = str(token)
+        self.assertEqual(self.get_me(token).status_code, 200)
+        self.assertIsNotNone(self.cache.get(token))
+
+        time.sleep(1.1)
+        self.assertIsNone(self.cache.get(token))
+        self.assertEqual(self.get_me(token).status_code, 401)
+
+    def test_expired_token_is_not_cached(self):
+        token = AccessToken.for_user(self.user)
+        token.set_exp(lifetime=-timedelta(seconds=1))
+        self.cache.set(str(token), token)
+        self.assertEqual(len(self.cache.backend), 0)
@@ -0,0 +1,139 @@
+from unittest import mock
+
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from auth_app import blacklist, token_store
+from auth_app.models import RefreshTokenRecord
+
+from .base import PASSWORD, AuthAppTestCase
+
+
+class RefreshTokenStoreTests(AuthAppTestCase):
+    auth_app = {"REFRESH_COALESCING": {"ENABLED": False}}
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+
+    def test_logout_revokes_token_in_store_only(self):
+        login = self.login()
+        refresh = login.cookies["refreshToken"].value
+
+        response = self.client.post("/api/logout/", **self.auth_header(login))
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(
+            list(RefreshTokenRecord.objects.values_list("status", flat=True)),
+            [RefreshTokenRecord.REVOKED],
+        )
+        self.assertFalse(OutstandingToken.objects.exists())
+        self.assertFalse(BlacklistedToken.objects.exists())
+        self.assertEqual(self.refresh(refresh).status_code, 403)
+
+    def test_reused_refresh_token_revokes_family(self):
+        first = self.login().cookies["refreshToken"].value
+        response = self.refresh(first)
+        self.assertEqual(response.status_code, 200)
+        second = response.cookies["refreshToken"].value
+
+        # Замененный токен предъявлен снова - вероятно, он украден.
+        self.assertEqual(self.refresh(first).status_code, 403)
+        self.assertEqual(self.refresh(second).status_code, 403)
+        self.assertEqual(
+            set(RefreshTokenRecord.objects.values_list("status", flat=True)),
+            {RefreshTokenRecord.REVOKED},
+        )
+
+    def test_logout_with_rotated_token_revokes_family(self):
+        login = self.login()
+        first = login.cookies["refreshToken"].value
+        second = self.refresh(first).cookies["refreshToken"].value
+
+        self.client.cookies["refreshToken"] = first
+        response = self.client.post("/api/logout/", **self.auth_header(login))
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.refresh(second).status_code, 403)
+        self.assertEqual(
+            set(RefreshTokenRecord.objects.values_list("status", flat=True)),
+            {RefreshTokenRecord.REVOKED},
+        )
+
+
+class RefreshTokenStoreWithoutIndexTests(RefreshTokenStoreTests):
+    auth_app = {"REFRESH_COALESCING": {"ENABLED": False}, "BLACKLIST_INDEX": {"ENABLED": False}}
+
+
+class RefreshTokenStoreIndexTests(AuthAppTestCase):
+    auth_app = {"REFRESH_COALESCING": {"ENABLED": False}}
+
+    def setUp(self):
+        super().setUp()
+        self.create_user()
+
+    def test_active_token_is_not_looked_up_in_store(self):
+        refresh = self.login().cookies["refreshToken"].value
+        with mock.patch.object(token_store, "get_status", side_effect=AssertionError):
+            self.assertEqual(self.refresh(refresh).status_code, 200)
+
+    def test_token_revoked_by_other_worker(self):
+        refresh = self.login().cookies["refreshToken"].value
+        index = blacklist.get_index()
+        index.sync()
+
+        RefreshTokenRecord.objects.update(
+            status=RefreshTokenRecord.REVOKED, revoked_at=timezone.now()
+        )
+        index.sync()
+        self.assertEqual(self.refresh(refresh).status_code, 403)
+
+
+class PasswordChangeTests(AuthAppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+
+    def test_password_change_revokes_issued_tokens(self):
+        login = self.login()
+        refresh = login.cookies["refreshToken"].value
+
+        user = type(self.user).objects.get(pk=self.user.pk)
+        user.set_password("N3wPassw0rd!")
+        user.save()
+
+        self.assertEqual(self.client.get("/api/me/", **self.auth_header(login)).status_code, 401)
+        self.assertEqual(self.refresh(refresh).status_code, 403)
+        self.assertEqual(self.login(password="N3wPassw0rd!").status_code, 200)
+
+    def test_password_rehash_keeps_tokens(self):
+        user = type(self.user).objects.get(pk=self.user.pk)
+        with self.settings(
+            PASSWORD_HASHERS=[
+                "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+                "django.contrib.auth.hashers.MD5PasswordHasher",
+            ]
+        ):
+            self.assertTrue(user.check_password(PASSWORD))
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_"))
+        self.assertEqual(user.token_version, 0)
+
+
+class RefreshRequestTests(AuthAppTestCase):
+    def test_non_object_body_is_rejected(self):
+        self.create_user()
+        self.client.cookies["refreshToken"] = self.login().cookies["refreshToken"].value
+
+        response = self.client.post("/api/refresh/", ["refresh"], content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(), {"message": ["Invalid data. Expected a dictionary, but got list."]}
+        )
+
+
+@override_settings(ASYNC_AUTH_VIEWS=True, ROOT_URLCONF="auth_app.tests.async_urls")
+class AsyncRefreshRequestTests(RefreshRequestTests):
+    pass
@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+
+from auth_app import user_cache
+
+from .base import AuthAppTestCase
+
+
+class LocalUserCacheTests(AuthAppTestCase):
+    auth_app = {"USER_CACHE": {"ENABLED": True, "BACKEND": "local", "TTL": 60}}
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+
+    def test_get_user_fills_cache(self):
+        user_cache.get_user(self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(user_cache.get_user(self.user.pk).email, "ivan@example.com")
+
+    def test_fill_after_invalidation_is_dropped(self):
+        # Чтение из базы началось до сохранения в другом запросе.
+        generation = user_cache.get_generation(self.user.pk)
+        stale = get_user_model().objects.get(pk=self.user.pk)
+
+        self.user.first_name = "Петр"
+        self.user.save()
+        user_cache.cache_user(stale, generation)
+
+        self.assertIsNone(user_cache.get_cached_user(self.user.pk))
+        self.assertEqual(user_cache.get_user(self.user.pk).first_name, "Петр")
+
+    def test_save_in_transaction_invalidates_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = "Петр"
+            self.user.save()
+            # До фиксации другой запрос положил в кэш строку.
+            user_cache.cache_user(get_user_model().objects.get(pk=self.user.pk))
+
+        self.assertIsNone(user_cache.get_cached_user(self.user.pk))
+
+
+class SharedUserCacheTests(LocalUserCacheTests):
+    auth_app = {"USER_CACHE": {"ENABLED": True, "BACKEND": "shared", "TTL": 60}}
@@ -0,0 +1,34 @@
+from django.test import SimpleTestCase
+
+from auth_app.serializers import REGISTRATION_RULES, RegistrationSerializer
+
+VALID = {
+    "email": "ivan@example.com",
+    "password": "Passw0rd!",
+    "first_name": "Иван",
+    "last_name": "Петров",
+    "surname": "Иванович",
+}
+
+
+class RegistrationRulesTests(SimpleTestCase):
+    def test_rules_agree_with_serializer(self):
+        records = [
+            VALID,
+            {**VALID, "surname": ""},
+            {key: value for key, value in VALID.items() if key != "surname"},
+            {**VALID, "email": "not-an-email"},
+            {**VALID, "password": "password"},
+            {**VALID, "first_name": "И"},
+            {**VALID, "last_name": "Петров1"},
+            {**VALID, "surname": "Иванович2"},
+            {**VALID, "surname": "И"},
+            {**VALID, "first_name": "Иван\x00"},
+            {key: value for key, value in VALID.items() if key != "email"},
+        ]
+        for record in records:
+            with self.subTest(record=record):
+                serializer = RegistrationSerializer(data=record)
+                serializer.is_valid()
+                _data, errors = REGISTRATION_RULES.validate(record)
+                self.assertEqual(set(errors), set(serializer.errors))
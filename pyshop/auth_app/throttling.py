@@ -0,0 +1,280 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+from .conf import get_setting
+
+
+class LocalWindows:
+    """
+    Счетчики скользящего окна в памяти процесса.
+
+    Для ключа хранятся номер текущего окна и суммы за текущее и предыдущее
+    окна. Оценка за последние window секунд: сумма за текущее окно плюс
+    доля предыдущего, еще попадающая в скользящее окно. Проверка и
+    добавление - O(1), число ключей ограничено max_size (LRU).
+    """
+
+    def __init__(self, window, max_size):
+        self.window = window
+        self.max_size = max_size
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, key, index):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] != index:
+            # Окно сменилось: текущее стало предыдущим или оба устарели.
+            entry[:] = [index, 0, entry[1] if entry[0] == index - 1 else 0]
+        return entry
+
+    def get(self, key, now):
+        """Суммы за текущее и предыдущее окна."""
+
+        with self._lock:
+            entry = self._entry(key, now // self.window)
+            if entry is None:
+                return 0, 0
+            return entry[1], entry[2]
+
+    def add(self, key, cost, now):
+        index = now // self.window
+        with self._lock:
+            entry = self._entry(key, index)
+            if entry is None:
+                self._data[key] = [index, cost, 0]
+                while len(self._data) > self.max_size:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+            else:
+                entry[1] += cost
+                self._data.move_to_end(key)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SharedWindows:
+    """
+    Счетчики скользящего окна в общем кэше Django, общие для всех воркеров.
+    На каждое окно ключа - отдельная запись с временем жизни в два окна.
+    """
+
+    key_prefix = "auth_app:throttle:"
+
+    def __init__(self, window, alias):
+        self.window = window
+        self.cache = caches[alias]
+        self.evictions = 0
+
+    def _keys(self, key, index):
+        return f"{self.key_prefix}{key}:{index}", f"{self.key_prefix}{key}:{index - 1}"
+
+    def get(self, key, now):
+        """Суммы за текущее и предыдущее окна."""
+
+        current, previous = self._keys(key, int(now // self.window))
+        values = self.cache.get_many([current, previous])
+        return values.get(current, 0), values.get(previous, 0)
+
+    def add(self, key, cost, now):
+        current, _previous = self._keys(key, int(now // self.window))
+        if not self.cache.add(current, cost, self.window * 2):
+            try:
+                self.cache.incr(current, cost)
+            except ValueError:
+                self.cache.set(current, cost, self.window * 2)
+
+    def __len__(self):
+        return 0
+
+
+class LoginLimiter:
+    """
+    Ограничение неудачных входов по IP-адресу клиента и по email.
+
+    Проверяется до сериализатора, поэтому отклоненный запрос не хэширует
+    пароль. Учитываются только неудачные попытки (каждая стоила одного
+    хэширования), их стоимость - cost. Счетчик email общий для всех
+    адресов: подбор пароля одной учетной записи с многих IP ограничен
+    так же, как с одного. Чтобы чужие попытки реже блокировали вход
+    владельцу, предел email выше обычного числа его ошибок.
+    """
+
+    def __init__(self, windows, ip_limit, email_limit, cost=1):
+        self.windows = windows
+        self.limits = {"ip": ip_limit, "email": email_limit}
+        self.cost = cost
+        self.allowed = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_keys(ident, email):
+        keys = [("ip", f"ip:{ident}")]
+        if isinstance(email, str) and email:
+            email = get_user_model().objects.normalize_email(email)
+            keys.append(("email", f"email:{email}"))
+        return keys
+
+    def check(self, ident, email, now=None):
+        """
+        Возвращает None, если попытка разрешена, иначе через сколько
+        секунд ее можно повторить.
+        """
+
+        now = time.time() if now is None else now
+        retry_after = None
+        for kind, key in self.get_keys(ident, email):
+            current, previous = self.windows.get(key, now)
+            wait = self.get_wait(current, previous, now % self.windows.window, self.limits[kind])
+            if wait is not None:
+                retry_after = max(wait, retry_after or 0)
+        if retry_after is not None:
+            with self._lock:
+                self.throttled += 1
+            return retry_after
+        with self._lock:
+            self.allowed += 1
+        return None
+
+    def get_wait(self, current, previous, offset, limit):
+        """
+        None, если оценка скользящего окна ниже limit, иначе через сколько
+        секунд она опустится ниже него без новых неудачных попыток.
+        """
+
+        window = self.windows.window
+        if current + previous * (1 - offset / window) < limit:
+            return None
+        if current < limit:
+            # Оценка убывает вместе с долей предыдущего окна.
+            wait = window * (1 - (limit - current) / previous) - offset
+        else:
+            # Ниже предела оценка опустится только в следующем окне,
+            # когда текущее окно станет предыдущим.
+            wait = window - offset + window * (1 - limit / current if current else 1)
+        return math.floor(wait) + 1
+
+    def record_failure(self, ident, email, now=None):
+        now = time.time() if now is None else now
+        for _kind, key in self.get_keys(ident, email):
+            self.windows.add(key, self.cost, now)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": type(self.windows).__name__,
+                "size": len(self.windows),
+                "evictions": self.windows.evictions,
+                "allowed": self.allowed,
+                "throttled": self.throttled,
+            }
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _limiter, _limiter_lock
+    _limiter = None
+    _limiter_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_limiter():
+    """
+    Возвращает ограничитель входов процесса или None, если он отключен.
+    """
+
+    global _limiter
+    config = get_setting("LOGIN_THROTTLE")
+    if not config["ENABLED"]:
+        return None
+
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                if config["BACKEND"] == "shared":
+                    windows = SharedWindows(config["WINDOW"], config["CACHE_ALIAS"])
+                elif config["BACKEND"] == "local":
+                    windows = LocalWindows(config["WINDOW"], config["MAX_SIZE"])
+                else:
+                    raise ValueError(f"Unknown login throttle backend: {config['BACKEND']}")
+                _limiter = LoginLimiter(
+                    windows,
+                    ip_limit=config["IP_LIMIT"],
+                    email_limit=config["EMAIL_LIMIT"],
+                    cost=config["FAILURE_COST"],
+                )
+    return _limiter
+
+
+def reset_limiter():
+    """Сбрасывает ограничитель, следующий вызов создаст его по текущим настройкам."""
+
+    global _limiter
+    with _limiter_lock:
+        _limiter = None
+
+
+def get_ident(request):
+    """IP-адрес клиента с учетом NUM_PROXIES, как в троттлинге DRF."""
+
+    return BaseThrottle().get_ident(request)
+
+
+def get_login_email(data):
+    """
+    Email из тела запроса входа, приведенный к строке так же, как его
+    приводит CharField сериализатора, или None.
+    """
+
+    email = data.get("email") if isinstance(data, dict) else None
+    if isinstance(email, bool) or not isinstance(email, (str, int, float)):
+        return None
+    return str(email)
+
+
+def check_login(request, email):
+    limiter = get_limiter()
+    return limiter.check(get_ident(request), email) if limiter is not None else None
+
+
+def record_login_failure(request, email):
+    limiter = get_limiter()
+    if limiter is not None:
+        limiter.record_failure(get_ident(request), email)
+
+
+def stats():
+    """Счетчики ограничителя входов текущего процесса."""
+
+    limiter = get_limiter()
+    return limiter.stats() if limiter is not None else None
+
+
+class LoginThrottle(BaseThrottle):
+    """
+    Троттлинг DRF для входа: отклоняет запрос, если по IP или по email
+    за окно набралось слишком много неудачных попыток.
+    """
+
+    def allow_request(self, request, view):
+        self.retry_after = check_login(request, get_login_email(request.data))
+        return self.retry_after is None
+
+    def wait(self):
+        return self.retry_after
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import threading
+import time
+
+from .conf import get_setting
+from .user_cache import LocalBackend
+
+
+class VerifiedTokenCache:
+    """
+    Кэш проверенных токенов доступа.
+
+    Ключ - SHA-256 закодированного токена, значение - класс токена и его
+    payload. Запись живет до claim exp, поэтому просроченный токен
+    не может быть взят из кэша.
+    """
+
+    def __init__(self, max_size):
+        self.backend = LocalBackend(max_size, ttl=0)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(raw_token):
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return hashlib.sha256(raw_token).digest()
+
+    def get(self, raw_token):
+        entry = self.backend.get(self.get_key(raw_token))
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def set(self, raw_token, token):
+        ttl = token.payload["exp"] - time.time()
+        if ttl > 0:
+            self.backend.set(
+                self.get_key(raw_token), (type(token), dict(token.payload)), ttl
+            )
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self.backend),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.backend.evictions,
+            }
+
+
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _token_cache, _token_cache_lock
+    _token_cache = None
+    _token_cache_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_token_cache():
+    """
+    Возвращает кэш проверенных токенов процесса или None, если кэш отключен.
+    """
+
+    global _token_cache
+    config = get_setting("TOKEN_CACHE")
+    if not config["ENABLED"]:
+        return None
+
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                _token_cache = VerifiedTokenCache(config["MAX_SIZE"])
+    return _token_cache
+
+
+def reset_token_cache():
+    """Сбрасывает кэш, следующий вызов создаст его по текущим настройкам."""
+
+    global _token_cache
+    with _token_cache_lock:
+        _token_cache = None
+
+
+def stats():
+    """Счетчики попаданий и промахов кэша текущего процесса."""
+
+    cache = get_token_cache()
+    return cache.stats() if cache is not None else None
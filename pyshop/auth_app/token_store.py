@@ -0,0 +1,142 @@
+import hashlib
+import uuid
+
+from django.db import IntegrityError
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from . import blacklist
+from .conf import get_setting
+from .models import RefreshTokenRecord
+
+FAMILY_CLAIM = "fam"
+
+
+def is_enabled():
+    return get_setting("TOKEN_STORE")["ENABLED"]
+
+
+def jti_hash(jti):
+    """Хэш jti фиксированной длины (16 байт), под которым хранится токен."""
+
+    return hashlib.sha256(jti.encode()).digest()[:16]
+
+
+def issue(token, user_id, family=None):
+    """
+    Сохраняет токен обновления в хранилище.
+    Без family токен открывает новое семейство.
+    """
+
+    if family is None:
+        family = uuid.uuid4().bytes
+    token[FAMILY_CLAIM] = family.hex()
+
+    RefreshTokenRecord.objects.create(
+        jti_hash=jti_hash(token[api_settings.JTI_CLAIM]),
+        user_id=user_id,
+        family=family,
+        expires_at=datetime_from_epoch(token["exp"]),
+    )
+
+
+def rotate(token, user_id):
+    """
+    Заменяет токен обновления новым токеном того же семейства.
+
+    Токен помечается замененным условным UPDATE, поэтому из нескольких
+    одновременных запросов с одним токеном выигрывает только один.
+    Повторное предъявление замененного или отозванного токена означает
+    его утечку: все семейство отзывается.
+    """
+
+    key = jti_hash(token[api_settings.JTI_CLAIM])
+    rotated = RefreshTokenRecord.objects.filter(
+        jti_hash=key, status=RefreshTokenRecord.ACTIVE
+    ).update(status=RefreshTokenRecord.ROTATED)
+
+    if rotated:
+        family = bytes.fromhex(token[FAMILY_CLAIM])
+    else:
+        record = RefreshTokenRecord.objects.filter(jti_hash=key).only("family").first()
+        if record is not None:
+            revoke_family(record.family)
+            raise TokenError(_("Token is blacklisted"))
+
+        # Токен выпущен до появления хранилища: запоминаем его как замененный
+        # и начинаем новое семейство.
+        family = uuid.uuid4().bytes
+        try:
+            RefreshTokenRecord.objects.create(
+                jti_hash=key,
+                user_id=user_id,
+                family=family,
+                expires_at=datetime_from_epoch(token["exp"]),
+                status=RefreshTokenRecord.ROTATED,
+            )
+        except IntegrityError:
+            raise TokenError(_("Token is blacklisted"))
+
+    token.set_jti()
+    token.set_exp()
+    token.set_iat()
+    issue(token, user_id, family)
+    return token
+
+
+def get_status(token):
+    """Статус токена обновления или None, если токен выпущен до появления хранилища."""
+
+    return (
+        RefreshTokenRecord.objects.filter(jti_hash=jti_hash(token[api_settings.JTI_CLAIM]))
+        .values_list("status", flat=True)
+        .first()
+    )
+
+
+def revoke(token):
+    """
+    Отзывает токен обновления (выход из системы).
+    Замененный токен означает утечку, как и в rotate(): отзывается все семейство.
+    """
+
+    key = jti_hash(token[api_settings.JTI_CLAIM])
+    revoked = RefreshTokenRecord.objects.filter(
+        jti_hash=key, status=RefreshTokenRecord.ACTIVE
+    ).update(status=RefreshTokenRecord.REVOKED, revoked_at=timezone.now())
+    if not revoked:
+        record = RefreshTokenRecord.objects.filter(jti_hash=key).only("family", "status").first()
+        if record is not None:
+            if record.status == RefreshTokenRecord.ROTATED:
+                revoke_family(record.family)
+            return
+
+        # Токен выпущен до появления хранилища: запоминаем его отозванным.
+        try:
+            RefreshTokenRecord.objects.create(
+                jti_hash=key,
+                user_id=token[api_settings.USER_ID_CLAIM],
+                family=uuid.uuid4().bytes,
+                expires_at=datetime_from_epoch(token["exp"]),
+                status=RefreshTokenRecord.REVOKED,
+                revoked_at=timezone.now(),
+            )
+        except IntegrityError:
+            pass
+
+    index = blacklist.get_index()
+    if index is not None:
+        index.add(blacklist.record_key(key), token["exp"])
+
+
+def revoke_family(family):
+    records = RefreshTokenRecord.objects.filter(family=family)
+    records.update(status=RefreshTokenRecord.REVOKED, revoked_at=timezone.now())
+
+    index = blacklist.get_index()
+    if index is not None:
+        for key, expires_at in records.values_list("jti_hash", "expires_at"):
+            index.add(blacklist.record_key(key), expires_at.timestamp())
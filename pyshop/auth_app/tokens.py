@@ -0,0 +1,158 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import aware_utcnow, get_md5_hash_password
+
+from . import blacklist, signing, token_store
+from .models import RefreshTokenRecord
+
+# Версия набора пользовательских claims. Для токенов другой версии
+# пользователь загружается из базы, как раньше.
+CLAIMS_VERSION = 2
+
+TOKEN_VERSION_CLAIM = "tv"
+
+
+def set_user_claims(token, user):
+    """Записывает в токен поля пользователя, нужные для проверки доступа."""
+
+    token["is_active"] = user.is_active
+    token["is_staff"] = user.is_staff
+    token[TOKEN_VERSION_CLAIM] = user.token_version
+    token["cv"] = CLAIMS_VERSION
+
+
+def check_token_version(token, token_version):
+    """
+    Проверяет, что токен выпущен для текущей версии токенов пользователя.
+    Токены, выпущенные до появления версии, считаются версией 0.
+    """
+
+    if token.get(TOKEN_VERSION_CLAIM, 0) != token_version:
+        raise TokenError(_("Token has been revoked"))
+
+
+def rotate_refresh_token(refresh, user):
+    """
+    Заменяет токен обновления новым при ROTATE_REFRESH_TOKENS.
+    """
+
+    if token_store.is_enabled():
+        token_store.rotate(refresh, user.pk)
+    else:
+        if api_settings.BLACKLIST_AFTER_ROTATION:
+            refresh.blacklist()
+
+        refresh.set_jti()
+        refresh.set_exp()
+        refresh.set_iat()
+
+    set_user_claims(refresh, user)
+    return refresh
+
+
+class KeySetTokenMixin:
+    """
+    Подписывает и проверяет токены бэкендом из настройки SIGNING.
+    """
+
+    def get_token_backend(self):
+        return signing.get_token_backend()
+
+
+class AccessToken(KeySetTokenMixin, tokens.AccessToken):
+    """
+    Токен доступа с claims пользователя.
+    """
+
+    @classmethod
+    def from_payload(cls, raw_token, payload):
+        """Собирает уже проверенный токен без декодирования и проверки подписи."""
+
+        token = cls.__new__(cls)
+        token.token = raw_token
+        token.current_time = aware_utcnow()
+        token.payload = dict(payload)
+        return token
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        set_user_claims(token, user)
+        return token
+
+
+class RefreshToken(KeySetTokenMixin, tokens.RefreshToken):
+    """
+    Токен обновления с claims пользователя.
+
+    С TOKEN_STORE выданные и отозванные токены хранятся только
+    в компактном хранилище token_store, OutstandingToken и BlacklistedToken
+    из simplejwt не используются. Черный список проверяется по индексу
+    в памяти, хранилище запрашивается только при срабатывании его фильтра.
+    """
+
+    access_token_class = AccessToken
+    no_copy_claims = tokens.RefreshToken.no_copy_claims + ("fam",)
+
+    def check_blacklist(self):
+        # Замененный токен не отклоняется здесь: его повторное
+        # предъявление отзывает все семейство в token_store.rotate().
+        jti = self.payload[api_settings.JTI_CLAIM]
+        index = blacklist.get_index()
+        if index is None:
+            if token_store.is_enabled():
+                status = token_store.get_status(self)
+                if status == RefreshTokenRecord.REVOKED:
+                    raise TokenError(_("Token is blacklisted"))
+                if status is not None:
+                    return
+            return super().check_blacklist()
+
+        # Хранилище запрашивается, только если запись могла быть отозвана.
+        if token_store.is_enabled() and index.might_contain(
+            blacklist.record_key(token_store.jti_hash(jti))
+        ):
+            if token_store.get_status(self) == RefreshTokenRecord.REVOKED:
+                raise TokenError(_("Token is blacklisted"))
+
+        if index.is_blacklisted(jti):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        if token_store.is_enabled():
+            token_store.revoke(self)
+            return None
+
+        result = super().blacklist()
+
+        index = blacklist.get_index()
+        if index is not None:
+            index.add(self.payload[api_settings.JTI_CLAIM], self.payload["exp"])
+        return result
+
+    @classmethod
+    def for_user(cls, user):
+        if not token_store.is_enabled():
+            token = super().for_user(user)
+            set_user_claims(token, user)
+            return token
+
+        # То же, что Token.for_user(), но без записи в OutstandingToken:
+        # токен сохраняется только в компактном хранилище.
+        user_id = getattr(user, api_settings.USER_ID_FIELD)
+        if not isinstance(user_id, int):
+            user_id = str(user_id)
+
+        token = cls()
+        token[api_settings.USER_ID_CLAIM] = user_id
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            token[api_settings.REVOKE_TOKEN_CLAIM] = get_md5_hash_password(
+                user.password
+            )
+
+        set_user_claims(token, user)
+        token_store.issue(token, user.pk)
+        return token
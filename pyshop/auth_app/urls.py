@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     RegistrationAPIView,
@@ -5,13 +6,39 @@ from .views import (
     GetUserView,
     CustomTokenRefreshView,
     CustomTokenObtainPairView,
+    IntrospectionAPIView,
+    UserImportAPIView,
+    UserExportAPIView,
+)
+from .async_views import (
+    AsyncRegistrationAPIView,
+    AsyncLogoutAPIView,
+    AsyncGetUserView,
+    AsyncTokenRefreshView,
+    AsyncTokenObtainPairView,
 )
 
 app_name = "auth_app"
-urlpatterns = [
-    path("register/", RegistrationAPIView.as_view(), name="registration"),
-    path("login/", CustomTokenObtainPairView.as_view(), name="login"),
-    path("refresh/", CustomTokenRefreshView.as_view(), name="login_refresh"),
-    path("logout/", LogoutAPIView.as_view(), name="logout"),
-    path("me/", GetUserView.as_view(), name="get_user")
-]
+
+if settings.ASYNC_AUTH_VIEWS:
+    urlpatterns = [
+        path("register/", AsyncRegistrationAPIView.as_view(), name="registration"),
+        path("login/", AsyncTokenObtainPairView.as_view(), name="login"),
+        path("refresh/", AsyncTokenRefreshView.as_view(), name="login_refresh"),
+        path("logout/", AsyncLogoutAPIView.as_view(), name="logout"),
+        path("me/", AsyncGetUserView.as_view(), name="get_user"),
+        path("introspect/", IntrospectionAPIView.as_view(), name="introspect"),
+        path("users/import/", UserImportAPIView.as_view(), name="user_import"),
+        path("users/export/", UserExportAPIView.as_view(), name="user_export"),
+    ]
+else:
+    urlpatterns = [
+        path("register/", RegistrationAPIView.as_view(), name="registration"),
+        path("login/", CustomTokenObtainPairView.as_view(), name="login"),
+        path("refresh/", CustomTokenRefreshView.as_view(), name="login_refresh"),
+        path("logout/", LogoutAPIView.as_view(), name="logout"),
+        path("me/", GetUserView.as_view(), name="get_user"),
+        path("introspect/", IntrospectionAPIView.as_view(), name="introspect"),
+        path("users/import/", UserImportAPIView.as_view(), name="user_import"),
+        path("users/export/", UserExportAPIView.as_view(), name="user_export"),
+    ]
@@ -0,0 +1,373 @@
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.db import transaction
+
+from . import routers
+from .conf import get_setting
+
+
+class LocalBackend:
+    """
+    LRU-кэш в памяти процесса с ограничением времени жизни записей.
+
+    Каждое удаление увеличивает поколение кэша. Запись, прочитанная
+    из базы до удаления, передает в set() поколение на момент чтения
+    и не попадает в кэш.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            expires_at, values = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return values
+
+    def generation(self, key):
+        return self._generation
+
+    def set(self, key, values, ttl=None, generation=None):
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (time.monotonic() + ttl, values)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+            self._generation += 1
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SharedBackend:
+    """
+    Кэш в общем хранилище Django (например, Redis или Memcached),
+    чтобы все воркеры видели одни и те же записи и инвалидации.
+
+    Рядом с записью хранится поколение пользователя - случайная метка,
+    которую меняет каждое удаление. Запись читается вместе с меткой
+    одним get_many и действительна, только если метки совпадают,
+    поэтому снимок, прочитанный из базы до удаления, не отдается,
+    в каком бы порядке ни пришли set() и delete() разных воркеров.
+    """
+
+    key_prefix = "auth_app:user:"
+
+    def __init__(self, alias, ttl):
+        self.cache = caches[alias]
+        self.ttl = ttl
+        self.evictions = 0
+
+    def _keys(self, user_id):
+        return self.key_prefix + str(user_id), self.key_prefix + "gen:" + str(user_id)
+
+    def get(self, user_id):
+        key, generation_key = self._keys(user_id)
+        found = self.cache.get_many([key, generation_key])
+        entry = found.get(key)
+        if entry is None or entry[0] != found.get(generation_key, ""):
+            return None
+        return entry[1]
+
+    def generation(self, user_id):
+        return self.cache.get(self._keys(user_id)[1], "")
+
+    def set(self, user_id, values, generation=None):
+        key, generation_key = self._keys(user_id)
+        if generation is None:
+            generation = self.cache.get(generation_key, "")
+        self.cache.set(key, (generation, values), self.ttl)
+
+    def delete(self, user_id):
+        key, generation_key = self._keys(user_id)
+        # Метка живет дольше записей, прочитанных до удаления.
+        self.cache.set(generation_key, secrets.token_hex(8), self.ttl * 2)
+        self.cache.delete(key)
+
+    def __len__(self):
+        return 0
+
+
+class UserCache:
+    """
+    Кэш снимков пользователей по id.
+
+    Хранятся значения полей, а не экземпляры модели: при каждом попадании
+    собирается новый объект User, поэтому запросы не делят его между собой.
+
+    Кэш сбрасывают User.save(), delete(), set_password() и revoke_tokens().
+    QuerySet.update() и bulk_update() идут мимо модели: после них нужно
+    вызвать invalidate() для каждого измененного пользователя.
+    """
+
+    def __init__(self, model, backend):
+        self.model = model
+        self.backend = backend
+        self.field_names = [field.attname for field in model._meta.concrete_fields]
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        values = self.backend.get(user_id)
+        with self._lock:
+            if values is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return self.model.from_db(None, self.field_names, values)
+
+    def get_field(self, user_id, name):
+        """Значение одного поля из снимка без сборки объекта User."""
+
+        values = self.backend.get(user_id)
+        with self._lock:
+            if values is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return values[self.field_names.index(name)]
+
+    def generation(self, user_id):
+        """Поколение записи перед чтением из базы, передается в set()."""
+
+        return self.backend.generation(user_id)
+
+    def set(self, user, generation=None):
+        values = tuple(getattr(user, name) for name in self.field_names)
+        self.backend.set(user.pk, values, generation=generation)
+
+    def invalidate(self, user_id):
+        self.backend.delete(user_id)
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__,
+                "size": len(self.backend),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.backend.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+_user_cache = None
+_user_cache_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _user_cache, _user_cache_lock
+    _user_cache = None
+    _user_cache_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_user_cache():
+    """
+    Возвращает кэш пользователей процесса или None, если кэш отключен.
+    """
+
+    global _user_cache
+    config = get_setting("USER_CACHE")
+    if not config["ENABLED"]:
+        return None
+
+    if _user_cache is None:
+        with _user_cache_lock:
+            if _user_cache is None:
+                from django.contrib.auth import get_user_model
+
+                if config["BACKEND"] == "shared":
+                    backend = SharedBackend(config["CACHE_ALIAS"], config["TTL"])
+                elif config["BACKEND"] == "local":
+                    backend = LocalBackend(config["MAX_SIZE"], config["TTL"])
+                else:
+                    raise ValueError(f"Unknown user cache backend: {config['BACKEND']}")
+                _user_cache = UserCache(get_user_model(), backend)
+    return _user_cache
+
+
+def reset_user_cache():
+    """Сбрасывает кэш, следующий вызов создаст его по текущим настройкам."""
+
+    global _user_cache
+    with _user_cache_lock:
+        _user_cache = None
+
+
+def get_cached_user(user_id):
+    cache = get_user_cache()
+    return cache.get(user_id) if cache is not None else None
+
+
+def get_generation(user_id):
+    cache = get_user_cache()
+    return cache.generation(user_id) if cache is not None else None
+
+
+def cache_user(user, generation=None):
+    """
+    Кладет пользователя в кэш. generation - результат get_generation()
+    до чтения из базы: если пользователя за это время сбросили,
+    устаревший снимок в кэш не попадет.
+    """
+
+    cache = get_user_cache()
+    if cache is not None:
+        cache.set(user, generation)
+
+
+def get_user(user_id):
+    """
+    Возвращает пользователя из кэша, а при промахе загружает его из базы.
+    Если пользователя нет, выбрасывает User.DoesNotExist.
+
+    Строка читается с основной базы, даже если пользователи читаются
+    с реплик: по ней проверяется версия токенов, и отзыв должен быть
+    виден сразу, а снимок с отстающей реплики жил бы в кэше до TTL.
+    """
+
+    user = get_cached_user(user_id)
+    if user is None:
+        from django.contrib.auth import get_user_model
+
+        generation = get_generation(user_id)
+        with routers.use_primary():
+            user = get_user_model().objects.filter_pk(user_id).get()
+        cache_user(user, generation)
+    return user
+
+
+async def aget_user(user_id):
+    """Асинхронный вариант get_user()."""
+
+    user = get_cached_user(user_id)
+    if user is None:
+        from django.contrib.auth import get_user_model
+
+        generation = get_generation(user_id)
+        with routers.use_primary():
+            user = await get_user_model().objects.filter_pk(user_id).aget()
+        cache_user(user, generation)
+    return user
+
+
+def get_user_field(user_id, name):
+    """
+    Возвращает значение поля пользователя.
+    При попадании в кэш запрос к базе не выполняется, при промахе
+    пользователь загружается целиком и кэшируется.
+    """
+
+    cache = get_user_cache()
+    if cache is not None:
+        value = cache.get_field(user_id, name)
+        if value is not None:
+            return value
+    return getattr(get_user(user_id), name)
+
+
+async def aget_user_field(user_id, name):
+    """Асинхронный вариант get_user_field()."""
+
+    cache = get_user_cache()
+    if cache is not None:
+        value = cache.get_field(user_id, name)
+        if value is not None:
+            return value
+    return getattr(await aget_user(user_id), name)
+
+
+def get_shared_field(user_id, name):
+    """
+    Возвращает значение поля, одинаковое во всех воркерах: из общего
+    кэша (его сбрасывает любой воркер), а с кэшем в памяти процесса
+    или без кэша - одним столбцом из базы. Кэш процесса не знает
+    о сбросах в других воркерах и отдавал бы старое значение до TTL.
+    """
+
+    cache = get_user_cache()
+    if cache is not None and isinstance(cache.backend, SharedBackend):
+        return get_user_field(user_id, name)
+
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.filter_pk(user_id).values_list(name, flat=True).get()
+
+
+async def aget_shared_field(user_id, name):
+    """Асинхронный вариант get_shared_field()."""
+
+    cache = get_user_cache()
+    if cache is not None and isinstance(cache.backend, SharedBackend):
+        return await aget_user_field(user_id, name)
+
+    from django.contrib.auth import get_user_model
+
+    return await get_user_model().objects.filter_pk(user_id).values_list(name, flat=True).aget()
+
+
+def get_token_version(user_id):
+    """Возвращает текущую версию токенов пользователя."""
+
+    return get_user_field(user_id, "token_version")
+
+
+async def aget_token_version(user_id):
+    """Асинхронный вариант get_token_version()."""
+
+    return await aget_user_field(user_id, "token_version")
+
+
+def invalidate(user_id, using=None):
+    """
+    Сбрасывает пользователя в кэше. Внутри транзакции базы using
+    сбрасывает его еще раз после фиксации: до нее другие запросы
+    читают старую строку и могли положить ее в кэш.
+    """
+
+    cache = get_user_cache()
+    if cache is None or user_id is None:
+        return
+    cache.invalidate(user_id)
+    if using is not None and transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(lambda: cache.invalidate(user_id), using=using)
+
+
+def stats():
+    """Счетчики попаданий и промахов кэша текущего процесса."""
+
+    cache = get_user_cache()
+    return cache.stats() if cache is not None else None
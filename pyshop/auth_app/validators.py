@@ -1,6 +1,30 @@
 import re
+from typing import NamedTuple
+
 from django.core.exceptions import ValidationError
-from django.core.validators import RegexValidator
+from django.core.validators import MaxLengthValidator, MinLengthValidator, RegexValidator
+from rest_framework.exceptions import ValidationError as APIValidationError
+
+# Шаблоны компилируются один раз при импорте модуля.
+# Валидаторы не хранят состояние между вызовами и безопасны
+# для потоков и пулов процессов.
+EMAIL_LOCAL_PART_RE = re.compile(r"^[a-zA-Z0-9_.+-]+$")
+EMAIL_DOMAIN_PART_RE = re.compile(
+    r"^[a-zA-Z0-9]+(?:[a-zA-Z0-9-]*[a-zA-Z0-9])?\.[a-zA-Z]+$"
+)
+PASSWORD_RE = re.compile(r"^(?=.*[0-9])(?=.*[!%&*])[A-Za-z0-9!%&*]{8,}$")
+FIO_RE = re.compile(r"^[a-zA-Zа-яА-Я\s\'-]+$")
+
+EMAIL_MESSAGE = "Введите корректный адрес электронной почты."
+PASSWORD_MESSAGE = (
+    "Пароль должен содержать не менее 8 символов, включая цифру и спецсимволы ! % & * в латинице."
+)
+FIO_MESSAGE = "Допустимы только буквы (латинские или кириллица), пробелы, дефисы и апострофы."
+REQUIRED_MESSAGE = "Обязательное поле."
+BLANK_MESSAGE = "Это поле не может быть пустым."
+INVALID_MESSAGE = "Ожидается строка."
+MIN_LENGTH_MESSAGE = "Убедитесь, что значение содержит не менее %(limit_value)s символов."
+MAX_LENGTH_MESSAGE = "Убедитесь, что значение содержит не более %(limit_value)s символов."
 
 
 class CustomEmailValidator:
@@ -8,36 +32,32 @@ class CustomEmailValidator:
     Кастомный валидатор email.
     """
 
-    def __init__(self):
-        self.local_part = None
-        self.domain_part = None
-
     def __call__(self, value):
         if not self.validate_email(value):
-            raise ValidationError("Введите корректный адрес электронной почты.")
+            raise ValidationError(EMAIL_MESSAGE)
 
     def validate_email(self, email):
         parts = email.split("@")
         if len(parts) != 2 or len(email) > 50:
             return False
 
-        self.local_part, self.domain_part = parts
-        return self.validate_local_part() and self.validate_domain_part()
+        local_part, domain_part = parts
+        return self.validate_local_part(local_part) and self.validate_domain_part(
+            domain_part
+        )
 
-    def validate_local_part(self):
-        local_regex = r"^[a-zA-Z0-9_.+-]+$"
+    def validate_local_part(self, local_part):
         return (
-            bool(self.local_part)
-            and bool(re.match(local_regex, self.local_part))
-            and not self.local_part.startswith(".")
-            and not self.local_part.endswith(".")
-            and "-" not in (self.local_part[0], self.local_part[-1])
-            and "--" not in self.local_part
+            bool(local_part)
+            and bool(EMAIL_LOCAL_PART_RE.match(local_part))
+            and not local_part.startswith(".")
+            and not local_part.endswith(".")
+            and "-" not in (local_part[0], local_part[-1])
+            and "--" not in local_part
         )
 
-    def validate_domain_part(self):
-        domain_regex = r"^[a-zA-Z0-9]+(?:[a-zA-Z0-9-]*[a-zA-Z0-9])?\.[a-zA-Z]+$"
-        return bool(self.domain_part) and bool(re.match(domain_regex, self.domain_part))
+    def validate_domain_part(self, domain_part):
+        return bool(domain_part) and bool(EMAIL_DOMAIN_PART_RE.match(domain_part))
 
 
 class PasswordValidator:
@@ -45,18 +65,12 @@ class PasswordValidator:
     Валидатор пароля.
     """
 
-    def __init__(self):
-        self.password = None
-
     def __call__(self, value):
         self.validate_password(value)
 
     def validate_password(self, password):
-        regex = r"^(?=.*[0-9])(?=.*[!%&*])[A-Za-z0-9!%&*]{8,}$"
-        if not re.match(regex, password):
-            raise ValidationError(
-                "Пароль должен содержать не менее 8 символов, включая цифру и спецсимволы ! % & * в латинице."
-            )
+        if not PASSWORD_RE.match(password):
+            raise ValidationError(PASSWORD_MESSAGE)
 
 
 class FIOValidator:
@@ -64,20 +78,12 @@ class FIOValidator:
     Кастомный валидатор фамилии, имени и отчества.
     """
 
-    def __init__(self):
-        self.fio = None
-
     def __call__(self, value):
         self.validate_fio(value)
 
     def validate_fio(self, value):
-        pattern = re.compile(r"^[a-zA-Zа-яА-Я\s\'-]+$")
-        self.fio = value
-
-        if not pattern.match(self.fio):
-            raise ValidationError(
-                "Допустимы только буквы (латинские или кириллица), пробелы, дефисы и апострофы."
-            )
+        if not FIO_RE.match(value):
+            raise ValidationError(FIO_MESSAGE)
 
 
 class CustomUsernameValidator(RegexValidator):
@@ -105,3 +111,110 @@ class CustomUsernameValidator(RegexValidator):
                 code="min_length",
                 params={"limit_value": min_length},
             )
+
+
+# Общие экземпляры: без состояния, поэтому один на процесс.
+password_validator = PasswordValidator()
+fio_validator = FIOValidator()
+
+
+class FieldRule(NamedTuple):
+    """Правило проверки одного поля записи."""
+
+    required: bool = True
+    min_length: int | None = None
+    max_length: int | None = None
+    validators: tuple = ()
+
+
+class RecordValidator:
+    """
+    Проверка записей (словарей) по таблице правил {поле: FieldRule}.
+
+    Строки обрезаются по краям, пустое необязательное поле пропускается.
+    Ошибки собираются по всем полям сразу, как в сериализаторах DRF.
+    """
+
+    def __init__(self, rules):
+        self.rules = tuple(rules.items())
+
+    @classmethod
+    def from_serializer(cls, serializer):
+        """
+        Правила из полей сериализатора DRF, доступных для записи:
+        обязательность, длина и валидаторы поля. Проверки длины
+        выполняет сам RecordValidator, остальные валидаторы берутся как есть.
+        """
+
+        rules = {}
+        for name, field in serializer.fields.items():
+            if field.read_only:
+                continue
+            rules[name] = FieldRule(
+                required=field.required,
+                min_length=getattr(field, "min_length", None),
+                max_length=getattr(field, "max_length", None),
+                validators=tuple(
+                    validator
+                    for validator in field.validators
+                    if not isinstance(validator, (MinLengthValidator, MaxLengthValidator))
+                ),
+            )
+        return cls(rules)
+
+    def validate(self, record):
+        """
+        Проверяет одну запись.
+        Возвращает (очищенные данные, {поле: [сообщения]}).
+        """
+
+        data = {}
+        errors = {}
+        for name, rule in self.rules:
+            value = record.get(name)
+            if value is None:
+                if rule.required:
+                    errors[name] = [REQUIRED_MESSAGE]
+                continue
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                value = str(value)
+            elif not isinstance(value, str):
+                errors[name] = [INVALID_MESSAGE]
+                continue
+
+            value = value.strip()
+            if not value:
+                if rule.required:
+                    errors[name] = [BLANK_MESSAGE]
+                else:
+                    data[name] = value
+                continue
+
+            messages = []
+            if rule.min_length is not None and len(value) < rule.min_length:
+                messages.append(MIN_LENGTH_MESSAGE % {"limit_value": rule.min_length})
+            if rule.max_length is not None and len(value) > rule.max_length:
+                messages.append(MAX_LENGTH_MESSAGE % {"limit_value": rule.max_length})
+            for validator in rule.validators:
+                try:
+                    validator(value)
+                except ValidationError as e:
+                    messages.extend(e.messages)
+                except APIValidationError as e:
+                    messages.extend(str(message) for message in e.detail)
+
+            if messages:
+                errors[name] = messages
+            else:
+                data[name] = value
+        return data, errors
+
+    def validate_many(self, records):
+        """
+        Проверяет список записей.
+        Возвращает список (очищенные данные, ошибки) в порядке записей.
+        """
+
+        validate = self.validate
+        return [validate(record) for record in records]
+
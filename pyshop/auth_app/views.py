@@ -1,30 +1,87 @@
+import io
+
 from django.shortcuts import render
 from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.utils.http import urlsafe_base64_decode
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, urlsafe_base64_decode
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema
-from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import AllowAny
 from rest_framework import generics, permissions, status
-from rest_framework.renderers import JSONRenderer
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from utils.fast_json import FastJSONRenderer
+
 from .serializers import (
     RegistrationSerializer,
     LogoutSerializer,
     UserSerializer,
     UserPatchSerializer,
     UserSerializerInData,
-    CustomTokenObtainPairSerializer
+    CustomTokenObtainPairSerializer,
+    CustomTokenRefreshSerializer,
+    IntrospectionSerializer,
+    IntrospectionResultSerializer,
 )
-from . import schemas
+from . import bulk_import, export, introspection, schemas, signing, throttling, user_cache
+from .conf import get_setting
 
 USER_MODEL = get_user_model()
 
 
+def set_refresh_cookie(response, refresh):
+    """Передает токен обновления клиенту в куки."""
+
+    response.set_cookie(
+        key=settings.SIMPLE_JWT["AUTH_COOKIE_REFRESH"],
+        value=refresh,
+        max_age=settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'],
+        secure=settings.SIMPLE_JWT['AUTH_COOKIE_SECURE'],
+        httponly=settings.SIMPLE_JWT['AUTH_COOKIE_HTTP_ONLY'],
+        samesite=settings.SIMPLE_JWT['AUTH_COOKIE_SAMESITE']
+    )
+
+
+def get_user_etag(user_id, updated_at):
+    return f'"{user_id}-{int(updated_at.timestamp() * 1000000)}"'
+
+
+def set_user_validators(response, user_id, updated_at):
+    """
+    Добавляет к ответу с профилем валидаторы кэша. Клиент хранит ответ,
+    но перед использованием проверяет его условным запросом.
+    """
+
+    response["ETag"] = get_user_etag(user_id, updated_at)
+    response["Last-Modified"] = http_date(updated_at.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+
+
+def check_user_conditions(request, updated_at):
+    """
+    Проверяет If-None-Match и If-Modified-Since запроса по времени
+    изменения профиля (User.updated_at).
+    Возвращает ответ 304/412 или None.
+    """
+
+    response = get_conditional_response(
+        request,
+        etag=get_user_etag(request.user.id, updated_at),
+        last_modified=int(updated_at.timestamp()),
+    )
+    if response is not None:
+        set_user_validators(response, request.user.id, updated_at)
+    return response
+
+
 class RegistrationAPIView(GenericAPIView):
     """
     Представление для регистрации пользователя
@@ -61,6 +118,8 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     """
 
     serializer_class = CustomTokenObtainPairSerializer
+    # Проверяется до сериализатора: отклоненный вход не хэширует пароль.
+    throttle_classes = (throttling.LoginThrottle,)
 
     @extend_schema(
         summary="Вход в систему.",
@@ -68,11 +127,16 @@ class CustomTokenObtainPairView(TokenObtainPairView):
             status.HTTP_200_OK: schemas.login_response_200,
             status.HTTP_400_BAD_REQUEST: schemas.get_4xx_many(name="login_400"),
             status.HTTP_401_UNAUTHORIZED: schemas.get_4xx_single(name="login_401"),
+            status.HTTP_429_TOO_MANY_REQUESTS: schemas.get_4xx_single(name="login_429"),
         },
         tags=["auth"],
     )
     def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
+        try:
+            response = super().post(request, *args, **kwargs)
+        except AuthenticationFailed:
+            throttling.record_login_failure(request, throttling.get_login_email(request.data))
+            raise
         response_data = {
             "data": {
                 "access": response.data["access"],
@@ -80,14 +144,7 @@ class CustomTokenObtainPairView(TokenObtainPairView):
             "message": "Токен доступа",
         }
 
-        response.set_cookie(
-            key=settings.SIMPLE_JWT["AUTH_COOKIE_REFRESH"],
-            value=response.data['refresh'],
-            max_age=settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'],
-            secure=settings.SIMPLE_JWT['AUTH_COOKIE_SECURE'],
-            httponly=settings.SIMPLE_JWT['AUTH_COOKIE_HTTP_ONLY'],
-            samesite=settings.SIMPLE_JWT['AUTH_COOKIE_SAMESITE']
-        )
+        set_refresh_cookie(response, response.data['refresh'])
         response.data = response_data
 
         return response
@@ -98,9 +155,13 @@ class CustomTokenRefreshView(TokenRefreshView):
     Представление для обновления токена доступа.
     """
 
+    serializer_class = CustomTokenRefreshSerializer
+
     @extend_schema(
         summary="Обновление токена доступа.",
-        description="Создает новый токен доступа, используя действительный токен обновления.",
+        description="Создает новый токен доступа, используя действительный токен обновления. "
+                    "Токен обновления принимается из тела запроса или из куки, "
+                    "новый токен обновления возвращается в куки.",
         responses={
             status.HTTP_200_OK: schemas.refresh_response_200,
             status.HTTP_400_BAD_REQUEST: schemas.get_4xx_many(name="refresh_400"),
@@ -114,8 +175,20 @@ class CustomTokenRefreshView(TokenRefreshView):
         response.data["data"] = {"access": response.data["access"]}
         response.data["message"] = "Токен доступа"
         del response.data["access"]
+
+        # При ротации новый токен обновления уходит только в куки.
+        refresh = response.data.pop("refresh", None)
+        if refresh is not None:
+            set_refresh_cookie(response, refresh)
         return response
 
+    def get_serializer(self, *args, **kwargs):
+        data = kwargs.get("data")
+        refresh = self.request.COOKIES.get(settings.SIMPLE_JWT["AUTH_COOKIE_REFRESH"])
+        if refresh and (not data or isinstance(data, dict) and not data.get("refresh")):
+            kwargs["data"] = {"refresh": refresh}
+        return super().get_serializer(*args, **kwargs)
+
 
 class LogoutAPIView(generics.GenericAPIView):
     """
@@ -172,9 +245,12 @@ class GetUserView(generics.GenericAPIView):
 
     @extend_schema(
         summary="Данные пользователя.",
-        description="Получение данных авторизованного пользователя.",
+        description="Получение данных авторизованного пользователя. "
+                    "Ответ содержит ETag и Last-Modified, условный запрос "
+                    "с If-None-Match получает 304, если профиль не изменился.",
         responses={
             status.HTTP_200_OK: UserSerializerInData,
+            status.HTTP_304_NOT_MODIFIED: None,
             status.HTTP_400_BAD_REQUEST: schemas.get_4xx_many(name="get_user_400"),
             status.HTTP_401_UNAUTHORIZED: schemas.get_4xx_single(name="get_user_401"),
             status.HTTP_403_FORBIDDEN: schemas.get_4xx_single(name="get_user_403"),
@@ -182,11 +258,27 @@ class GetUserView(generics.GenericAPIView):
         tags=["auth"],
     )
     def get(self, request):
+        # 304 отдается по времени изменения, одинаковому во всех воркерах,
+        # без загрузки строки и сериализации профиля.
+        updated_at = user_cache.get_shared_field(request.user.id, "updated_at")
+        response = check_user_conditions(request, updated_at)
+        if response is not None:
+            return response
+
+        user = request.user
+        if user.updated_at != updated_at:
+            # Профиль изменен в другом воркере, request.user собран
+            # из устаревшего снимка в кэше процесса.
+            user_cache.invalidate(user.id)
+            user = user_cache.get_user(user.id)
+
         data = {
-            "data": self.serializer_class(request.user).data,
+            "data": self.serializer_class(user).data,
             "message": "Данные пользователя",
         }
-        return Response(data, status=status.HTTP_200_OK)
+        response = Response(data, status=status.HTTP_200_OK)
+        set_user_validators(response, user.id, user.updated_at)
+        return response
 
     @extend_schema(
         summary="Личный кабинет пользователя.",
@@ -215,4 +307,157 @@ class GetUserView(generics.GenericAPIView):
         )
 
     def get_default_renderer(self, view):
-        return JSONRenderer()
\ No newline at end of file
+        return FastJSONRenderer()
+
+
+class IntrospectionAPIView(generics.GenericAPIView):
+    """
+    Представление для пакетной проверки токенов шлюзом.
+    Доступно только техническому персоналу.
+    """
+
+    serializer_class = IntrospectionSerializer
+    permission_classes = (permissions.IsAdminUser,)
+
+    @extend_schema(
+        summary="Проверка токенов.",
+        description="Проверяет пачку токенов и возвращает для каждого "
+                    "активность, claims и статус черного списка.",
+        responses={
+            status.HTTP_200_OK: IntrospectionResultSerializer(many=True),
+            status.HTTP_400_BAD_REQUEST: schemas.get_4xx_many(name="introspect_400"),
+            status.HTTP_401_UNAUTHORIZED: schemas.get_4xx_single(name="introspect_401"),
+            status.HTTP_403_FORBIDDEN: schemas.get_4xx_single(name="introspect_403"),
+        },
+        tags=["auth"],
+    )
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = {
+            "data": introspection.introspect(serializer.validated_data["tokens"]),
+            "message": "Результаты проверки токенов",
+        }
+        return Response(data, status=status.HTTP_200_OK)
+
+    def get_default_renderer(self, view):
+        return FastJSONRenderer()
+
+
+class UserImportAPIView(generics.GenericAPIView):
+    """
+    Представление для массового импорта пользователей из CSV или NDJSON.
+    Доступно только техническому персоналу.
+    """
+
+    permission_classes = (permissions.IsAdminUser,)
+    parser_classes = (MultiPartParser,)
+
+    @extend_schema(
+        summary="Импорт пользователей.",
+        description="Принимает файл file в формате CSV или NDJSON с колонками "
+                    "email, password, first_name, last_name, surname. "
+                    "Возвращает счетчики и ошибки по строкам.",
+        request={
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+            }
+        },
+        responses={
+            status.HTTP_200_OK: dict,
+            status.HTTP_400_BAD_REQUEST: schemas.get_4xx_many(name="import_400"),
+            status.HTTP_401_UNAUTHORIZED: schemas.get_4xx_single(name="import_401"),
+            status.HTTP_403_FORBIDDEN: schemas.get_4xx_single(name="import_403"),
+        },
+        tags=["auth"],
+    )
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": ["Файл не передан."]})
+
+        fmt = request.query_params.get("file_format") or bulk_import.guess_format(upload.name)
+        if fmt not in bulk_import.FORMATS:
+            raise ValidationError({"file_format": ["Поддерживаются форматы csv и ndjson."]})
+
+        errors = []
+        importer = bulk_import.UserImporter(
+            on_error=lambda line, email, messages: errors.append(
+                {"line": line, "email": email, "errors": messages}
+            ),
+            pool=bulk_import.get_pool(),
+        )
+        lines = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+        report = importer.run(bulk_import.read_rows(lines, fmt))
+
+        return Response(
+            {"data": {**report, "errors": errors}, "message": "Импорт пользователей завершен"},
+            status=status.HTTP_200_OK,
+        )
+
+    def get_default_renderer(self, view):
+        return FastJSONRenderer()
+
+
+class UserExportAPIView(generics.GenericAPIView):
+    """
+    Представление для потоковой выгрузки пользователей.
+    Доступно только техническому персоналу.
+    """
+
+    permission_classes = (permissions.IsAdminUser,)
+
+    @extend_schema(
+        summary="Выгрузка пользователей.",
+        description="Потоковая выгрузка таблицы пользователей в формате csv, "
+                    "ndjson или parquet. С compress=gzip выгрузка сжимается на лету.",
+        parameters=[schemas.parameter_export_format, schemas.parameter_export_compress],
+        responses={
+            (status.HTTP_200_OK, "application/octet-stream"): OpenApiTypes.BINARY,
+            status.HTTP_400_BAD_REQUEST: schemas.get_4xx_many(name="export_400"),
+            status.HTTP_401_UNAUTHORIZED: schemas.get_4xx_single(name="export_401"),
+            status.HTTP_403_FORBIDDEN: schemas.get_4xx_single(name="export_403"),
+        },
+        tags=["auth"],
+    )
+    def get(self, request):
+        # Параметр format занят выбором рендерера DRF.
+        fmt = request.query_params.get("file_format", "csv")
+        if fmt not in export.FORMATS:
+            raise ValidationError({"file_format": ["Поддерживаются форматы csv, ndjson и parquet."]})
+        if fmt == "parquet" and export.pyarrow is None:
+            raise ValidationError({"file_format": ["Формат parquet недоступен на сервере."]})
+        compress = request.query_params.get("compress") == "gzip"
+
+        response = StreamingHttpResponse(
+            export.export_users(fmt, compress),
+            content_type=export.FORMATS[fmt][0],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{export.get_filename(fmt, compress)}"'
+        )
+        return response
+
+
+class JWKSView(APIView):
+    """
+    Открытые ключи подписи JWT для проверки токенов другими сервисами.
+    """
+
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+    renderer_classes = (FastJSONRenderer,)
+
+    @extend_schema(
+        summary="Ключи подписи.",
+        description="Открытые ключи подписи токенов в формате JWKS.",
+        responses={status.HTTP_200_OK: dict},
+        tags=["auth"],
+    )
+    def get(self, request):
+        response = Response(signing.jwks(), status=status.HTTP_200_OK)
+        patch_cache_control(
+            response, public=True, max_age=get_setting("SIGNING")["JWKS_MAX_AGE"]
+        )
+        return response
@@ -0,0 +1,116 @@
+"""
+Перегрузка входом: поток запросов /api/login/ (каждый хэширует пароль)
+и одновременно дешевые запросы /api/me/, обслуживаемые общим пулом
+воркеров сервера. Сравнивает задержку /api/me/ без контроля допуска
+и с ним, печатает число отклоненных входов и перцентили ожидания в очереди.
+
+    python -m benchmarks.bench_admission [--workers 8] [--login-rate 40] [--me-rate 50] [--duration 5]
+"""
+import argparse
+import logging
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from . import common
+
+
+def percentile(samples, quantile):
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * quantile), len(samples) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--login-rate", type=float, default=40)
+    parser.add_argument("--me-rate", type=float, default=50)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--max-concurrent", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=4)
+    parser.add_argument("--queue-timeout", type=float, default=0.2)
+    args = parser.parse_args()
+
+    common.setup()
+    # Каждый отказ пишется в лог, здесь он не нужен.
+    logging.getLogger("utils.errors_handler").setLevel(logging.WARNING)
+    logging.getLogger("django.request").setLevel(logging.ERROR)
+
+    from django.conf import settings
+    from django.test import Client
+
+    from auth_app import admission
+    from auth_app.tokens import AccessToken
+
+    user = common.create_user()
+    access = AccessToken.for_user(user)
+    access.set_exp(lifetime=access.lifetime * 100)
+
+    for enabled in (False, True):
+        settings.AUTH_APP = {
+            **settings.AUTH_APP,
+            "ADMISSION_CONTROL": {
+                "ENABLED": enabled,
+                "MAX_CONCURRENT": args.max_concurrent,
+                "QUEUE_SIZE": args.queue_size,
+                "QUEUE_TIMEOUT": args.queue_timeout,
+            },
+        }
+        admission.reset_controller()
+
+        me_latency = []
+        statuses = Counter()
+        lock = threading.Lock()
+
+        def login(submitted):
+            response = Client().post(
+                "/api/login/",
+                {"email": "bench@example.com", "password": "Wr0ngpass!"},
+                content_type="application/json",
+            )
+            with lock:
+                statuses[response.status_code] += 1
+
+        def me(submitted):
+            response = Client().get(
+                "/api/me/", headers={"Authorization": f"Bearer {access}"}
+            )
+            assert response.status_code == 200, response.status_code
+            with lock:
+                me_latency.append(time.perf_counter() - submitted)
+
+        # Открытая нагрузка: запросы поступают с заданной частотой
+        # независимо от того, успевает ли сервер их обработать.
+        schedule = sorted(
+            [(i / args.login_rate, login) for i in range(int(args.duration * args.login_rate))]
+            + [(i / args.me_rate, me) for i in range(int(args.duration * args.me_rate))],
+            key=lambda item: item[0],
+        )
+        with ThreadPoolExecutor(args.workers) as server:
+            started = time.perf_counter()
+            for offset, target in schedule:
+                delay = started + offset - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                server.submit(target, time.perf_counter())
+
+        label = "admission on " if enabled else "admission off"
+        print(
+            f"{label}  /api/me/ p50 {statistics.median(me_latency) * 1000:>8.1f} ms"
+            f"   p95 {percentile(me_latency, 0.95) * 1000:>8.1f} ms"
+            f"   login statuses {dict(sorted(statuses.items()))}"
+        )
+        stats = admission.stats()
+        if stats is not None:
+            print(
+                f"  shed {stats['shed']}   admitted {stats['admitted']}"
+                f"   wait p50 {stats['wait_p50'] * 1000:.1f} ms"
+                f"   p95 {stats['wait_p95'] * 1000:.1f} ms"
+                f"   p99 {stats['wait_p99'] * 1000:.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
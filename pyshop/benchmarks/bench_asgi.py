@@ -0,0 +1,91 @@
+"""
+Запросы в секунду к /api/me/ через синхронные (WSGI) и асинхронные (ASGI)
+представления при одинаковом числе одновременных запросов.
+
+    python -m benchmarks.bench_asgi [--concurrency 64] [--duration 10]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from . import common
+
+
+def run_wsgi(args, headers):
+    from django.test import Client
+
+    clients = [Client() for _ in range(args.concurrency)]
+
+    def request(index):
+        clients[index].get(args.path, headers=headers)
+
+    timings = common.run_threads(args.concurrency, args.duration, request)
+    return [t for samples in timings for t in samples]
+
+
+def run_asgi(args, headers):
+    from django.test import AsyncClient
+
+    async def worker(client, stop_at, samples):
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            await client.get(args.path, headers=headers)
+            samples.append(time.perf_counter() - started)
+
+    async def main():
+        stop_at = time.perf_counter() + args.duration
+        samples = []
+        await asyncio.gather(
+            *(worker(AsyncClient(), stop_at, samples) for _ in range(args.concurrency))
+        )
+        return samples
+
+    return asyncio.run(main())
+
+
+def child(args):
+    common.setup()
+
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    user = common.create_user()
+    # Токен доступа живет 30 секунд, на время замера выпускаем долгий.
+    access = AccessToken.for_user(user)
+    access.set_exp(lifetime=access.lifetime * 100)
+    headers = {"Authorization": f"Bearer {access}"}
+
+    runner = run_asgi if args.interface == "asgi" else run_wsgi
+    samples = runner(args, headers)
+    label = f"{args.interface.upper()} GET {args.path} x{args.concurrency}"
+    print(common.summary(label, samples, args.duration))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--interface", choices=("wsgi", "asgi"))
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--path", default="/api/me/")
+    args = parser.parse_args()
+
+    if args.interface:
+        child(args)
+        return
+
+    # Набор URL выбирается при импорте, поэтому каждый режим в своем процессе.
+    for interface in ("wsgi", "asgi"):
+        env = {**os.environ, "ASYNC_AUTH_VIEWS": str(interface == "asgi")}
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_asgi", "--interface", interface,
+             "--concurrency", str(args.concurrency), "--duration", str(args.duration),
+             "--path", args.path],
+            env=env,
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
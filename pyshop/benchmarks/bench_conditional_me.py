@@ -0,0 +1,65 @@
+"""
+Опрос /api/me/: полный ответ 200 против условного запроса
+с If-None-Match, получающего 304. Время запроса, байты тела
+и запросы к базе на один опрос для кэша пользователей в памяти
+процесса и в общем кэше.
+
+    python -m benchmarks.bench_conditional_me [--iterations 5000]
+"""
+import argparse
+import time
+
+from . import common
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    common.setup()
+
+    from django.conf import settings
+    from django.db import connection, reset_queries
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    from auth_app import user_cache
+    from auth_app.tokens import AccessToken
+
+    user = common.create_user()
+    access = AccessToken.for_user(user)
+    access.set_exp(lifetime=access.lifetime * 100)
+    headers = {"Authorization": f"Bearer {access}"}
+
+    for backend in ("local", "shared"):
+        settings.AUTH_APP = {
+            **settings.AUTH_APP,
+            "USER_CACHE": {**settings.AUTH_APP["USER_CACHE"], "BACKEND": backend},
+        }
+        user_cache.reset_user_cache()
+
+        client = Client()
+        response = client.get("/api/me/", headers=headers)
+        assert response.status_code == 200, response.content
+        etag = response["ETag"]
+
+        for label, extra in (("full 200", {}), ("If-None-Match 304", {"If-None-Match": etag})):
+            reset_queries()
+            body_bytes = 0
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for _ in range(args.iterations):
+                    response = client.get("/api/me/", headers={**headers, **extra})
+                    body_bytes += len(response.content)
+                elapsed = time.perf_counter() - started
+
+            print(
+                f"{backend:<7}{label:<20} {response.status_code}"
+                f"   {elapsed / args.iterations * 1e6:>8.1f} us/request"
+                f"   {body_bytes / args.iterations:>6.0f} bytes"
+                f"   {len(queries) / args.iterations:.2f} queries/request"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+SQL, которые выполняют создание и сохранение пользователя
+с отслеживанием измененных полей, и время сохранения профиля
+через PUT /api/me/ с неизмененными и измененными значениями.
+
+    python -m benchmarks.bench_dirty_fields [--iterations 2000]
+"""
+import argparse
+import time
+
+from . import common
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    common.setup(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    from auth_app import user_cache
+    from auth_app.tokens import AccessToken
+
+    model = get_user_model()
+
+    def show(label, action):
+        with CaptureQueriesContext(connection) as queries:
+            action()
+        print(f"{label}: {len(queries)} queries")
+        for query in queries:
+            print("   ", query["sql"][:160])
+
+    show(
+        "create_user",
+        lambda: model.objects.create_user(
+            "user@example.com", "Иван", "Петров", "Passw0rd!", is_active=True
+        ),
+    )
+    show(
+        "create_superuser",
+        lambda: model.objects.create_superuser("admin@example.com", "Иван", "Петров", "Passw0rd!"),
+    )
+
+    user_cache.reset_user_cache()
+    user = model.objects.get(email="user@example.com")
+    show("save without changes", user.save)
+    user.first_name = "Петр"
+    show("save after changing first_name", user.save)
+
+    access = AccessToken.for_user(user)
+    access.set_exp(lifetime=access.lifetime * 100)
+    headers = {"Authorization": f"Bearer {access}"}
+    client = Client()
+    bodies = (
+        ("PUT /me unchanged", lambda number: {"first_name": "Петр", "notification": False}),
+        ("PUT /me changed", lambda number: {"first_name": "Петр", "notification": bool(number % 2)}),
+    )
+    for label, body in bodies:
+        show(
+            label,
+            lambda: client.put("/api/me/", body(1), content_type="application/json", headers=headers),
+        )
+        started = time.perf_counter()
+        for number in range(args.iterations):
+            client.put("/api/me/", body(number), content_type="application/json", headers=headers)
+        elapsed = time.perf_counter() - started
+        print(f"    {elapsed / args.iterations * 1e6:.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
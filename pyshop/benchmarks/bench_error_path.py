@@ -0,0 +1,59 @@
+"""
+Задержка ответа на ошибку при потоке запросов с неверными учетными
+данными (401): сам обработчик исключений и запрос целиком.
+
+    python -m benchmarks.bench_error_path [--iterations 50000] [--workers 8] [--duration 5]
+"""
+import argparse
+import io
+import logging
+import time
+
+from . import common
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5)
+    args = parser.parse_args()
+
+    common.setup()
+
+    from django.test import Client, RequestFactory
+    from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+
+    from auth_app.views import GetUserView
+    from utils import errors_handler
+    from utils.log import QueueHandler
+
+    # Вывод лога отбрасывается, чтобы измерять обработчик, а не терминал.
+    handlers = []
+    for name in ("utils.errors_handler", "django.request"):
+        handler = QueueHandler(stream=io.StringIO())
+        logging.getLogger(name).handlers = [handler]
+        handlers.append(handler)
+
+    context = {"view": GetUserView(), "request": RequestFactory().get("/api/me/")}
+    for exc in (AuthenticationFailed("bad token"), NotAuthenticated()):
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            errors_handler.custom_exception_handler(exc, context)
+        elapsed = time.perf_counter() - started
+        label = type(exc).__name__
+        print(f"handler {label:<24} {elapsed / args.iterations * 1e6:>8.2f} us/call")
+
+    def flood(index):
+        response = client.get("/api/me/", headers={"Authorization": "Bearer invalid"})
+        assert response.status_code == 401, response.status_code
+
+    client = Client()
+    timings = common.run_threads(args.workers, args.duration, flood)
+    samples = [sample for worker in timings for sample in worker]
+    print(common.summary(f"401 flood, {args.workers} threads", samples, args.duration))
+    print(f"log records dropped: {sum(handler.dropped for handler in handlers)}")
+
+
+if __name__ == "__main__":
+    main()
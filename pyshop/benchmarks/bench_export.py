@@ -0,0 +1,86 @@
+"""
+Скорость и пиковая память потоковой выгрузки пользователей
+на таблицах разного размера.
+
+    python -m benchmarks.bench_export [--sizes 100000,1000000,2000000]
+
+Пиковая память измеряется tracemalloc отдельным проходом,
+скорость - проходом без трассировки.
+"""
+import argparse
+import time
+import tracemalloc
+
+from . import common
+
+FORMATS = (("csv", False), ("csv", True), ("ndjson", True), ("parquet", False))
+
+
+def populate(model, count, start):
+    from django.contrib.auth.hashers import make_password
+
+    password = make_password("Passw0rd!")
+    batch = []
+    for number in range(start, start + count):
+        batch.append(
+            model(
+                email=f"user{number}@example.com",
+                password=password,
+                first_name="Иван",
+                last_name="Петров",
+                surname="Иванович",
+            )
+        )
+        if len(batch) == 10000:
+            model.objects.bulk_create(batch)
+            batch = []
+    model.objects.bulk_create(batch)
+
+
+def consume(parts):
+    size = 0
+    for part in parts:
+        size += len(part)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="100000,1000000,2000000")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    common.setup()
+
+    from django.contrib.auth import get_user_model
+
+    from auth_app import export
+
+    model = get_user_model()
+    rows = 0
+    for size in (int(size) for size in args.sizes.split(",")):
+        populate(model, size - rows, rows)
+        rows = size
+
+        for fmt, compress in FORMATS:
+            if fmt == "parquet" and export.pyarrow is None:
+                continue
+
+            started = time.perf_counter()
+            output_size = consume(export.export_users(fmt, compress, args.chunk_size))
+            elapsed = time.perf_counter() - started
+
+            tracemalloc.start()
+            consume(export.export_users(fmt, compress, args.chunk_size))
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            label = f"{fmt}{'+gzip' if compress else ''}"
+            print(
+                f"{rows:>9} rows  {label:<12} {rows / elapsed:>10.0f} rows/s"
+                f"   {output_size / 2**20:>8.1f} MiB   peak {peak / 2**20:>6.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Смешанная нагрузка: вход в систему и /api/me/ с пулом хэширования и без него.
+
+    python -m benchmarks.bench_hashing [--login-threads 8] [--me-threads 8] [--duration 10]
+"""
+import argparse
+
+from . import common
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--login-threads", type=int, default=8)
+    parser.add_argument("--me-threads", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--backend", default="thread", choices=("thread", "process"))
+    args = parser.parse_args()
+
+    common.setup()
+
+    from django.conf import settings
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from auth_app import hashing
+
+    user = common.create_user()
+    access = str(AccessToken.for_user(user))
+    credentials = {"email": user.email, "password": "Passw0rd!"}
+    threads = args.login_threads + args.me_threads
+
+    for enabled in (False, True):
+        settings.AUTH_APP = {
+            "PASSWORD_HASHING": {
+                "ENABLED": enabled,
+                "BACKEND": args.backend,
+                "WORKERS": args.workers,
+                "QUEUE_SIZE": threads,
+            }
+        }
+        hashing.reset_executor()
+        clients = [Client() for _ in range(threads)]
+
+        def request(index):
+            client = clients[index]
+            if index < args.login_threads:
+                client.post("/api/login/", credentials, content_type="application/json")
+            else:
+                client.get("/api/me/", HTTP_AUTHORIZATION=f"Bearer {access}")
+
+        timings = common.run_threads(threads, args.duration, request)
+        login = [t for samples in timings[: args.login_threads] for t in samples]
+        me = [t for samples in timings[args.login_threads:] for t in samples]
+
+        title = f"pool ({args.backend}, {args.workers} workers)" if enabled else "inline hashing"
+        print(title)
+        print(common.summary("  POST /api/login/", login, args.duration))
+        print(common.summary("  GET  /api/me/", me, args.duration))
+        if enabled:
+            print("  pool stats:", hashing.stats())
+
+
+if __name__ == "__main__":
+    main()
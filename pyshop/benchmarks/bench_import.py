@@ -0,0 +1,58 @@
+"""
+Скорость массового импорта пользователей для 10k, 100k и 1M строк.
+
+По умолчанию пароли хэшируются быстрым MD5, чтобы измерить проверку строк
+и вставку. С --production-hasher используется хэшер из настроек:
+тогда скорость определяется числом воркеров и стоимостью одного хэша.
+
+    python -m benchmarks.bench_import [--sizes 10000,100000,1000000] [--workers 4]
+"""
+import argparse
+import os
+import tempfile
+
+from . import common
+
+
+def write_csv(path, rows, offset):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        file.write("email,password,first_name,last_name,surname\n")
+        for number in range(offset, offset + rows):
+            file.write(f"user{number}@example.com,Passw0rd!,Иван,Петров,Иванович\n")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--production-hasher", action="store_true")
+    args = parser.parse_args()
+
+    overrides = {}
+    if not args.production_hasher:
+        overrides["PASSWORD_HASHERS"] = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+    common.setup(**overrides)
+
+    from auth_app.bulk_import import UserImporter, read_rows
+
+    tmp_dir = tempfile.mkdtemp(prefix="pyshop-import-")
+    offset = 0
+    for size in (int(size) for size in args.sizes.split(",")):
+        path = os.path.join(tmp_dir, f"users-{size}.csv")
+        write_csv(path, size, offset)
+        offset += size
+
+        importer = UserImporter(batch_size=args.batch_size, workers=args.workers)
+        with open(path, newline="", encoding="utf-8") as file:
+            report = importer.run(read_rows(file, "csv"))
+
+        print(
+            f"{size:>9} rows   {report['rows_per_second']:>10.1f} rows/s"
+            f"   {report['elapsed']:>8.2f}s   created {report['created']}"
+            f"   failed {report['failed']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
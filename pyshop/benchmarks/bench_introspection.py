@@ -0,0 +1,73 @@
+"""
+Пропускная способность пакетной проверки токенов для пачек из 1, 100 и 1000 токенов.
+
+    python -m benchmarks.bench_introspection [--tokens 5000]
+"""
+import argparse
+import time
+
+from . import common
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=5000)
+    args = parser.parse_args()
+
+    common.setup()
+
+    from django.db import connection, reset_queries
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    from auth_app import token_cache
+    from auth_app.tokens import AccessToken, RefreshToken
+
+    admin = common.create_user(email="admin@example.com", is_staff=True)
+    users = [common.create_user(email=f"user{i}@example.com") for i in range(50)]
+
+    access = AccessToken.for_user(admin)
+    access.set_exp(lifetime=access.lifetime * 1000)
+    headers = {"Authorization": f"Bearer {access}"}
+
+    tokens = []
+    for i in range(1000):
+        user = users[i % len(users)]
+        token = AccessToken.for_user(user) if i % 2 else RefreshToken.for_user(user)
+        token.set_exp(lifetime=token.lifetime * 1000)
+        tokens.append(str(token))
+    # Часть токенов обновления отозвана.
+    for token in tokens[:100:10]:
+        RefreshToken(token).blacklist()
+
+    client = Client()
+    for batch_size in (1, 100, 1000):
+        batch = tokens[:batch_size]
+        requests = max(1, args.tokens // batch_size)
+        token_cache.reset_token_cache()
+        reset_queries()
+
+        with CaptureQueriesContext(connection) as queries:
+            client.post(
+                "/api/introspect/", {"tokens": batch},
+                content_type="application/json", headers=headers,
+            )
+
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = client.post(
+                "/api/introspect/", {"tokens": batch},
+                content_type="application/json", headers=headers,
+            )
+        elapsed = time.perf_counter() - started
+        assert response.status_code == 200, response.content
+
+        print(
+            f"batch {batch_size:>5}   {requests * batch_size / elapsed:>10.1f} tokens/s"
+            f"   {elapsed / requests * 1000:>8.2f} ms/request"
+            f"   {len(queries)} queries on first request"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Время сериализации и разбора JSON для типичных ответов и запросов API:
+JSONRenderer/JSONParser DRF против FastJSONRenderer/FastJSONParser (orjson).
+
+    python -m benchmarks.bench_json [--iterations 20000]
+"""
+import argparse
+import io
+import time
+
+from . import common
+
+
+def make_payloads():
+    from django.utils import timezone
+    from rest_framework.exceptions import ErrorDetail
+    from rest_framework.utils.serializer_helpers import ReturnDict
+
+    now = timezone.now()
+    user = ReturnDict(
+        {
+            "id": 1,
+            "email": "ivan.petrov@example.com",
+            "first_name": "Иван",
+            "last_name": "Петров",
+            "surname": "Иванович",
+            "username": "ivan.petrov",
+            "notification": True,
+            "date_joined": now,
+        },
+        serializer=None,
+    )
+    claims = {
+        "token_type": "access",
+        "exp": 1760000000,
+        "iat": 1759990000,
+        "jti": "6f1c5b1e9a1b4c8f9b2e4e0f8c1d2a3b",
+        "user_id": 1,
+        "tv": 0,
+    }
+    return {
+        "me": {"data": user, "message": "Данные пользователя"},
+        "login": {"data": {"access": "eyJhbGciOiJIUzI1NiJ9." + "a" * 200}, "message": "Токен доступа"},
+        "validation_400": {
+            "message": [
+                ErrorDetail("Введите корректный адрес электронной почты.", code="invalid"),
+                ErrorDetail("Убедитесь, что значение содержит не менее 8 символов.", code="min_length"),
+            ]
+        },
+        "introspect_1000": {
+            "data": [
+                {"active": True, "blacklisted": False, "claims": claims, "error": None}
+                for _ in range(1000)
+            ],
+            "message": "Результат проверки токенов",
+        },
+    }
+
+
+def make_requests():
+    return {
+        "login": b'{"email": "ivan.petrov@example.com", "password": "Passw0rd!"}',
+        "register": (
+            '{"email": "ivan.petrov@example.com", "password": "Passw0rd!", '
+            '"first_name": "Иван", "last_name": "Петров", "surname": "Иванович"}'
+        ).encode(),
+        "introspect_1000": (
+            '{"tokens": [' + ", ".join(['"' + "a" * 250 + '"'] * 1000) + "]}"
+        ).encode(),
+    }
+
+
+def measure(func, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    common.setup()
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from utils import fast_json
+
+    if fast_json.orjson is None:
+        print("orjson is not installed: FastJSON* fall back to the stdlib json")
+
+    renderers = (JSONRenderer(), fast_json.FastJSONRenderer())
+    for name, payload in make_payloads().items():
+        iterations = max(args.iterations // 100, 100) if name.endswith("1000") else args.iterations
+        stock, fast = (
+            measure(lambda: renderer.render(payload, "application/json"), iterations)
+            for renderer in renderers
+        )
+        print(f"render {name:<18} stock {stock:>9.2f} us   orjson {fast:>9.2f} us   x{stock / fast:.1f}")
+
+    parsers = (JSONParser(), fast_json.FastJSONParser())
+    for name, body in make_requests().items():
+        iterations = max(args.iterations // 100, 100) if name.endswith("1000") else args.iterations
+        stock, fast = (
+            measure(lambda: parser.parse(io.BytesIO(body), "application/json"), iterations)
+            for parser in parsers
+        )
+        print(f"parse  {name:<18} stock {stock:>9.2f} us   orjson {fast:>9.2f} us   x{stock / fast:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Троттлинг входа: накладные расходы проверки на запрос и процессорное
+время, сэкономленное при переборе учетных данных (credential stuffing).
+
+Перебор: несколько IP-адресов пробуют пароли к набору email.
+Хэшер - PBKDF2 с уменьшенным числом итераций, чтобы прогон был коротким;
+доля сэкономленного времени от этого не зависит.
+
+    python -m benchmarks.bench_login_throttle [--iterations 100000] [--ips 10] [--emails 20] [--attempts 400]
+"""
+import argparse
+import logging
+import time
+from collections import Counter
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+from . import common
+
+
+class FastPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = 20000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--ips", type=int, default=10)
+    parser.add_argument("--emails", type=int, default=20)
+    parser.add_argument("--attempts", type=int, default=400)
+    args = parser.parse_args()
+
+    common.setup(
+        PASSWORD_HASHERS=[f"{__name__}.FastPBKDF2PasswordHasher"],
+    )
+    logging.getLogger("utils.errors_handler").setLevel(logging.WARNING)
+    logging.getLogger("django.request").setLevel(logging.ERROR)
+
+    from django.conf import settings
+    from django.test import Client
+    from rest_framework.test import APIRequestFactory
+
+    from auth_app import admission, throttling
+    from auth_app.views import CustomTokenObtainPairView
+
+    # Перебор не должен упираться в контроль допуска.
+    settings.AUTH_APP = {**settings.AUTH_APP, "ADMISSION_CONTROL": {"ENABLED": False}}
+    admission.reset_controller()
+
+    for number in range(args.emails):
+        common.create_user(email=f"victim{number}@example.com")
+
+    # Накладные расходы: проверка троттлинга без хэширования.
+    request = CustomTokenObtainPairView().initialize_request(
+        APIRequestFactory().post(
+            "/api/login/",
+            {"email": "victim0@example.com", "password": "Wr0ngpass!"},
+            format="json",
+        )
+    )
+    throttle = throttling.LoginThrottle()
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        throttle.allow_request(request, None)
+    elapsed = time.perf_counter() - started
+    print(f"throttle check            {elapsed / args.iterations * 1e6:>8.2f} us/request")
+
+    for enabled in (False, True):
+        settings.AUTH_APP = {
+            **settings.AUTH_APP,
+            "LOGIN_THROTTLE": {**settings.AUTH_APP["LOGIN_THROTTLE"], "ENABLED": enabled},
+        }
+        throttling.reset_limiter()
+
+        client = Client()
+        statuses = Counter()
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        for attempt in range(args.attempts):
+            response = client.post(
+                "/api/login/",
+                {
+                    "email": f"victim{attempt % args.emails}@example.com",
+                    "password": f"Guess{attempt:04d}!",
+                },
+                content_type="application/json",
+                REMOTE_ADDR=f"10.0.0.{attempt % args.ips}",
+            )
+            statuses[response.status_code] += 1
+        cpu = time.process_time() - cpu_started
+        elapsed = time.perf_counter() - started
+
+        label = "throttle on " if enabled else "throttle off"
+        print(
+            f"{label}  {args.attempts} attempts   cpu {cpu:>6.2f}s   wall {elapsed:>6.2f}s"
+            f"   statuses {dict(sorted(statuses.items()))}"
+        )
+        if enabled:
+            print("  limiter stats:", throttling.stats())
+
+
+if __name__ == "__main__":
+    main()
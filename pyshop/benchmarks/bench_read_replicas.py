@@ -0,0 +1,79 @@
+"""
+ReplicaRouter на двух файлах SQLite: основная база и реплика, данные
+в реплику копирует sync_sqlite_replicas. Показывает, в какую базу идут
+запросы GET /me, PUT /me и входа, закрепление за основной базой после
+записи (по cookie и по пользователю) и время GET /me.
+
+    python -m benchmarks.bench_read_replicas [--iterations 2000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from . import common
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ["SQLITE_REPLICAS"] = os.path.join(tempfile.mkdtemp(), "replica.sqlite3")
+    common.setup(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.db import connections
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    from auth_app import routers, user_cache
+    from auth_app.tokens import AccessToken
+
+    user = common.create_user()
+    call_command("sync_sqlite_replicas", stdout=open(os.devnull, "w"))
+    access = AccessToken.for_user(user)
+    access.set_exp(lifetime=access.lifetime * 100)
+    headers = {"Authorization": f"Bearer {access}"}
+    client = Client()
+
+    def request(label, method, path, **extra):
+        user_cache.reset_user_cache()
+        with CaptureQueriesContext(connections["default"]) as primary, CaptureQueriesContext(
+            connections["replica1"]
+        ) as replica:
+            response = getattr(client, method)(
+                path, headers=headers, content_type="application/json", **extra
+            )
+        pinned = "primary_pin" in response.cookies
+        print(
+            f"{label:<28} {response.status_code}   primary {len(primary)}"
+            f"   replica {len(replica)}   sets pin cookie: {pinned}"
+        )
+
+    request("GET /me", "get", "/api/me/")
+    request("PUT /me", "put", "/api/me/", data={"first_name": "Петр"})
+    request("GET /me (pinned)", "get", "/api/me/")
+    client.cookies.clear()
+    request("GET /me (user pin)", "get", "/api/me/")
+    cache.delete(f"{routers.PIN_KEY_PREFIX}{user.pk}")
+    request("GET /me (pin expired)", "get", "/api/me/")
+    request(
+        "POST /login", "post", "/api/login/", data={"email": user.email, "password": "Passw0rd!"}
+    )
+    client.cookies.clear()
+
+    for label, pin in (("GET /me from replica", False), ("GET /me from primary", True)):
+        if pin:
+            client.cookies["primary_pin"] = "1"
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            user_cache.reset_user_cache()
+            client.get("/api/me/", headers=headers)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<28} {elapsed / args.iterations * 1e6:.1f} us/request (user cache off)")
+
+
+if __name__ == "__main__":
+    main()
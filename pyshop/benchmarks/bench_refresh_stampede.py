@@ -0,0 +1,84 @@
+"""
+Одновременные обновления одного токена обновления (переподключение
+нескольких вкладок) с объединением обновлений и без него.
+
+    python -m benchmarks.bench_refresh_stampede [--clients 16] [--rounds 20]
+"""
+import argparse
+import threading
+import time
+
+from . import common
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    common.setup()
+
+    from django.conf import settings
+    from django.db import close_old_connections
+    from django.test import Client
+
+    from auth_app import refresh_coalescing
+    from auth_app.models import RefreshTokenRecord
+
+    user = common.create_user()
+
+    for enabled in (False, True):
+        settings.AUTH_APP = {
+            **settings.AUTH_APP,
+            "REFRESH_COALESCING": {
+                **settings.AUTH_APP["REFRESH_COALESCING"],
+                "ENABLED": enabled,
+            },
+        }
+        refresh_coalescing.reset_coalescer()
+        records_before = RefreshTokenRecord.objects.count()
+        statuses = {}
+        elapsed = 0.0
+
+        for _ in range(args.rounds):
+            login = Client().post(
+                "/api/login/",
+                {"email": user.email, "password": "Passw0rd!"},
+                content_type="application/json",
+            )
+            refresh = login.cookies["refreshToken"].value
+            barrier = threading.Barrier(args.clients)
+
+            def refresh_once(index):
+                client = Client()
+                client.cookies["refreshToken"] = refresh
+                barrier.wait()
+                response = client.post("/api/refresh/", {}, content_type="application/json")
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                close_old_connections()
+
+            threads = [
+                threading.Thread(target=refresh_once, args=(i,))
+                for i in range(args.clients)
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed += time.perf_counter() - started
+
+        records = RefreshTokenRecord.objects.count() - records_before - args.rounds
+        label = "coalescing on" if enabled else "coalescing off"
+        print(
+            f"{label:<16} {elapsed / args.rounds * 1000:>8.1f} ms/round"
+            f"   statuses {dict(sorted(statuses.items()))}"
+            f"   refresh records written {records}"
+        )
+        if enabled:
+            print("  coalescer stats:", refresh_coalescing.stats())
+
+
+if __name__ == "__main__":
+    main()
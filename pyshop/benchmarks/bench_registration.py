@@ -0,0 +1,79 @@
+"""
+Одновременная регистрация: клиенты регистрируют одни и те же адреса
+в разном регистре. Показывает число запросов к базе на регистрацию
+и отсутствие дубликатов.
+
+    python -m benchmarks.bench_registration [--workers 4] [--emails 25]
+"""
+import argparse
+import threading
+import time
+from collections import Counter
+
+from . import common
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--emails", type=int, default=25)
+    args = parser.parse_args()
+
+    common.setup()
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import close_old_connections, connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    # SQLite сериализует запись, ждем блокировку вместо ошибки.
+    connection.settings_dict["OPTIONS"] = {"timeout": 30}
+    settings.DATABASES["default"]["OPTIONS"] = {"timeout": 30}
+
+    statuses = Counter()
+    queries = []
+    lock = threading.Lock()
+
+    def register(index):
+        client = Client()
+        for number in range(args.emails):
+            email = f"user{number}@example.com"
+            email = email.upper() if index % 2 else email
+            with CaptureQueriesContext(connection) as captured:
+                response = client.post(
+                    "/api/register/",
+                    {
+                        "email": email,
+                        "password": "Passw0rd!",
+                        "first_name": "Иван",
+                        "last_name": "Петров",
+                    },
+                    content_type="application/json",
+                )
+            with lock:
+                statuses[response.status_code] += 1
+                queries.append(len(captured))
+        close_old_connections()
+
+    threads = [threading.Thread(target=register, args=(i,)) for i in range(args.workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    users = get_user_model().objects.count()
+    print(
+        f"{args.workers * args.emails} registrations in {elapsed:.2f}s"
+        f"   statuses {dict(sorted(statuses.items()))}"
+    )
+    print(
+        f"queries per registration: {sum(queries) / len(queries):.2f}"
+        f"   users created {users} for {args.emails} distinct emails"
+    )
+
+
+if __name__ == "__main__":
+    main()
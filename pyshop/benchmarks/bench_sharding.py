@@ -0,0 +1,121 @@
+"""
+Пропускная способность записи пользователей при добавлении шардов.
+Шарды - файлы SQLite, писатели - процессы, создающие пользователей
+через UserManager.create_user. Перед каждой раскладкой пользователи
+переносятся rebalance_user_shards.
+
+С --profile default (журнал отката, fsync на каждую фиксацию) писатели
+одного файла ждут его блокировку и диск - это ожидание шарды и снимают;
+с --profile wal фиксация дешевая. Если писателям не хватает ядер,
+предел - процессор, и от числа шардов пропускная способность не зависит.
+
+    python -m benchmarks.bench_sharding [--writers 4] [--duration 5] [--shards 1,2,4]
+        [--profile default|wal]
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from . import common
+
+
+def writer(number, shards, options, duration, results):
+    from django.contrib.auth import get_user_model
+    from django.db import OperationalError, connections
+
+    for alias in shards:
+        connections[alias].close()
+        connections[alias].settings_dict["OPTIONS"] = options
+    model = get_user_model()
+
+    timings, locked, index = [], 0, 0
+    stop_at = time.perf_counter() + duration
+    while time.perf_counter() < stop_at:
+        index += 1
+        started = time.perf_counter()
+        try:
+            model.objects.create_user(
+                f"writer{number}-{os.getpid()}-{index}@example.com", "Иван", "Петров", "Passw0rd!"
+            )
+        except OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            locked += 1
+            continue
+        timings.append(time.perf_counter() - started)
+
+    connections.close_all()
+    results.put((timings, locked))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--shards", default="1,2,4")
+    parser.add_argument("--profile", choices=("default", "wal"), default="default")
+    args = parser.parse_args()
+
+    counts = [int(count) for count in args.shards.split(",")]
+    shard_dir = tempfile.mkdtemp(prefix="pyshop-shards-")
+    os.environ["SQLITE_SHARDS"] = ",".join(
+        os.path.join(shard_dir, f"shard{number}.sqlite3") for number in range(1, max(counts) + 1)
+    )
+    common.setup(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connections
+
+    from auth_app import sharding
+
+    aliases = [f"shard{number}" for number in range(1, max(counts) + 1)]
+    for alias in aliases:
+        call_command("migrate", database=alias, verbosity=0, interactive=False)
+
+    if args.profile == "wal":
+        pragmas = settings.SQLITE_WAL_PRAGMAS
+    else:
+        pragmas = {"busy_timeout": settings.SQLITE_WAL_PRAGMAS["busy_timeout"]}
+    options = {
+        "init_command": "; ".join(f"PRAGMA {name}={value}" for name, value in pragmas.items()),
+        "transaction_mode": "IMMEDIATE",
+    }
+
+    context = multiprocessing.get_context("fork")
+    for count in counts:
+        shards = tuple(aliases[:count])
+        settings.AUTH_APP = {**settings.AUTH_APP, "SHARDING": {"ENABLED": True, "SHARDS": shards}}
+        report = sharding.rebalance(shards)
+        connections.close_all()
+
+        results = context.Queue()
+        processes = [
+            context.Process(target=writer, args=(number, shards, options, args.duration, results))
+            for number in range(args.writers)
+        ]
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+        timings = [t for samples, _ in collected for t in samples]
+        locked = sum(count for _, count in collected)
+        users = {alias: get_user_model().objects.using(alias).count() for alias in shards}
+        print(
+            f"{common.summary(f'{count} shard(s), create_user', timings, args.duration)}"
+            f"   locked {locked}"
+        )
+        print(
+            f"    rebalanced {sum(report['moved'].values())} users in {report['elapsed']:.2f}s"
+            f", users per shard {users}"
+        )
+        connections.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Стоимость подписи и проверки токена доступа для алгоритмов HS256, RS256 и EdDSA.
+
+    python -m benchmarks.bench_signing [--iterations 5000]
+"""
+import argparse
+import io
+import tempfile
+import time
+
+from . import common
+
+
+def measure(function, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - started) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    common.setup()
+
+    from django.conf import settings
+    from django.core.management import call_command
+
+    from auth_app import signing
+    from auth_app.tokens import AccessToken
+
+    user = common.create_user()
+
+    for algorithm in ("HS256", "RS256", "EdDSA"):
+        keys_dir = tempfile.mkdtemp(prefix="pyshop-keys-")
+        settings.AUTH_APP = {
+            **settings.AUTH_APP,
+            "SIGNING": {
+                **settings.AUTH_APP["SIGNING"],
+                "ALGORITHM": algorithm,
+                "KEYS_DIR": keys_dir,
+                "ACTIVE_KID": None,
+            },
+        }
+        if not algorithm.startswith("HS"):
+            call_command("generate_signing_key", kid="bench", stdout=io.StringIO())
+        signing.reset_token_backend()
+
+        token = AccessToken.for_user(user)
+        raw_token = str(token)
+        sign = measure(lambda: str(token), args.iterations)
+        verify = measure(lambda: AccessToken(raw_token), args.iterations)
+
+        print(
+            f"{algorithm:<8} sign {sign * 1e6:>8.1f} us   verify {verify * 1e6:>8.1f} us"
+            f"   token {len(raw_token)} bytes"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Чтение и запись SQLite из нескольких процессов: настройки по умолчанию
+(журнал отката) против профиля SQLITE_WAL_PRAGMAS. Читатели загружают
+пользователя по email, писатели, как вход, читают пользователя
+и обновляют last_login в одной транзакции. Пропускная способность,
+задержки и ошибки "database is locked".
+
+    python -m benchmarks.bench_sqlite_profile [--readers 4] [--writers 4] [--duration 5]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import time
+
+from . import common
+
+
+def worker(db_path, options, role, users, duration, results):
+    from django.contrib.auth import get_user_model
+    from django.db import OperationalError, connection, transaction
+    from django.utils import timezone
+
+    connection.close()
+    connection.settings_dict["NAME"] = db_path
+    connection.settings_dict["OPTIONS"] = options
+    model = get_user_model()
+
+    timings, locked = [], 0
+    stop_at = time.perf_counter() + duration
+    while time.perf_counter() < stop_at:
+        email = f"user{random.randrange(users)}@example.com"
+        started = time.perf_counter()
+        try:
+            if role == "reader":
+                model.objects.get(email=email)
+            else:
+                with transaction.atomic():
+                    user = model.objects.get(email=email)
+                    user.last_login = timezone.now()
+                    user.save(update_fields=["last_login"])
+        except OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            locked += 1
+            continue
+        timings.append(time.perf_counter() - started)
+
+    connection.close()
+    results.put((role, timings, locked))
+
+
+def run(label, db_path, options, args):
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    roles = ["reader"] * args.readers + ["writer"] * args.writers
+    processes = [
+        context.Process(
+            target=worker, args=(db_path, options, role, args.users, args.duration, results)
+        )
+        for role in roles
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    print(label)
+    for role in ("reader", "writer"):
+        timings = [t for r, samples, _ in collected if r == role for t in samples]
+        locked = sum(count for r, _, count in collected if r == role)
+        print(f"  {common.summary(role + 's', timings, args.duration)}   locked {locked}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    tmp_dir = common.setup(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import connections
+
+    from auth_app import db_maintenance
+
+    get_user_model().objects.bulk_create(
+        get_user_model()(email=f"user{number}@example.com", first_name="Иван", last_name="Петров")
+        for number in range(args.users)
+    )
+    connections.close_all()
+
+    source = settings.DATABASES["default"]["NAME"]
+    profiles = (
+        ("default (rollback journal)", {}),
+        (
+            "SQLITE_PROFILE=wal",
+            {
+                "init_command": "; ".join(
+                    f"PRAGMA {name}={value}"
+                    for name, value in settings.SQLITE_WAL_PRAGMAS.items()
+                ),
+                "transaction_mode": "IMMEDIATE",
+            },
+        ),
+    )
+    for number, (label, options) in enumerate(profiles):
+        db_path = os.path.join(tmp_dir, f"profile{number}.sqlite3")
+        shutil.copy(source, db_path)
+        run(label, db_path, options, args)
+
+    connection = connections["default"]
+    connection.settings_dict["NAME"] = db_path
+    started = time.perf_counter()
+    report = db_maintenance.run_maintenance("TRUNCATE")
+    print(f"checkpoint(TRUNCATE) + optimize: {report['default']}"
+          f"   {(time.perf_counter() - started) * 1000:.1f} ms")
+    print(f"WAL size after checkpoint: {os.path.getsize(db_path + '-wal')} bytes")
+
+
+if __name__ == "__main__":
+    main()
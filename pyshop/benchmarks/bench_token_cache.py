@@ -0,0 +1,49 @@
+"""
+Стоимость JWT-аутентификации одного запроса с кэшем проверенных
+токенов и без него.
+
+    python -m benchmarks.bench_token_cache [--iterations 50000]
+"""
+import argparse
+import time
+
+from . import common
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+
+    common.setup()
+
+    from django.conf import settings
+    from django.test import RequestFactory
+
+    from auth_app import token_cache
+    from auth_app.authentication import CustomJWTAuthentication
+    from auth_app.tokens import AccessToken
+
+    user = common.create_user()
+    access = AccessToken.for_user(user)
+    access.set_exp(lifetime=access.lifetime * 100)
+    request = RequestFactory().get("/api/me/", headers={"Authorization": f"Bearer {access}"})
+    authentication = CustomJWTAuthentication()
+
+    for enabled in (False, True):
+        settings.AUTH_APP = {**settings.AUTH_APP, "TOKEN_CACHE": {"ENABLED": enabled}}
+        token_cache.reset_token_cache()
+
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            authentication.authenticate(request)
+        elapsed = time.perf_counter() - started
+
+        label = "token cache on" if enabled else "token cache off"
+        print(f"{label:<16} {elapsed / args.iterations * 1e6:>8.2f} us/request")
+        if enabled:
+            print("  cache stats:", token_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
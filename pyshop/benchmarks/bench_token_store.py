@@ -0,0 +1,73 @@
+"""
+Размер таблиц и задержка поиска токена обновления:
+OutstandingToken из simplejwt против компактного RefreshTokenRecord.
+
+    python -m benchmarks.bench_token_store [--tokens 20000] [--lookups 5000]
+"""
+import argparse
+import random
+import time
+
+from . import common
+
+
+def measure_lookups(lookup, keys, count):
+    sample = random.choices(keys, k=count)
+    started = time.perf_counter()
+    for key in sample:
+        lookup(key)
+    return (time.perf_counter() - started) / count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=5000)
+    args = parser.parse_args()
+
+    common.setup()
+
+    from django.conf import settings
+    from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+    from auth_app import token_store
+    from auth_app.models import RefreshTokenRecord
+    from auth_app.purge import table_size
+    from auth_app.tokens import RefreshToken
+
+    user = common.create_user()
+
+    settings.AUTH_APP = {**settings.AUTH_APP, "TOKEN_STORE": {"ENABLED": False}}
+    started = time.perf_counter()
+    jtis = [RefreshToken.for_user(user)["jti"] for _ in range(args.tokens)]
+    outstanding_issue = (time.perf_counter() - started) / args.tokens
+
+    settings.AUTH_APP = {**settings.AUTH_APP, "TOKEN_STORE": {"ENABLED": True}}
+    started = time.perf_counter()
+    keys = [
+        token_store.jti_hash(RefreshToken.for_user(user)["jti"])
+        for _ in range(args.tokens)
+    ]
+    store_issue = (time.perf_counter() - started) / args.tokens
+
+    outstanding_lookup = measure_lookups(
+        lambda jti: OutstandingToken.objects.get(jti=jti), jtis, args.lookups
+    )
+    store_lookup = measure_lookups(
+        lambda key: RefreshTokenRecord.objects.get(jti_hash=key), keys, args.lookups
+    )
+
+    for label, model, issue, lookup in (
+        ("OutstandingToken", OutstandingToken, outstanding_issue, outstanding_lookup),
+        ("RefreshTokenRecord", RefreshTokenRecord, store_issue, store_lookup),
+    ):
+        rows, size = table_size(model)
+        per_row = f"{size / rows:>7.1f} B/row" if size and rows else "    n/a"
+        print(
+            f"{label:<20} {rows:>8} rows {per_row}"
+            f"   issue {issue * 1e6:>8.1f} us   lookup {lookup * 1e6:>8.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
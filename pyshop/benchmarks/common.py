@@ -0,0 +1,84 @@
+"""
+Общая подготовка окружения для бенчмарков.
+
+Бенчмарки запускаются из каталога проекта:
+    python -m benchmarks.bench_hashing
+"""
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+import django
+from django.core.management import call_command
+
+
+def setup(**overrides):
+    """
+    Настраивает Django на временной базе SQLite и применяет миграции.
+    overrides переопределяют значения из pyshop.settings.
+    """
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pyshop.settings")
+    from django.conf import settings
+
+    tmp_dir = tempfile.mkdtemp(prefix="pyshop-bench-")
+    settings.DATABASES["default"]["NAME"] = os.path.join(tmp_dir, "db.sqlite3")
+    settings.ALLOWED_HOSTS = ["testserver"]
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    django.setup()
+    call_command("migrate", verbosity=0, interactive=False)
+    return tmp_dir
+
+
+def create_user(email="bench@example.com", password="Passw0rd!", **extra_fields):
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.create_user(
+        email=email,
+        first_name="Иван",
+        last_name="Иванов",
+        password=password,
+        is_active=True,
+        **extra_fields,
+    )
+
+
+def run_threads(workers, duration, target):
+    """
+    Вызывает target() в workers потоках в течение duration секунд.
+    Возвращает список длительностей вызовов по потокам.
+    """
+
+    stop_at = time.perf_counter() + duration
+    timings = [[] for _ in range(workers)]
+
+    def loop(index):
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            target(index)
+            timings[index].append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=loop, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return timings
+
+
+def summary(label, samples, duration):
+    """Строка отчета: пропускная способность и перцентили задержки."""
+
+    if not samples:
+        return f"{label:<32} no samples"
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1] if len(samples) >= 20 else samples[-1]
+    return (
+        f"{label:<32} {len(samples) / duration:>10.1f} req/s"
+        f"   p50 {p50 * 1000:>8.2f} ms   p95 {p95 * 1000:>8.2f} ms"
+    )
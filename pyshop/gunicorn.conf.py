@@ -0,0 +1,11 @@
+# Настройки gunicorn: gunicorn -c gunicorn.conf.py pyshop.wsgi
+#
+# Фоновые потоки приложения запускаются в каждом воркере после fork,
+# а не в AppConfig.ready(): потоки мастера не переживают fork.
+
+
+def post_fork(server, worker):
+    from auth_app import db_maintenance, purge
+
+    purge.start_scheduler()
+    db_maintenance.start_scheduler()
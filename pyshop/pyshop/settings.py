@@ -42,14 +42,17 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     #  'rest_framework_simplejwt_spectacular',
     'drf_spectacular',
     'auth_app',
 ]
 
 SIMPLE_JWT = {
+    "AUTH_TOKEN_CLASSES": ("auth_app.tokens.AccessToken",),
     "ACCESS_TOKEN_LIFETIME": datetime.timedelta(seconds=30),
     "REFRESH_TOKEN_LIFETIME": datetime.timedelta(days=30),
+    "ROTATE_REFRESH_TOKENS": True,
     'AUTH_COOKIE_REFRESH': 'refreshToken',  # Cookie name. Enables cookies if value is set.
     'AUTH_COOKIE_SECURE': True if environ.get("ON_SERVER") == "True" else False,
     'AUTH_COOKIE_HTTP_ONLY': True,  # Http only cookie flag.It's not fetch by javascript.
@@ -59,18 +62,123 @@ SIMPLE_JWT = {
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "auth_app.authentication.CustomJWTAuthentication",
         # "rest_framework.authentication.SessionAuthentication"
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 1,
     "EXCEPTION_HANDLER": "utils.errors_handler.custom_exception_handler",
+    # JSON через orjson, если он установлен.
+    "DEFAULT_RENDERER_CLASSES": (
+        "utils.fast_json.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "utils.fast_json.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
+# Асинхронные представления auth_app, включаются при запуске через ASGI.
+ASYNC_AUTH_VIEWS = environ.get("ASYNC_AUTH_VIEWS") == "True"
+
+AUTH_APP = {
+    "PASSWORD_HASHING": {
+        "ENABLED": environ.get("PASSWORD_HASHING_POOL", "True") == "True",
+        "BACKEND": environ.get("PASSWORD_HASHING_BACKEND", "thread"),
+        "WORKERS": int(environ.get("PASSWORD_HASHING_WORKERS", 4)),
+        "QUEUE_SIZE": int(environ.get("PASSWORD_HASHING_QUEUE_SIZE", 32)),
+        "QUEUE_TIMEOUT": 5,
+    },
+    "USER_CACHE": {
+        "ENABLED": environ.get("USER_CACHE", "True") == "True",
+        "BACKEND": environ.get("USER_CACHE_BACKEND", "local"),
+        "CACHE_ALIAS": "default",
+        "MAX_SIZE": 10000,
+        "TTL": 60,
+    },
+    "TOKEN_CACHE": {
+        "ENABLED": environ.get("TOKEN_CACHE", "True") == "True",
+        "MAX_SIZE": 10000,
+    },
+    "BLACKLIST_INDEX": {
+        "ENABLED": True,
+        "CAPACITY": 100000,
+        "ERROR_RATE": 0.001,
+        # Отзыв в другом воркере виден здесь не позже чем через SYNC_INTERVAL.
+        "SYNC_INTERVAL": 1.0,
+        "SYNC_OVERLAP": 5.0,
+        "PRUNE_INTERVAL": 300,
+    },
+    "TOKEN_PURGE": {
+        "SCHEDULE": environ.get("TOKEN_PURGE_SCHEDULE") == "True",
+        "INTERVAL": 3600,
+        "BATCH_SIZE": 1000,
+        "PAUSE": 0.1,
+    },
+    "TOKEN_STORE": {
+        "ENABLED": True,
+    },
+    "REFRESH_COALESCING": {
+        "ENABLED": environ.get("REFRESH_COALESCING", "True") == "True",
+        "BACKEND": environ.get("REFRESH_COALESCING_BACKEND", "shared"),
+        "CACHE_ALIAS": "default",
+        "GRACE": 5,
+        "WAIT_TIMEOUT": 2,
+        "MAX_SIZE": 10000,
+    },
+    "SIGNING": {
+        "ALGORITHM": environ.get("JWT_ALGORITHM", "HS256"),
+        "KEYS_DIR": environ.get("JWT_KEYS_DIR", BASE_DIR / "keys"),
+        "ACTIVE_KID": environ.get("JWT_ACTIVE_KID"),
+        "JWKS_MAX_AGE": 3600,
+    },
+    "INTROSPECTION": {
+        "MAX_TOKENS": 1000,
+    },
+    "LAZY_USER": True,
+    "ADMISSION_CONTROL": {
+        "ENABLED": environ.get("ADMISSION_CONTROL", "True") == "True",
+        "MAX_CONCURRENT": int(environ.get("ADMISSION_MAX_CONCURRENT", 8)),
+        "QUEUE_SIZE": int(environ.get("ADMISSION_QUEUE_SIZE", 16)),
+        "QUEUE_TIMEOUT": float(environ.get("ADMISSION_QUEUE_TIMEOUT", 0.5)),
+        "GLOBAL_MAX_CONCURRENT": (
+            int(environ["ADMISSION_GLOBAL_MAX_CONCURRENT"])
+            if environ.get("ADMISSION_GLOBAL_MAX_CONCURRENT")
+            else None
+        ),
+    },
+    "LOGIN_THROTTLE": {
+        "ENABLED": environ.get("LOGIN_THROTTLE", "True") == "True",
+        "BACKEND": environ.get("LOGIN_THROTTLE_BACKEND", "local"),
+        "WINDOW": int(environ.get("LOGIN_THROTTLE_WINDOW", 300)),
+        "IP_LIMIT": int(environ.get("LOGIN_THROTTLE_IP_LIMIT", 50)),
+        "EMAIL_LIMIT": int(environ.get("LOGIN_THROTTLE_EMAIL_LIMIT", 20)),
+    },
+    "USER_IMPORT": {
+        "WORKERS": int(environ.get("USER_IMPORT_WORKERS", 2)),
+    },
+    "SQLITE_MAINTENANCE": {
+        "SCHEDULE": environ.get("SQLITE_MAINTENANCE_SCHEDULE") == "True",
+        "INTERVAL": int(environ.get("SQLITE_MAINTENANCE_INTERVAL", 300)),
+        "CHECKPOINT_MODE": environ.get("SQLITE_CHECKPOINT_MODE", "PASSIVE"),
+    },
+    "READ_REPLICAS": {
+        "STICKY_SECONDS": int(environ.get("REPLICA_STICKY_SECONDS", 5)),
+    },
+    "SHARDING": {
+        "ENABLED": environ.get("USER_SHARDING") == "True",
+        "SHARDS": tuple(environ.get("USER_SHARDS", "default").split(",")),
+    },
+}
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'auth_app.middleware.AdmissionControlMiddleware',
+    'auth_app.middleware.ReplicaPinningMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -111,6 +219,47 @@ DATABASES = {
     }
 }
 
+# Профиль SQLite для нескольких воркеров, включается SQLITE_PROFILE=wal.
+# WAL не блокирует чтение записью, synchronous=NORMAL в WAL не теряет
+# согласованность при сбое процесса, busy_timeout ждет блокировку вместо
+# "database is locked". Прагмы выполняются на каждом новом соединении;
+# режим WAL сохраняется в файле базы и после отключения профиля.
+SQLITE_WAL_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": int(environ.get("SQLITE_BUSY_TIMEOUT", 5000)),
+    "mmap_size": int(environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    # Отрицательное значение - размер в КиБ, а не в страницах.
+    "cache_size": int(environ.get("SQLITE_CACHE_SIZE", -64000)),
+    "temp_store": "MEMORY",
+}
+
+if environ.get("SQLITE_PROFILE") == "wal":
+    DATABASES['default']['OPTIONS'] = {
+        "init_command": "; ".join(
+            f"PRAGMA {name}={value}" for name, value in SQLITE_WAL_PRAGMAS.items()
+        ),
+        # Транзакции сразу берут блокировку записи: иначе чтение,
+        # перешедшее к записи, получает SQLITE_BUSY без ожидания.
+        "transaction_mode": "IMMEDIATE",
+    }
+
+# Реплики для чтения. Локально их заменяют файлы SQLite из SQLITE_REPLICAS
+# (через запятую), данные в них копирует команда sync_sqlite_replicas.
+for number, name in enumerate(filter(None, environ.get("SQLITE_REPLICAS", "").split(",")), 1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': name,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Шарды пользователей (см. AUTH_APP["SHARDING"]). Локально это файлы SQLite
+# из SQLITE_SHARDS (через запятую) с алиасами shard1, shard2, ...
+for number, name in enumerate(filter(None, environ.get("SQLITE_SHARDS", "").split(",")), 1):
+    DATABASES[f'shard{number}'] = {**DATABASES['default'], 'NAME': name}
+
+DATABASE_ROUTERS = ['auth_app.routers.ShardRouter', 'auth_app.routers.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -151,3 +300,44 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 SITE_ID = 1
+
+# Ошибки из utils.errors_handler и предупреждения django.request (4xx/5xx)
+# пишутся фоновым потоком, запрос не ждет записи. Фильтры и mail_admins
+# повторяют настройки Django по умолчанию.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "require_debug_false": {"()": "django.utils.log.RequireDebugFalse"},
+        "require_debug_true": {"()": "django.utils.log.RequireDebugTrue"},
+    },
+    "handlers": {
+        "queue": {
+            "class": "utils.log.QueueHandler",
+            "maxsize": 10000,
+        },
+        "request_queue": {
+            "class": "utils.log.QueueHandler",
+            "maxsize": 10000,
+            "stream": "ext://sys.stderr",
+            "filters": ["require_debug_true"],
+        },
+        "mail_admins": {
+            "level": "ERROR",
+            "filters": ["require_debug_false"],
+            "class": "django.utils.log.AdminEmailHandler",
+        },
+    },
+    "loggers": {
+        "utils.errors_handler": {
+            "handlers": ["queue"],
+            "level": environ.get("ERRORS_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+        "django.request": {
+            "handlers": ["request_queue", "mail_admins"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
@@ -17,8 +17,11 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from auth_app.views import JWKSView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('.well-known/jwks.json', JWKSView.as_view(), name="jwks"),
     path('api/', include("auth_app.urls"))
 ]
 
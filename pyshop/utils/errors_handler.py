@@ -1,149 +1,195 @@
-from typing import Any
+import logging
 import smtplib
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any
+
 from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldError, ObjectDoesNotExist
 from django.db import IntegrityError
-from rest_framework.response import Response
-from rest_framework.views import exception_handler
+from django.http import Http404
 from rest_framework import status
 from rest_framework.exceptions import (
-    ValidationError,
-    PermissionDenied,
-    NotAuthenticated,
+    APIException,
     AuthenticationFailed,
     MethodNotAllowed,
     NotAcceptable,
-    UnsupportedMediaType,
+    NotAuthenticated,
+    PermissionDenied,
     Throttled,
+    UnsupportedMediaType,
+    ValidationError,
 )
-from django.http import Http404
-from django.core.exceptions import FieldError, ObjectDoesNotExist
+from rest_framework.response import Response
+from rest_framework.views import exception_handler, set_rollback
 from rest_framework_simplejwt.exceptions import TokenError
 
+from auth_app.async_views import AsyncTokenObtainPairView, AsyncTokenRefreshView
+from auth_app.hashing import HashingPoolOverloaded
 from auth_app.views import CustomTokenObtainPairView, CustomTokenRefreshView
 
 USER_MODEL = get_user_model()
 
+# Записи уходят в очередь обработчика utils.log.QueueHandler (см. LOGGING),
+# запрос не ждет записи в stdout.
+logger = logging.getLogger(__name__)
+
+REFRESH_VIEWS = (CustomTokenRefreshView, AsyncTokenRefreshView)
+LOGIN_VIEWS = (CustomTokenObtainPairView, AsyncTokenObtainPairView)
+
+# Тела ответов только для чтения: каждый ответ получает свою копию,
+# потому что представления и middleware могут изменять response.data.
+INVALID_REFRESH_PAYLOAD = MappingProxyType({"message": "Токен просрочен или не действительный"})
+LOGIN_FAILED_PAYLOAD = MappingProxyType(
+    {"message": "Активная учетная запись с указанными учетными данными не найдена."}
+)
+AUTHENTICATION_FAILED_PAYLOAD = MappingProxyType({"message": "Ошибка авторизации"})
+INVALID_TOKEN_PAYLOAD = MappingProxyType({"message": "Неверный токен"})
+SERVER_ERROR_PAYLOAD = MappingProxyType({"message": "Внутренняя ошибка сервера"})
+THROTTLED_PAYLOAD = MappingProxyType({"message": "Превышены ограничения скорости"})
+
+
+def static_response(message, status_code, headers=None):
+    """Обработчик, отвечающий постоянным сообщением."""
+
+    payload = MappingProxyType({"message": message})
+
+    def handler(exc, view):
+        return Response(dict(payload), status=status_code, headers=headers)
+
+    return handler
+
+
+def handle_validation_error(exc, view):
+    if isinstance(exc.detail, dict):
+        message = [
+            message
+            for field_errors in exc.detail.values()
+            for message in field_errors
+        ]
+    else:
+        message = exc.detail
+    return Response({"message": message}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def handle_authentication_failed(exc, view):
+    if isinstance(view, REFRESH_VIEWS):
+        return Response(dict(INVALID_REFRESH_PAYLOAD), status=status.HTTP_403_FORBIDDEN)
+    if isinstance(view, LOGIN_VIEWS):
+        return Response(dict(LOGIN_FAILED_PAYLOAD), status=status.HTTP_401_UNAUTHORIZED)
+    return Response(dict(AUTHENTICATION_FAILED_PAYLOAD), status=status.HTTP_401_UNAUTHORIZED)
+
+
+def handle_token_error(exc, view):
+    if isinstance(view, REFRESH_VIEWS):
+        return Response(dict(INVALID_REFRESH_PAYLOAD), status=status.HTTP_403_FORBIDDEN)
+    return Response(dict(INVALID_TOKEN_PAYLOAD), status=status.HTTP_400_BAD_REQUEST)
+
+
+def handle_object_does_not_exist(exc, view):
+    return Response(
+        {"message": f"Объект не найден: {exc.args[0]}"}, status=status.HTTP_404_NOT_FOUND
+    )
+
+
+def handle_value_error(exc, view):
+    return Response(
+        {"message": "Некорректное значение: " + str(exc)}, status=status.HTTP_400_BAD_REQUEST
+    )
+
+
+def handle_throttled(exc, view):
+    headers = {"Retry-After": str(int(exc.wait))} if exc.wait is not None else None
+    return Response(dict(THROTTLED_PAYLOAD), status=status.HTTP_429_TOO_MANY_REQUESTS, headers=headers)
+
+
+def handle_attribute_error(exc, view):
+    return Response(
+        {"message": f"Ошибка: При попытке доступа к атрибуту {exc.args[0]}"},
+        status=status.HTTP_400_BAD_REQUEST,
+    )
+
+
+# Обработчик выбирается по первому классу из MRO исключения,
+# для которого есть запись в таблице.
+EXCEPTION_HANDLERS = {
+    ValidationError: handle_validation_error,
+    AuthenticationFailed: handle_authentication_failed,
+    PermissionDenied: static_response("Доступ запрещен", status.HTTP_403_FORBIDDEN),
+    NotAuthenticated: static_response(
+        "Необходима аутентификация", status.HTTP_401_UNAUTHORIZED
+    ),
+    USER_MODEL.DoesNotExist: static_response(
+        "Пользователь не найден", status.HTTP_404_NOT_FOUND
+    ),
+    ObjectDoesNotExist: handle_object_does_not_exist,
+    ValueError: handle_value_error,
+    TypeError: handle_value_error,
+    Http404: static_response("Страница не найдена", status.HTTP_404_NOT_FOUND),
+    smtplib.SMTPException: static_response(
+        "Ошибка при отправке почты", status.HTTP_500_INTERNAL_SERVER_ERROR
+    ),
+    TokenError: handle_token_error,
+    MethodNotAllowed: static_response(
+        "Метод HTTP не разрешен для данного эндпоинта",
+        status.HTTP_405_METHOD_NOT_ALLOWED,
+    ),
+    NotAcceptable: static_response(
+        "Сервер не может предоставить контент, который удовлетворяет "
+        "заголовку Accept в запросе",
+        status.HTTP_406_NOT_ACCEPTABLE,
+    ),
+    UnsupportedMediaType: static_response(
+        "Сервер не может обработать запрос "
+        "из-за неподдерживаемого типа медиа-контента",
+        status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+    ),
+    Throttled: handle_throttled,
+    HashingPoolOverloaded: static_response(
+        "Сервер перегружен, повторите попытку позже",
+        status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": "1"},
+    ),
+    IntegrityError: static_response(
+        "Произошла ошибка базы данных", status.HTTP_400_BAD_REQUEST
+    ),
+    FieldError: static_response(
+        "В запрос передан неверное имя поля", status.HTTP_400_BAD_REQUEST
+    ),
+    AttributeError: handle_attribute_error,
+}
+
+
+@lru_cache(maxsize=1024)
+def get_handler(exc_type):
+    """Обработчик для типа исключения или None. Результат кэшируется по типу."""
+
+    for klass in exc_type.__mro__:
+        handler = EXCEPTION_HANDLERS.get(klass)
+        if handler is not None:
+            return handler
+    return None
+
 
 def custom_exception_handler(exc: Exception, context: dict[str, Any]) -> Response:
     """
-    Функция вызова встроенного кастомного обработчика исключений DRF
-    для предварительной обработки исключения.
+    Кастомный обработчик исключений DRF.
+    Исключения без записи в EXCEPTION_HANDLERS обрабатываются
+    встроенным обработчиком DRF.
     """
-    print(exc)
-    response = exception_handler(exc, context)
-    view = context.get('view')
-
-    if isinstance(exc, ValidationError):
-        if isinstance(exc.detail, dict):
-            message = [
-                message
-                for field_errors in exc.detail.values()
-                for message in field_errors
-            ]
-        else:
-            message = exc.detail
-        return Response({"message": message}, status=status.HTTP_400_BAD_REQUEST)
-    elif isinstance(exc, AuthenticationFailed):
-        if isinstance(view, CustomTokenRefreshView):
-            custom_response_data = {
-                "message": "Токен просрочен или не действительный"
-            }
-            return Response(custom_response_data, status=status.HTTP_403_FORBIDDEN)
-        elif isinstance(view, CustomTokenObtainPairView):
-            custom_response_data = {
-                "message": "Активная учетная запись с указанными учетными "
-                "данными не найдена."
-            }
-            return Response(custom_response_data, status=status.HTTP_401_UNAUTHORIZED)
-        else:
-            custom_response_data = {
-                "message": "Ошибка авторизации"
-            }
-            return Response(custom_response_data, status=status.HTTP_401_UNAUTHORIZED)
-    elif isinstance(exc, PermissionDenied):
-        return Response(
-            {"message": "Доступ запрещен"}, status=status.HTTP_403_FORBIDDEN
-        )
-    elif isinstance(exc, NotAuthenticated):
-        return Response(
-            {"message": "Необходима аутентификация"},
-            status=status.HTTP_401_UNAUTHORIZED,
-        )
-    elif isinstance(exc, USER_MODEL.DoesNotExist):
-        return Response(
-            {"message": "Пользователь не найден"}, status=status.HTTP_404_NOT_FOUND
-        )
-    elif isinstance(exc, ObjectDoesNotExist):
-        return Response(
-            {"message": f"Объект не найден: {exc.args[0]}"}, status=status.HTTP_404_NOT_FOUND
-        )
-    elif isinstance(exc, (ValueError, TypeError)):
-        return Response(
-            {"message": "Некорректное значение: " + str(exc)}, status=status.HTTP_400_BAD_REQUEST
-        )
-    elif isinstance(exc, Http404):
-        return Response(
-            {"message": "Страница не найдена"}, status=status.HTTP_404_NOT_FOUND
-        )
-    elif isinstance(exc, smtplib.SMTPException):
-        return Response(
-            {"message": "Ошибка при отправке почты"},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        )
-    elif isinstance(exc, TokenError):
-        if isinstance(view, CustomTokenRefreshView):
-            custom_response_data = {
-                "message": "Токен просрочен или не действительный"
-            }
-            return Response(custom_response_data, status=status.HTTP_403_FORBIDDEN)
-        else:
+    logger.info("%s: %s", type(exc).__name__, exc)
+
+    handler = get_handler(type(exc))
+    if handler is None:
+        response = exception_handler(exc, context)
+        if response is None:
             return Response(
-                {"message": "Неверный токен"}, status=status.HTTP_400_BAD_REQUEST
+                dict(SERVER_ERROR_PAYLOAD), status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-    elif isinstance(exc, MethodNotAllowed):
-        return Response(
-            {"message": "Метод HTTP не разрешен для данного эндпоинта"},
-            status=status.HTTP_405_METHOD_NOT_ALLOWED,
-        )
-    elif isinstance(exc, NotAcceptable):
-        return Response(
-            {
-                "message": "Сервер не может предоставить контент, который удовлетворяет "
-                "заголовку Accept в запросе"
-            },
-            status=status.HTTP_406_NOT_ACCEPTABLE,
-        )
-    elif isinstance(exc, UnsupportedMediaType):
-        return Response(
-            {
-                "message": "Сервер не может обработать запрос "
-                "из-за неподдерживаемого типа медиа-контента"
-            },
-            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-        )
-    elif isinstance(exc, Throttled):
-        return Response(
-            {"message": "Превышены ограничения скорости"},
-            status=status.HTTP_429_TOO_MANY_REQUESTS,
-        )
-    elif isinstance(exc, IntegrityError):
-        return Response(
-            {"message": "Произошла ошибка базы данных"},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-    elif isinstance(exc, FieldError):
-        return Response(
-            {"message": "В запрос передан неверное имя поля"},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-    elif isinstance(exc, AttributeError):
-        return Response(
-            {"message": f"Ошибка: При попытке доступа к атрибуту {exc.args[0]}"},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-    if response is None:
-        return Response(
-            {"message": "Внутренняя ошибка сервера"},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        )
-    return response
\ No newline at end of file
+        return response
+
+    # Как и встроенный обработчик, откатываем транзакцию запроса
+    # для исключений, которые он обрабатывает.
+    if isinstance(exc, (APIException, Http404)):
+        set_rollback()
+    return handler(exc, context.get("view"))
@@ -0,0 +1,79 @@
+import json
+
+from rest_framework.utils import encoders
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Типы, которых orjson не знает (Decimal, ленивые строки перевода, QuerySet),
+# преобразуются так же, как в JSONRenderer DRF.
+_default = encoders.JSONEncoder().default
+
+if orjson is not None:
+    # Даты и время orjson сериализует сам, в UTC с суффиксом Z, как DRF.
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+def dumps(data):
+    """JSON в байтах, кириллица без экранирования."""
+
+    if orjson is None:
+        return json.dumps(
+            data, cls=encoders.JSONEncoder, ensure_ascii=False, separators=(",", ":")
+        ).encode()
+    return orjson.dumps(data, default=_default, option=OPTIONS)
+
+
+def loads(data):
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson. Без orjson, с отступами (indent в Accept)
+    или с UNICODE_JSON/COMPACT_JSON = False работает как JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            # Например, целые больше 64 бит.
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Как и JSONRenderer, экранируем U+2028 и U+2029.
+        # Поиск одного байта (memchr) намного быстрее поиска подстроки,
+        # а в кириллице байта 0xE2 нет.
+        if b"\xe2" in ret and (b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret):
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser на orjson. Без orjson или не в UTF-8 работает как JSONParser."""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
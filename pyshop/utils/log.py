@@ -0,0 +1,65 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Обработчик логов, который не блокирует вызывающий поток.
+
+    Записи кладутся в ограниченную очередь, форматирование и запись
+    в поток вывода выполняет фоновый QueueListener. Если очередь
+    заполнена, запись отбрасывается и учитывается в dropped.
+
+    Подключается в LOGGING:
+        "handlers": {"queue": {"class": "utils.log.QueueHandler"}}
+    """
+
+    def __init__(self, maxsize=10000, stream=None):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+        target = logging.StreamHandler(stream or sys.stdout)
+        target.setFormatter(logging.Formatter("%(message)s"))
+        self.start_listener(target)
+        atexit.register(self.close)
+        # Поток QueueListener не переживает fork: в дочернем процессе
+        # (воркеры gunicorn с --preload) создаются новые очередь и слушатель.
+        os.register_at_fork(after_in_child=self.restart)
+
+    def start_listener(self, *handlers):
+        self.listener = logging.handlers.QueueListener(
+            self.queue, *handlers, respect_handler_level=True
+        )
+        self.listener.start()
+        self.running = True
+
+    def restart(self):
+        if self.running:
+            self.queue = queue.Queue(self.queue.maxsize)
+            self.start_listener(*self.listener.handlers)
+
+    def close(self):
+        # Дописывает оставшиеся в очереди записи. Вызывается при выходе
+        # и из logging.shutdown, поэтому повторный вызов ничего не делает.
+        if self.running:
+            self.running = False
+            self.listener.stop()
+        super().close()
+
+    def prepare(self, record):
+        # Очередь не покидает процесс: запись передается как есть,
+        # форматирование выполняется в потоке QueueListener.
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def setFormatter(self, fmt):
+        for handler in self.listener.handlers:
+            handler.setFormatter(fmt)
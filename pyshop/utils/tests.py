@@ -0,0 +1,232 @@
+import datetime
+import decimal
+import io
+import logging
+import os
+import smtplib
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldError, ObjectDoesNotExist
+from django.db import IntegrityError
+from django.http import Http404
+from django.test import SimpleTestCase, TestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import (
+    AuthenticationFailed,
+    MethodNotAllowed,
+    NotAcceptable,
+    NotAuthenticated,
+    ParseError,
+    PermissionDenied,
+    Throttled,
+    UnsupportedMediaType,
+    ValidationError,
+)
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from auth_app.hashing import HashingPoolOverloaded
+from auth_app.views import (
+    CustomTokenObtainPairView,
+    CustomTokenRefreshView,
+    GetUserView,
+    IntrospectionAPIView,
+    UserImportAPIView,
+)
+from utils.errors_handler import custom_exception_handler, get_handler, handle_value_error
+from utils.fast_json import FastJSONParser, FastJSONRenderer
+from utils.log import QueueHandler
+
+
+def handle(exc, view=None):
+    response = custom_exception_handler(exc, {"view": view})
+    return response.status_code, response.data
+
+
+class ExceptionHandlerTests(SimpleTestCase):
+    # Ответы прежнего обработчика на цепочке isinstance.
+    CASES = [
+        (ValidationError({"email": ["Плохой email"]}), None, 400, {"message": ["Плохой email"]}),
+        (ValidationError(["Ошибка"]), None, 400, {"message": ["Ошибка"]}),
+        (AuthenticationFailed(), CustomTokenRefreshView(), 403,
+         {"message": "Токен просрочен или не действительный"}),
+        (AuthenticationFailed(), CustomTokenObtainPairView(), 401,
+         {"message": "Активная учетная запись с указанными учетными данными не найдена."}),
+        (AuthenticationFailed(), GetUserView(), 401, {"message": "Ошибка авторизации"}),
+        (InvalidToken(), CustomTokenRefreshView(), 403,
+         {"message": "Токен просрочен или не действительный"}),
+        (PermissionDenied(), None, 403, {"message": "Доступ запрещен"}),
+        (NotAuthenticated(), None, 401, {"message": "Необходима аутентификация"}),
+        (get_user_model().DoesNotExist(), None, 404, {"message": "Пользователь не найден"}),
+        (ObjectDoesNotExist("Group"), None, 404, {"message": "Объект не найден: Group"}),
+        (ValueError("x"), None, 400, {"message": "Некорректное значение: x"}),
+        (TypeError("y"), None, 400, {"message": "Некорректное значение: y"}),
+        (Http404(), None, 404, {"message": "Страница не найдена"}),
+        (smtplib.SMTPException(), None, 500, {"message": "Ошибка при отправке почты"}),
+        (TokenError(), CustomTokenRefreshView(), 403,
+         {"message": "Токен просрочен или не действительный"}),
+        (TokenError(), None, 400, {"message": "Неверный токен"}),
+        (MethodNotAllowed("PUT"), None, 405,
+         {"message": "Метод HTTP не разрешен для данного эндпоинта"}),
+        (NotAcceptable(), None, 406,
+         {"message": "Сервер не может предоставить контент, который удовлетворяет "
+                     "заголовку Accept в запросе"}),
+        (UnsupportedMediaType("text/xml"), None, 415,
+         {"message": "Сервер не может обработать запрос "
+                     "из-за неподдерживаемого типа медиа-контента"}),
+        (Throttled(), None, 429, {"message": "Превышены ограничения скорости"}),
+        (IntegrityError(), None, 400, {"message": "Произошла ошибка базы данных"}),
+        (FieldError(), None, 400, {"message": "В запрос передан неверное имя поля"}),
+        (AttributeError("name"), None, 400,
+         {"message": "Ошибка: При попытке доступа к атрибуту name"}),
+        (HashingPoolOverloaded(), None, 503,
+         {"message": "Сервер перегружен, повторите попытку позже"}),
+        (RuntimeError(), None, 500, {"message": "Внутренняя ошибка сервера"}),
+    ]
+
+    def test_status_codes_and_messages(self):
+        for exc, view, status_code, data in self.CASES:
+            with self.subTest(exc=type(exc).__name__, view=type(view).__name__):
+                self.assertEqual(handle(exc, view), (status_code, data))
+
+    def test_most_specific_handler_wins(self):
+        class CustomValueError(ValueError):
+            pass
+
+        self.assertIs(get_handler(CustomValueError), handle_value_error)
+        # DoesNotExist пользователя - наследник ObjectDoesNotExist.
+        self.assertEqual(
+            handle(get_user_model().DoesNotExist())[1], {"message": "Пользователь не найден"}
+        )
+        # InvalidToken - наследник AuthenticationFailed, а не TokenError.
+        self.assertEqual(handle(InvalidToken(), GetUserView())[0], 401)
+
+    def test_payload_is_not_shared(self):
+        for exc in (PermissionDenied(), Throttled(), RuntimeError(), AuthenticationFailed()):
+            with self.subTest(exc=type(exc).__name__):
+                first = custom_exception_handler(exc, {"view": None})
+                first.data["message"] = "изменено"
+                self.assertNotEqual(handle(exc)[1]["message"], "изменено")
+
+
+def make_record(message):
+    return logging.makeLogRecord({"msg": message, "levelno": logging.INFO})
+
+
+class QueueHandlerTests(SimpleTestCase):
+    def test_restart_after_fork_creates_new_listener(self):
+        stream = io.StringIO()
+        handler = QueueHandler(stream=stream)
+        self.addCleanup(handler.close)
+        listener = handler.listener
+
+        handler.restart()
+        self.assertIsNot(handler.listener, listener)
+        self.assertIs(handler.listener.queue, handler.queue)
+
+        handler.handle(make_record("после fork"))
+        handler.close()
+        self.assertEqual(stream.getvalue(), "после fork\n")
+
+    def test_listener_runs_in_forked_child(self):
+        read_fd, write_fd = os.pipe()
+        handler = QueueHandler(stream=os.fdopen(write_fd, "w"))
+        self.addCleanup(handler.close)
+
+        pid = os.fork()
+        if pid == 0:
+            handler.handle(make_record("из дочернего"))
+            handler.close()
+            os._exit(0)
+        os.waitpid(pid, 0)
+        handler.close()
+        handler.listener.handlers[0].stream.close()
+        with os.fdopen(read_fd) as output:
+            self.assertEqual(output.read(), "из дочернего\n")
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    # Вывод должен совпадать с JSONRenderer DRF байт в байт.
+    CASES = [
+        {"message": "Данные пользователя", "id": 1, "ok": True, "none": None},
+        {"price": decimal.Decimal("10.50"), "ratio": decimal.Decimal("0.1")},
+        {"at": datetime.datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc)},
+        {"naive": datetime.datetime(2024, 1, 2, 3, 4, 5), "date": datetime.date(2024, 1, 2)},
+        {"time": datetime.time(3, 4, 5)},
+        {"id": uuid.UUID("12345678-1234-5678-1234-567812345678")},
+        {"lazy": gettext_lazy("Token is blacklisted")},
+        {1: "non-string key"},
+        {"separators": "\u2028 и \u2029"},
+        {"big": 2 ** 70},
+        [1, "два", [3.5]],
+    ]
+
+    def test_matches_json_renderer(self):
+        for data in self.CASES:
+            with self.subTest(data=data):
+                self.assertEqual(
+                    FastJSONRenderer().render(data, "application/json"),
+                    JSONRenderer().render(data, "application/json"),
+                )
+
+    def test_indent_falls_back_to_json_renderer(self):
+        data = {"a": [1, 2]}
+        media_type = "application/json; indent=2"
+        self.assertEqual(
+            FastJSONRenderer().render(data, media_type),
+            JSONRenderer().render(data, media_type),
+        )
+
+    def test_none_renders_empty_body(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_views_default_to_fast_renderer(self):
+        for view_class in (GetUserView, IntrospectionAPIView, UserImportAPIView):
+            with self.subTest(view=view_class.__name__):
+                view = view_class()
+                self.assertIsInstance(view.get_default_renderer(view), FastJSONRenderer)
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def parse(self, body, encoding="utf-8"):
+        return FastJSONParser().parse(io.BytesIO(body), parser_context={"encoding": encoding})
+
+    def test_parse(self):
+        self.assertEqual(
+            self.parse('{"email": "иван@example.com", "n": [1, 2.5]}'.encode()),
+            {"email": "иван@example.com", "n": [1, 2.5]},
+        )
+
+    def test_malformed_body(self):
+        for body in (b"{bad", b"", b'{"a": 1} trailing', b'{"a": "\xff"}'):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError):
+                    self.parse(body)
+                with self.assertRaises(ParseError):
+                    JSONParser().parse(io.BytesIO(body), parser_context={"encoding": "utf-8"})
+
+    def test_non_utf8_encoding_falls_back_to_json_parser(self):
+        body = '{"name": "Jos\u00e9"}'.encode("latin-1")
+        self.assertEqual(self.parse(body, encoding="latin-1"), {"name": "José"})
+        self.assertEqual(self.parse("{}".encode(), encoding="UTF-8"), {})
+
+
+class FastJSONRequestTests(TestCase):
+    def post_login(self, body, content_type="application/json"):
+        return self.client.post("/api/login/", body, content_type=content_type)
+
+    def test_malformed_body_is_bad_request(self):
+        response = self.post_login("{bad")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("JSON parse error", response.json()["detail"])
+
+    def test_non_utf8_body_is_bad_request(self):
+        response = self.post_login('{"email": "\xff"}'.encode("latin-1"))
+        self.assertEqual(response.status_code, 400)
+
+    def test_empty_body_is_validated_as_empty(self):
+        response = self.post_login("")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response["Content-Type"], "application/json")